@@ -5,10 +5,17 @@ Contains custom algorithm and time series engines.
 """
 
 from .custom_algorithm_engine import CustomAlgorithmEngine, CustomAlgorithmManager
-from .time_series_engine import TimeSeriesAnalyzer
 
 __all__ = [
     'CustomAlgorithmEngine',
     'CustomAlgorithmManager', 
     'TimeSeriesAnalyzer'
 ]
+
+
+def __getattr__(name):
+    """Load TimeSeriesAnalyzer (and SciPy behind it) on first access."""
+    if name == 'TimeSeriesAnalyzer':
+        from .time_series_engine import TimeSeriesAnalyzer
+        return TimeSeriesAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
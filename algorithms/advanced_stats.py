@@ -7,11 +7,56 @@ Author: Dragos Gontariu
 License: GPL-3.0
 """
 
-from qgis.core import QgsVectorLayer, QgsRasterLayer
-from osgeo import gdal
+from concurrent.futures import ThreadPoolExecutor
 import os
 
 
+# Upper bound on concurrent GDAL opens in validate_raster_paths
+MAX_PROBE_WORKERS = 8
+
+# Statistic names accepted by validate_statistics
+_VALID_STATS = frozenset((
+    'mean', 'sum', 'min', 'max', 'median', 'mode',
+    'count', 'range', 'stddev', 'variance', 'cv',
+    'p10', 'p25', 'p50', 'p75', 'p90', 'p95'
+))
+
+
+def _probe_raster(raster_path):
+    """
+    Check that a single raster can be used for processing.
+    
+    Args:
+        raster_path (str): Path to raster file
+        
+    Returns:
+        tuple: (raster_path, reason) - reason is None if raster is valid
+    """
+    # Imported here so loading the validators doesn't pull in GDAL
+    from osgeo import gdal
+    
+    # Try to open with GDAL (returns None for missing files too, so the
+    # existence check only runs on the failure path)
+    ds = gdal.Open(raster_path)
+    if ds is None:
+        if not os.path.exists(raster_path):
+            return raster_path, "File not found"
+        return raster_path, "Cannot open with GDAL"
+    
+    try:
+        # Check if has at least one band
+        if ds.RasterCount == 0:
+            return raster_path, "No raster bands"
+        
+        # Check CRS
+        if not ds.GetProjection():
+            return raster_path, "No CRS defined"
+        
+        return raster_path, None
+    finally:
+        ds = None
+
+
 class InputValidator:
     """
     Validate processing inputs.
@@ -62,32 +107,16 @@ class InputValidator:
         if not raster_paths:
             return False, "No raster files selected", []
         
-        invalid_rasters = []
+        # Probe rasters concurrently - GDAL releases the GIL while reading
+        # headers, so opens on slow/network storage overlap.
+        # executor.map preserves input order.
+        workers = min(MAX_PROBE_WORKERS, len(raster_paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            probe_results = list(executor.map(_probe_raster, raster_paths))
         
-        for raster_path in raster_paths:
-            # Check if file exists
-            if not os.path.exists(raster_path):
-                invalid_rasters.append((raster_path, "File not found"))
-                continue
-            
-            # Try to open with GDAL
-            ds = gdal.Open(raster_path)
-            if ds is None:
-                invalid_rasters.append((raster_path, "Cannot open with GDAL"))
-                continue
-            
-            # Check if has at least one band
-            if ds.RasterCount == 0:
-                invalid_rasters.append((raster_path, "No raster bands"))
-                ds = None
-                continue
-            
-            # Check CRS
-            projection = ds.GetProjection()
-            if not projection:
-                invalid_rasters.append((raster_path, "No CRS defined"))
-            
-            ds = None
+        invalid_rasters = [
+            (path, reason) for path, reason in probe_results if reason is not None
+        ]
         
         if invalid_rasters:
             error_msg = f"{len(invalid_rasters)} invalid raster(s):\n"
@@ -116,13 +145,7 @@ class InputValidator:
         if not statistics:
             return False, "No statistics selected"
         
-        valid_stats = [
-            'mean', 'sum', 'min', 'max', 'median', 'mode',
-            'count', 'range', 'stddev', 'variance', 'cv',
-            'p10', 'p25', 'p50', 'p75', 'p90', 'p95'
-        ]
-        
-        invalid_stats = [s for s in statistics if s not in valid_stats]
+        invalid_stats = [s for s in statistics if s not in _VALID_STATS]
         
         if invalid_stats:
             return False, f"Invalid statistics: {', '.join(invalid_stats)}"
@@ -178,12 +201,14 @@ class InputValidator:
         if not valid:
             errors.append(f"Polygon Layer: {msg}")
         
-        # Validate rasters
-        valid, msg, _ = InputValidator.validate_raster_paths(
-            config.get('raster_paths', [])
-        )
-        if not valid:
-            errors.append(f"Rasters: {msg}")
+        # Validate rasters (skip the probe entirely when none are selected)
+        raster_paths = config.get('raster_paths')
+        if not raster_paths:
+            errors.append("Rasters: No raster files selected")
+        else:
+            valid, msg, _ = InputValidator.validate_raster_paths(raster_paths)
+            if not valid:
+                errors.append(f"Rasters: {msg}")
         
         # Validate statistics
         valid, msg = InputValidator.validate_statistics(
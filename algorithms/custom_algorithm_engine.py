@@ -19,6 +19,310 @@ import ast
 import re
 from typing import Dict, List, Any, Optional
 
+try:
+    from qgis.PyQt.QtCore import QVariant
+except ImportError:
+    # Engine used outside QGIS (e.g. tests) - values are plain Python types
+    QVariant = None
+
+# Optional JIT compilation of pixel-by-pixel formulas
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional cache-blocked evaluation of pixel-by-pixel formulas.
+# Thread count can be tuned with numexpr.set_num_threads().
+try:
+    import numexpr
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+
+# Formula variable patterns: aggregated 'A_mean', pixel-by-pixel 'A'
+_AGG_VAR_RE = re.compile(r'[A-Z]_\w+')
+_PIXEL_VAR_RE = re.compile(r'\b[A-Z]\b')
+
+# Functions available to formulas, per mode
+_AGG_FUNCTIONS = {
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'round': round,
+    'pow': pow
+}
+
+_PIXEL_FUNCTIONS = {
+    'mean': np.mean,
+    'sum': np.sum,
+    'min': np.min,
+    'max': np.max,
+    'median': np.median,
+    'std': np.std,
+    'sqrt': np.sqrt,
+    'abs': np.abs,
+    'log': np.log,
+    'log10': np.log10,
+    'exp': np.exp,
+    'power': np.power,
+    'square': np.square
+}
+
+# Element-wise functions a pixel formula may use inside a fused kernel
+_PIXEL_KERNEL_FUNCTIONS = {
+    'sqrt': np.sqrt,
+    'abs': np.abs,
+    'log': np.log,
+    'log10': np.log10,
+    'exp': np.exp,
+    'power': np.power,
+    'square': np.square
+}
+
+# Functions numexpr understands natively
+_NUMEXPR_FUNCTIONS = frozenset(('sqrt', 'abs', 'log', 'log10', 'exp'))
+
+# Compiled kernels keyed by (formula, variable order)
+_PIXEL_KERNEL_CACHE = {}
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _finite_stats(values):
+        """Count, sum, min, max and M2 (Welford) of finite values, in one pass."""
+        n = 0
+        total = 0.0
+        v_min = np.inf
+        v_max = -np.inf
+        mean = 0.0
+        m2 = 0.0
+        for v in values:
+            if np.isfinite(v):
+                n += 1
+                total += v
+                if v < v_min:
+                    v_min = v
+                if v > v_max:
+                    v_max = v
+                delta = v - mean
+                mean += delta / n
+                m2 += delta * (v - mean)
+        return n, total, v_min, v_max, m2
+    
+    @njit(cache=True)
+    def _compact_finite(values, out):
+        """Copy finite values into a preallocated buffer; return the count."""
+        k = 0
+        for v in values:
+            if np.isfinite(v):
+                out[k] = v
+                k += 1
+        return k
+
+
+class _IndexVariables(ast.NodeTransformer):
+    """Rewrite variable references 'A' into element accesses 'A[i]'."""
+    
+    def __init__(self, variables):
+        self.variables = variables
+    
+    def visit_Name(self, node):
+        if node.id in self.variables:
+            return ast.copy_location(
+                ast.Subscript(
+                    value=ast.Name(id=node.id, ctx=ast.Load()),
+                    slice=ast.Name(id='i', ctx=ast.Load()),
+                    ctx=ast.Load()
+                ),
+                node
+            )
+        return node
+
+
+def _formula_names(tree) -> set:
+    """Names (variables and functions) referenced by a parsed formula."""
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+
+# Element-wise kernel: out[i] = formula(A[i], B[i], ...)
+_PIXEL_KERNEL_SOURCE = """\
+def _kernel({args}, out):
+    for i in prange(out.shape[0]):
+        out[i] = {expr}
+"""
+
+# Ragged batch kernel: polygon p owns elements offsets[p]:offsets[p + 1] of
+# the concatenated inputs. Evaluates the formula and per-polygon moments
+# (count, sum, min, max, Welford M2) with polygons spread over cores.
+_BATCH_KERNEL_SOURCE = """\
+def _kernel({args}, offsets, out, out_n, out_sum, out_min, out_max, out_m2):
+    for p in prange(offsets.shape[0] - 1):
+        n = 0
+        total = 0.0
+        v_min = np.inf
+        v_max = -np.inf
+        mean = 0.0
+        m2 = 0.0
+        for i in range(offsets[p], offsets[p + 1]):
+            v = {expr}
+            out[i] = v
+            if np.isfinite(v):
+                n += 1
+                total += v
+                if v < v_min:
+                    v_min = v
+                if v > v_max:
+                    v_max = v
+                delta = v - mean
+                mean += delta / n
+                m2 += delta * (v - mean)
+        out_n[p] = n
+        out_sum[p] = total
+        out_min[p] = v_min
+        out_max[p] = v_max
+        out_m2[p] = m2
+"""
+
+
+def _build_pixel_kernel(formula: str, variables: List[str], template: str = _PIXEL_KERNEL_SOURCE):
+    """
+    Generate a Numba kernel evaluating a pixel formula in one fused loop.
+    
+    Only formulas made of arithmetic and element-wise functions can be
+    fused; reductions like mean() or sum() keep using NumPy evaluation.
+    
+    Args:
+        formula (str): Pixel-by-pixel formula, e.g. '(A - B) / (A + B)'
+        variables (list): Variable names, in kernel argument order
+        template (str): Kernel source with {args} and {expr} placeholders
+    
+    Returns:
+        callable: kernel(*arrays, ...) or None if formula can't be fused
+    """
+    key = (template, formula, tuple(variables))
+    if key in _PIXEL_KERNEL_CACHE:
+        return _PIXEL_KERNEL_CACHE[key]
+    
+    kernel = None
+    try:
+        tree = ast.parse(formula, mode='eval')
+        
+        if _formula_names(tree) <= set(variables) | set(_PIXEL_KERNEL_FUNCTIONS):
+            indexed = ast.fix_missing_locations(_IndexVariables(set(variables)).visit(tree))
+            source = template.format(
+                args=', '.join(variables),
+                expr=ast.unparse(indexed.body),
+            )
+            namespace = dict(_PIXEL_KERNEL_FUNCTIONS, prange=prange, np=np)
+            exec(source, namespace)
+            # error_model='numpy' keeps NaN/Inf on division by zero, like NumPy
+            kernel = njit(parallel=True, error_model='numpy')(namespace['_kernel'])
+    except Exception:
+        kernel = None
+    
+    _PIXEL_KERNEL_CACHE[key] = kernel
+    return kernel
+
+
+def _to_float(value, _QVariant=QVariant) -> float:
+    """
+    Convert a statistics value to float (NULL/missing/invalid become 0.0).
+    
+    The common case - value is already a Python float - returns immediately.
+    """
+    t = type(value)
+    if t is float:
+        return value
+    if t is int:
+        return float(value)
+    if value is None:
+        return 0.0
+    if t is _QVariant:
+        if value.isNull():
+            return 0.0
+        value = value.value()
+    try:
+        return float(value) if value is not None else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _partition_percentiles(values: np.ndarray, percentile_stats: List[str]) -> Dict[str, float]:
+    """
+    Percentiles ('p10', 'p90', ...) via a single quickselect pass.
+    
+    np.partition is O(N) versus the full sort behind np.percentile; the
+    result uses the same linear interpolation as np.percentile.
+    
+    Args:
+        values (np.ndarray): Finite values (non-empty)
+        percentile_stats (list): Percentile statistic names
+    
+    Returns:
+        dict: {stat_name: value}
+    """
+    if not percentile_stats:
+        return {}
+    
+    n = values.size
+    positions = {stat: int(stat[1:]) / 100 * (n - 1) for stat in percentile_stats}
+    
+    # Each percentile needs its lower and upper neighbour
+    kth = set()
+    for pos in positions.values():
+        lower = int(pos)
+        kth.add(lower)
+        kth.add(min(lower + 1, n - 1))
+    part = np.partition(values, sorted(kth))
+    
+    results = {}
+    for stat, pos in positions.items():
+        lower = int(pos)
+        upper = min(lower + 1, n - 1)
+        results[stat] = float(part[lower] + (pos - lower) * (part[upper] - part[lower]))
+    
+    return results
+
+
+def _table_length(stats_table) -> int:
+    """Number of rows in a DataFrame or dict-of-arrays stats table."""
+    if hasattr(stats_table, 'index'):
+        return len(stats_table.index)
+    for column in stats_table.values():
+        return len(column)
+    return 0
+
+
+def _table_column(stats_table, field_name: str, n_rows: int) -> np.ndarray:
+    """
+    Get a statistics column as float64 array (missing/NULL values become 0).
+    
+    Args:
+        stats_table: pandas DataFrame or dict of {field_name: array}
+        field_name (str): Column to fetch
+        n_rows (int): Expected column length
+    
+    Returns:
+        np.ndarray: float64 column
+    """
+    if field_name not in stats_table:
+        return np.zeros(n_rows, dtype=np.float64)
+    
+    column = stats_table[field_name]
+    
+    if hasattr(column, 'to_numpy'):
+        return column.to_numpy(dtype=np.float64, na_value=0.0)
+    
+    try:
+        values = np.asarray(column, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Object column with None / QVariant entries
+        values = np.array([_to_float(v) for v in column], dtype=np.float64)
+    
+    return np.where(np.isnan(values), 0.0, values)
+
 
 class CustomAlgorithmEngine:
     """
@@ -46,36 +350,128 @@ class CustomAlgorithmEngine:
         self.formula = algorithm_config['formula']
         self.inputs = algorithm_config['inputs']
         self.output_statistics = algorithm_config.get('output_statistics', ['mean'])
+        self._percentile_stats = [
+            stat for stat in self.output_statistics
+            if stat.startswith('p') and stat[1:].isdigit()
+        ]
         
         # Validate formula syntax
         self._validate_formula()
+        
+        # Formula variable -> stats field pairs, e.g. ('A_mean', 'temp_mean')
+        self._field_map = [
+            (f"{inp['variable']}_{stat}", f"{inp['raster']}_{stat}")
+            for inp in self.inputs
+            for stat in inp['statistics']
+        ]
+        
+        # Compile formula once; evaluation only rebinds variables.
+        # The restricted globals are static - variables are passed as locals.
+        self._code = compile(self.formula, f'<{self.name}>', 'eval')
+        functions = _AGG_FUNCTIONS if self.mode == 'aggregated' else _PIXEL_FUNCTIONS
+        self._safe_globals = dict(functions, __builtins__={})
+        
+        # Aggregated formulas become a real function, e.g.
+        # def _f(A_mean, B_sum): return (A_mean * 2) / (B_sum + 1)
+        self._arg_fields = list(dict(self._field_map).items())
+        self._fn = None
+        if self.mode == 'aggregated':
+            self._fn = self._build_aggregated_function()
+        
+        # Fused JIT kernel for pixel formulas (None = use NumPy evaluation)
+        self._kernel_vars = list(dict.fromkeys(inp['variable'] for inp in self.inputs))
+        self._pixel_kernel = None
+        if self.mode == 'pixel_by_pixel' and NUMBA_AVAILABLE:
+            self._pixel_kernel = _build_pixel_kernel(self.formula, self._kernel_vars)
+        
+        # Multi-polygon kernel, compiled on first batch call (False = not built yet)
+        self._batch_kernel = False
+        
+        # Scratch buffers for the NumPy finite filter, grown to the largest
+        # polygon seen so far and reused between calls
+        self._mask_buf = np.empty(0, dtype=np.bool_)
+        self._vals_buf = np.empty(0, dtype=np.float64)
+        
+        # Set once a batch polygon failure has been printed
+        self._error_reported = False
+        
+        # numexpr fuses element-wise formulas into blocked, cache-sized chunks
+        # (reductions like mean() can't be expressed in numexpr)
+        self._use_numexpr = (
+            self.mode == 'pixel_by_pixel'
+            and NUMEXPR_AVAILABLE
+            and _formula_names(ast.parse(self.formula, mode='eval'))
+            <= set(self._kernel_vars) | _NUMEXPR_FUNCTIONS
+        )
+    
+    def _build_aggregated_function(self):
+        """
+        Compile the aggregated formula into a function taking variables positionally.
+        
+        Calling a function skips building a locals dict and name lookups
+        per evaluation. Returns None if the variable names can't be used
+        as parameters (calculate_aggregated then falls back to eval).
+        """
+        params = ', '.join(var_name for var_name, _ in self._arg_fields)
+        source = f"def _f({params}):\n    return ({self.formula})\n"
+        
+        try:
+            namespace = {}
+            exec(compile(source, f'<{self.name}>', 'exec'), self._safe_globals, namespace)
+            return namespace['_f']
+        except SyntaxError:
+            return None
     
     def _validate_formula(self):
-        """Validate formula syntax and variables."""
+        """Validate formula syntax, allowed operations and variables."""
         try:
             # Parse formula as Python expression
-            ast.parse(self.formula, mode='eval')
+            tree = ast.parse(self.formula, mode='eval')
         except SyntaxError as e:
             raise ValueError(f"Invalid formula syntax in '{self.name}': {str(e)}")
         
-        # Extract variables used in formula
+        if self.mode == 'aggregated':
+            allowed_functions = _AGG_FUNCTIONS
+            var_pattern = _AGG_VAR_RE
+        else:
+            allowed_functions = _PIXEL_FUNCTIONS
+            var_pattern = _PIXEL_VAR_RE
+        
+        # Single walk over the tree: reject unsafe constructs and collect
+        # variable names (string literals/comments can't be mistaken for them)
+        vars_in_formula = set()
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Attribute, ast.Subscript)):
+                raise ValueError(
+                    f"Attribute and index access are not allowed in formula '{self.name}'"
+                )
+            if isinstance(node, ast.Call):
+                if not (isinstance(node.func, ast.Name) and node.func.id in allowed_functions):
+                    raise ValueError(
+                        f"Function call not allowed in formula '{self.name}': "
+                        f"{ast.unparse(node.func)}"
+                    )
+            elif isinstance(node, ast.Name) and var_pattern.fullmatch(node.id):
+                vars_in_formula.add(node.id)
+        
+        inputs_by_var = {inp['variable']: inp for inp in self.inputs}
+        
+        # Check variables used in formula
         if self.mode == 'aggregated':
             # Variables like A_mean, B_sum, etc.
-            vars_in_formula = set(re.findall(r'[A-Z]_\w+', self.formula))
             
             # Check each variable is defined
             for var in vars_in_formula:
-                var_letter = var.split('_')[0]
-                var_stat = var.split('_', 1)[1]
+                var_letter, var_stat = var.split('_', 1)
                 
                 # Check if variable letter is defined in inputs
-                if not any(inp['variable'] == var_letter for inp in self.inputs):
+                input_def = inputs_by_var.get(var_letter)
+                if input_def is None:
                     raise ValueError(
                         f"Variable '{var_letter}' used in formula but not defined in inputs"
                     )
                 
                 # Check if statistic is available for this variable
-                input_def = next(inp for inp in self.inputs if inp['variable'] == var_letter)
                 if var_stat not in input_def['statistics']:
                     raise ValueError(
                         f"Statistic '{var_stat}' for variable '{var_letter}' not enabled in inputs"
@@ -83,11 +479,9 @@ class CustomAlgorithmEngine:
         
         else:  # pixel_by_pixel
             # Variables like A, B, C (single letters)
-            vars_in_formula = set(re.findall(r'\b[A-Z]\b', self.formula))
-            
             # Check each variable is defined
             for var in vars_in_formula:
-                if not any(inp['variable'] == var for inp in self.inputs):
+                if var not in inputs_by_var:
                     raise ValueError(
                         f"Variable '{var}' used in formula but not defined in inputs"
                     )
@@ -109,57 +503,20 @@ class CustomAlgorithmEngine:
         Returns:
             dict: Result as {algorithm_name: value}
         """
-        # Build namespace with available variables
-        namespace = {}
-        
-        for input_def in self.inputs:
-            var = input_def['variable']
-            raster = input_def['raster']
-            print(f"DEBUG Custom Algorithm: var={var}, raster={raster}")
-            
-            # Map each statistic to variable name
-            for stat in input_def['statistics']:
-                # Field name in polygon_stats: "raster_statistic"
-                field_name = f"{raster}_{stat}"
-                
-                # Variable name in formula: "A_mean", "B_sum", etc.
-                var_name = f"{var}_{stat}"
-                
-                # Get value (default to 0 if missing)
-                value = polygon_stats.get(field_name, 0)
-                
-                # ============ FIX: Convert QVariant to native Python type ============
-                from qgis.PyQt.QtCore import QVariant
-                if isinstance(value, QVariant):
-                    if value.isNull():
-                        value = 0  # Use 0 for NULL values
-                    else:
-                        value = value.value()
-                
-                # Convert to float (handle None and invalid values)
-                try:
-                    value = float(value) if value is not None else 0
-                except (ValueError, TypeError):
-                    value = 0  # Fallback for invalid values
-                # =====================================================================
-                
-                print(f"  Looking for field: {field_name}, found value: {value} (type: {type(value).__name__})")
-                namespace[var_name] = value
-        
         # Safe evaluation with restricted namespace
         try:
-            # Allow only basic math operations
-            safe_dict = {
-                '__builtins__': {},
-                'abs': abs,
-                'min': min,
-                'max': max,
-                'round': round,
-                'pow': pow
-            }
-            safe_dict.update(namespace)
-            
-            result = eval(self.formula, safe_dict, {})
+            if self._fn is not None:
+                # Missing fields, NULL QVariants and invalid values become 0.0
+                result = self._fn(*[
+                    _to_float(polygon_stats.get(field_name, 0))
+                    for _, field_name in self._arg_fields
+                ])
+            else:
+                namespace = {
+                    var_name: _to_float(polygon_stats.get(field_name, 0))
+                    for var_name, field_name in self._field_map
+                }
+                result = eval(self._code, self._safe_globals, namespace)
             
             # Handle invalid results
             if np.isnan(result) or np.isinf(result):
@@ -172,6 +529,41 @@ class CustomAlgorithmEngine:
         except Exception as e:
             raise RuntimeError(f"Error evaluating formula '{self.name}': {str(e)}")
     
+    def calculate_aggregated_batch(self, stats_table) -> Dict[str, np.ndarray]:
+        """
+        Calculate using aggregated statistics for many polygons at once.
+        
+        The formula is evaluated a single time against whole columns,
+        so the arithmetic runs in NumPy instead of once per polygon.
+        
+        Args:
+            stats_table: pandas DataFrame or dict of {field_name: array}
+                with one row/element per polygon
+        
+        Returns:
+            dict: {algorithm_name: np.ndarray} (NaN where result is invalid)
+        """
+        n_rows = _table_length(stats_table)
+        
+        # Build namespace with one float64 column per variable
+        namespace = {
+            var_name: _table_column(stats_table, field_name, n_rows)
+            for var_name, field_name in self._field_map
+        }
+        
+        try:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = eval(self._code, self._safe_globals, namespace)
+                result = np.broadcast_to(
+                    np.asarray(result, dtype=np.float64), (n_rows,)
+                )
+                result = np.where(np.isfinite(result), result, np.nan)
+            
+            return {self.name: result}
+            
+        except Exception as e:
+            raise RuntimeError(f"Error evaluating formula '{self.name}': {str(e)}")
+    
     def calculate_pixel_by_pixel(self, pixel_arrays: Dict[str, np.ndarray]) -> Dict[str, float]:
         """
         Calculate using pixel-by-pixel operations.
@@ -205,36 +597,27 @@ class CustomAlgorithmEngine:
             
             namespace[var] = pixel_arrays[raster]
         
-        # Add numpy functions
-        safe_dict = {
-            '__builtins__': {},
-            'mean': np.mean,
-            'sum': np.sum,
-            'min': np.min,
-            'max': np.max,
-            'median': np.median,
-            'std': np.std,
-            'sqrt': np.sqrt,
-            'abs': np.abs,
-            'log': np.log,
-            'log10': np.log10,
-            'exp': np.exp,
-            'power': np.power,
-            'square': np.square
-        }
-        safe_dict.update(namespace)
-        
         try:
             # Evaluate formula to get result array
-            result_array = eval(self.formula, safe_dict, {})
+            result_array = self._run_pixel_kernel(namespace)
+            if result_array is None:
+                result_array = self._run_numexpr(namespace)
+            if result_array is None:
+                result_array = eval(self._code, self._safe_globals, {
+                    var: np.asarray(arr).astype(np.float64, copy=False)
+                    for var, arr in namespace.items()
+                })
             
             # Ensure it's a numpy array
             if not isinstance(result_array, np.ndarray):
                 result_array = np.array(result_array)
             
+            if NUMBA_AVAILABLE:
+                # Single pass for the finite filter and all moments
+                return self._fused_output_statistics(result_array)
+            
             # Filter out NaN and Inf
-            valid_mask = np.isfinite(result_array)
-            valid_values = result_array[valid_mask]
+            valid_values = self._finite_values(result_array)
             
             if len(valid_values) == 0:
                 # No valid values
@@ -242,11 +625,14 @@ class CustomAlgorithmEngine:
             
             # Calculate output statistics
             results = {}
+            percentiles = _partition_percentiles(valid_values, self._percentile_stats)
             
             for stat in self.output_statistics:
                 field_name = f'{self.name}_{stat}'
                 
-                if stat == 'mean':
+                if stat in percentiles:
+                    results[field_name] = percentiles[stat]
+                elif stat == 'mean':
                     results[field_name] = float(np.mean(valid_values))
                 elif stat == 'median':
                     results[field_name] = float(np.median(valid_values))
@@ -268,6 +654,253 @@ class CustomAlgorithmEngine:
         except Exception as e:
             raise RuntimeError(f"Error evaluating pixel formula '{self.name}': {str(e)}")
     
+    def _finite_values(self, result_array: np.ndarray) -> np.ndarray:
+        """
+        Finite values of a result array, compacted into the scratch buffer.
+        
+        The returned array is a view of the engine's buffer and is only
+        valid until the next call.
+        
+        Args:
+            result_array (np.ndarray): Formula result (may contain NaN/Inf)
+        
+        Returns:
+            np.ndarray: Finite values as float64
+        """
+        values = np.asarray(result_array, dtype=np.float64).ravel()
+        n = values.size
+        
+        if self._mask_buf.size < n:
+            self._mask_buf = np.empty(n, dtype=np.bool_)
+            self._vals_buf = np.empty(n, dtype=np.float64)
+        
+        mask = self._mask_buf[:n]
+        np.isfinite(values, out=mask)
+        k = int(np.count_nonzero(mask))
+        
+        return np.compress(mask, values, out=self._vals_buf[:k])
+    
+    def _fused_output_statistics(self, result_array: np.ndarray) -> Dict[str, float]:
+        """
+        Calculate output statistics with one JIT pass over the result array.
+        
+        Args:
+            result_array (np.ndarray): Formula result (may contain NaN/Inf)
+        
+        Returns:
+            dict: {'algorithm_name_stat': value}
+        """
+        values = np.ascontiguousarray(result_array, dtype=np.float64).ravel()
+        n_valid, total, v_min, v_max, m2 = _finite_stats(values)
+        return self._statistics_from_moments(values, n_valid, total, v_min, v_max, m2)
+    
+    def _statistics_from_moments(self, values: np.ndarray, n_valid: int, total: float,
+                                 v_min: float, v_max: float, m2: float) -> Dict[str, float]:
+        """
+        Build output statistics from precomputed moments of the finite values.
+        
+        Args:
+            values (np.ndarray): Formula result (may contain NaN/Inf), used
+                only for order statistics (median, percentiles)
+            n_valid, total, v_min, v_max, m2: Count, sum, min, max and
+                Welford M2 of the finite values
+        
+        Returns:
+            dict: {'algorithm_name_stat': value}
+        """
+        if n_valid == 0:
+            # No valid values
+            return {f'{self.name}_{stat}': None for stat in self.output_statistics}
+        
+        # Finite values are compacted only when an order statistic is needed
+        valid_values = None
+        if self._percentile_stats or 'median' in self.output_statistics:
+            valid_values = np.empty(n_valid, dtype=np.float64)
+            _compact_finite(values, valid_values)
+        
+        results = {}
+        percentiles = _partition_percentiles(valid_values, self._percentile_stats)
+        
+        for stat in self.output_statistics:
+            field_name = f'{self.name}_{stat}'
+            
+            if stat in percentiles:
+                results[field_name] = percentiles[stat]
+            elif stat == 'mean':
+                results[field_name] = float(total / n_valid)
+            elif stat == 'median':
+                results[field_name] = float(np.median(valid_values))
+            elif stat == 'min':
+                results[field_name] = float(v_min)
+            elif stat == 'max':
+                results[field_name] = float(v_max)
+            elif stat == 'stddev' or stat == 'std':
+                results[field_name] = float(np.sqrt(m2 / n_valid))
+            elif stat == 'sum':
+                results[field_name] = float(total)
+            elif stat == 'count':
+                results[field_name] = int(n_valid)
+            else:
+                results[field_name] = None
+        
+        return results
+    
+    def calculate_pixel_by_pixel_batch(self, pixel_arrays_per_polygon: List[Dict[str, np.ndarray]]) -> List[Dict[str, float]]:
+        """
+        Calculate pixel-by-pixel results for many polygons at once.
+        
+        Each raster's pixels are concatenated across polygons, with an
+        offsets array marking polygon boundaries, and a single parallel
+        JIT kernel evaluates the formula and per-polygon statistics.
+        Falls back to calculate_pixel_by_pixel per polygon when the
+        formula can't be fused or Numba is not installed.
+        
+        Args:
+            pixel_arrays_per_polygon (list): One pixel_arrays dict per polygon
+                (same format as calculate_pixel_by_pixel)
+        
+        Returns:
+            list: One statistics dict per polygon; failed polygons get None values
+        """
+        concatenated = self._concatenate_pixel_arrays(pixel_arrays_per_polygon)
+        if concatenated is None:
+            return [self._calculate_pixel_safe(pixel_arrays) for pixel_arrays in pixel_arrays_per_polygon]
+        
+        arrays, offsets = concatenated
+        n_polygons = len(pixel_arrays_per_polygon)
+        
+        out = np.empty(offsets[-1], dtype=np.float64)
+        out_n = np.empty(n_polygons, dtype=np.int64)
+        out_sum = np.empty(n_polygons, dtype=np.float64)
+        out_min = np.empty(n_polygons, dtype=np.float64)
+        out_max = np.empty(n_polygons, dtype=np.float64)
+        out_m2 = np.empty(n_polygons, dtype=np.float64)
+        
+        try:
+            self._batch_kernel(*arrays, offsets, out, out_n, out_sum, out_min, out_max, out_m2)
+        except Exception:
+            # Typing failure in Numba - don't try the kernel again
+            self._batch_kernel = None
+            return [self._calculate_pixel_safe(pixel_arrays) for pixel_arrays in pixel_arrays_per_polygon]
+        
+        return [
+            self._statistics_from_moments(
+                out[offsets[p]:offsets[p + 1]],
+                int(out_n[p]), out_sum[p], out_min[p], out_max[p], out_m2[p]
+            )
+            for p in range(n_polygons)
+        ]
+    
+    def _concatenate_pixel_arrays(self, pixel_arrays_per_polygon: List[Dict[str, np.ndarray]]):
+        """
+        Build the ragged (concatenated arrays, offsets) batch representation.
+        
+        Returns:
+            tuple: ([float64 array per kernel variable], int64 offsets),
+                or None if the batch kernel can't be used for this input
+        """
+        if self.mode != 'pixel_by_pixel' or not NUMBA_AVAILABLE or not pixel_arrays_per_polygon:
+            return None
+        
+        if self._batch_kernel is False:
+            self._batch_kernel = _build_pixel_kernel(
+                self.formula, self._kernel_vars, _BATCH_KERNEL_SOURCE
+            )
+        if self._batch_kernel is None:
+            return None
+        
+        raster_by_var = {inp['variable']: inp['raster'] for inp in self.inputs}
+        
+        lengths = []
+        parts = {var: [] for var in self._kernel_vars}
+        for pixel_arrays in pixel_arrays_per_polygon:
+            n_pixels = None
+            for var in self._kernel_vars:
+                arr = pixel_arrays.get(raster_by_var[var])
+                if arr is None:
+                    # Missing raster - per-polygon path reports the error
+                    return None
+                arr = np.asarray(arr)
+                if arr.ndim != 1 or (n_pixels is not None and arr.shape[0] != n_pixels):
+                    # Broadcasting / shape errors are left to NumPy
+                    return None
+                n_pixels = arr.shape[0]
+                parts[var].append(arr)
+            lengths.append(n_pixels)
+        
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        
+        arrays = [np.concatenate(parts[var]).astype(np.float64, copy=False) for var in self._kernel_vars]
+        return arrays, offsets
+    
+    def _calculate_pixel_safe(self, pixel_arrays: Dict[str, np.ndarray]) -> Dict[str, float]:
+        """calculate_pixel_by_pixel, with None values if the polygon fails."""
+        try:
+            return self.calculate_pixel_by_pixel(pixel_arrays)
+        except Exception as e:
+            # Report the first failing polygon only
+            if not self._error_reported:
+                self._error_reported = True
+                print(f"Error calculating pixel algorithm '{self.name}' (further errors suppressed): {str(e)}")
+            return {field_name: None for field_name in self.get_output_field_names()}
+    
+    def _run_pixel_kernel(self, namespace: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Evaluate the pixel formula with the fused JIT kernel.
+        
+        Args:
+            namespace (dict): {variable: pixel array}
+        
+        Returns:
+            np.ndarray: Result array, or None if the kernel can't be used
+        """
+        if self._pixel_kernel is None:
+            return None
+        
+        # float64 inputs, as in the batch path: integer rasters must not wrap
+        arrays = [np.asarray(namespace[var]).astype(np.float64, copy=False) for var in self._kernel_vars]
+        n_pixels = arrays[0].shape[0] if arrays[0].ndim == 1 else -1
+        if any(arr.ndim != 1 or arr.shape[0] != n_pixels for arr in arrays):
+            # Let NumPy handle broadcasting / shape errors
+            return None
+        
+        result_array = np.empty(n_pixels, dtype=np.float64)
+        try:
+            self._pixel_kernel(*arrays, result_array)
+        except Exception:
+            # Typing failure in Numba - don't try the kernel again
+            self._pixel_kernel = None
+            return None
+        
+        return result_array
+    
+    def _run_numexpr(self, namespace: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Evaluate the pixel formula with numexpr.
+        
+        Inputs are cast to float64, like the other paths, so integer
+        rasters give the same result whichever path evaluates them.
+        
+        Args:
+            namespace (dict): {variable: pixel array}
+        
+        Returns:
+            np.ndarray: Result array, or None if numexpr can't be used
+        """
+        if not self._use_numexpr:
+            return None
+        
+        try:
+            return numexpr.evaluate(self.formula, local_dict={
+                var: np.asarray(arr).astype(np.float64, copy=False)
+                for var, arr in namespace.items()
+            })
+        except Exception:
+            # Unsupported dtype/expression - use NumPy from now on
+            self._use_numexpr = False
+            return None
+    
     def get_required_rasters(self) -> List[str]:
         """
         Get list of raster names required by this algorithm.
@@ -327,6 +960,19 @@ class CustomAlgorithmManager:
             except Exception as e:
                 # Log warning but continue with other algorithms
                 print(f"Warning: Failed to initialize algorithm '{config.get('name', 'Unknown')}': {str(e)}")
+        
+        # Partition engines by mode once, so per-polygon calls skip mode checks
+        self._agg_engines = [e for e in self.engines if e.mode == 'aggregated']
+        self._pixel_engines = [e for e in self.engines if e.mode == 'pixel_by_pixel']
+        self._agg_field_names = [
+            field_name for e in self._agg_engines for field_name in e.get_output_field_names()
+        ]
+        self._pixel_field_names = [
+            field_name for e in self._pixel_engines for field_name in e.get_output_field_names()
+        ]
+        
+        # Engines whose failure was already reported (errors repeat per polygon)
+        self._reported_errors = set()
     
     def calculate_all_aggregated(self, polygon_stats: Dict[str, float]) -> Dict[str, float]:
         """
@@ -338,21 +984,61 @@ class CustomAlgorithmManager:
         Returns:
             dict: Combined results from all algorithms
         """
+        # Failed algorithms keep their preallocated None values
+        results = dict.fromkeys(self._agg_field_names)
+        
+        for engine in self._agg_engines:
+            try:
+                results[engine.name] = engine.calculate_aggregated(polygon_stats)[engine.name]
+            except Exception as e:
+                self._report_error(engine, e)
+        
+        return results
+    
+    def calculate_all_aggregated_batch(self, stats_table) -> Dict[str, np.ndarray]:
+        """
+        Calculate all aggregated algorithms for many polygons at once.
+        
+        Args:
+            stats_table: pandas DataFrame or dict of {field_name: array}
+                (struct-of-arrays, one element per polygon)
+        
+        Returns:
+            dict: {field_name: np.ndarray} for all aggregated algorithms
+        """
         results = {}
+        n_rows = _table_length(stats_table)
         
-        for engine in self.engines:
-            if engine.mode == 'aggregated':
-                try:
-                    algo_results = engine.calculate_aggregated(polygon_stats)
-                    results.update(algo_results)
-                except Exception as e:
-                    print(f"Error calculating algorithm '{engine.name}': {str(e)}")
-                    # Add None values for failed algorithms
-                    for field_name in engine.get_output_field_names():
-                        results[field_name] = None
+        for engine in self._agg_engines:
+            try:
+                results.update(engine.calculate_aggregated_batch(stats_table))
+            except Exception as e:
+                # Vectorized evaluation not possible (e.g. min()/max() on
+                # arrays) - fall back to per-polygon evaluation
+                print(f"Batch evaluation failed for '{engine.name}', using per-polygon mode: {str(e)}")
+                results.update(self._calculate_aggregated_rows(engine, stats_table, n_rows))
         
         return results
     
+    def _calculate_aggregated_rows(self, engine, stats_table, n_rows: int) -> Dict[str, np.ndarray]:
+        """Evaluate one aggregated engine row by row over a stats table."""
+        columns = {
+            field_name: _table_column(stats_table, field_name, n_rows)
+            for _, field_name in engine._field_map
+        }
+        
+        values = np.full(n_rows, np.nan)
+        for i in range(n_rows):
+            row = {field_name: float(col[i]) for field_name, col in columns.items()}
+            try:
+                value = engine.calculate_aggregated(row)[engine.name]
+            except Exception:
+                value = None
+            if value is not None:
+                values[i] = value
+        
+        return {engine.name: values}
+    
     def calculate_all_pixel(self, pixel_arrays: Dict[str, np.ndarray]) -> Dict[str, float]:
         """
         Calculate all algorithms in pixel-by-pixel mode.
@@ -363,21 +1049,70 @@ class CustomAlgorithmManager:
         Returns:
             dict: Combined results from all algorithms
         """
-        results = {}
+        # Failed algorithms keep their preallocated None values
+        results = dict.fromkeys(self._pixel_field_names)
         
-        for engine in self.engines:
-            if engine.mode == 'pixel_by_pixel':
-                try:
-                    algo_results = engine.calculate_pixel_by_pixel(pixel_arrays)
-                    results.update(algo_results)
-                except Exception as e:
-                    print(f"Error calculating pixel algorithm '{engine.name}': {str(e)}")
-                    # Add None values for failed algorithms
-                    for field_name in engine.get_output_field_names():
-                        results[field_name] = None
+        for engine in self._pixel_engines:
+            try:
+                for field_name, value in engine.calculate_pixel_by_pixel(pixel_arrays).items():
+                    results[field_name] = value
+            except Exception as e:
+                self._report_error(engine, e)
+        
+        return results
+    
+    def calculate_all_pixel_batch(self, pixel_arrays_per_polygon: List[Dict[str, np.ndarray]]) -> List[Dict[str, float]]:
+        """
+        Calculate all pixel-by-pixel algorithms for many polygons at once.
+        
+        Only algorithms whose input rasters are all in the pixel arrays are
+        evaluated; the fields of the others are left out of the results,
+        so values written from another raster are not overwritten.
+        
+        Args:
+            pixel_arrays_per_polygon (list): One pixel_arrays dict per polygon
+        
+        Returns:
+            list: Combined results from the evaluated algorithms, one dict per polygon
+        """
+        if not pixel_arrays_per_polygon:
+            return []
+        
+        available = set(pixel_arrays_per_polygon[0])
+        engines = [
+            engine for engine in self._pixel_engines
+            if available.issuperset(engine.get_required_rasters())
+        ]
+        field_names = [field_name for engine in engines for field_name in engine.get_output_field_names()]
+        
+        # Failed algorithms keep their preallocated None values
+        results = [dict.fromkeys(field_names) for _ in pixel_arrays_per_polygon]
+        
+        for engine in engines:
+            try:
+                algo_results = engine.calculate_pixel_by_pixel_batch(pixel_arrays_per_polygon)
+            except Exception as e:
+                self._report_error(engine, e)
+                continue
+            
+            for polygon_results, algo_result in zip(results, algo_results):
+                for field_name, value in algo_result.items():
+                    polygon_results[field_name] = value
         
         return results
     
+    def _report_error(self, engine, error: Exception):
+        """
+        Report an algorithm failure once per engine.
+        
+        A broken formula usually fails for every polygon; printing each
+        time only adds formatting and console I/O to the feature loop.
+        """
+        if engine.name in self._reported_errors:
+            return
+        self._reported_errors.add(engine.name)
+        print(f"Error calculating algorithm '{engine.name}' (further errors suppressed): {str(error)}")
+    
     def get_all_output_fields(self) -> List[str]:
         """Get all output field names from all algorithms."""
         fields = []
@@ -387,7 +1122,7 @@ class CustomAlgorithmManager:
     
     def has_pixel_algorithms(self) -> bool:
         """Check if any algorithm uses pixel-by-pixel mode."""
-        return any(engine.mode == 'pixel_by_pixel' for engine in self.engines)
+        return bool(self._pixel_engines)
     
     def get_required_rasters_for_algorithms(self) -> Dict[str, List[str]]:
         """
@@ -16,9 +16,239 @@ License: GPL-3.0
 
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
-from qgis.core import QgsVectorLayer, QgsFeature, QgsField
+from qgis.core import QgsVectorLayer, QgsFeature, QgsField, QgsFeatureRequest
 from qgis.PyQt.QtCore import QVariant
 
+# Optional JIT kernels for large arrays
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Below this size NumPy's vectorized path beats the JIT call overhead
+NUMBA_MIN_SIZE = 512
+
+# Jenks is O(N^2 * k); larger inputs are reduced to an evenly spaced sample
+# of the sorted values (same approach and limit as QGIS)
+JENKS_MAX_VALUES = 3000
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _count_below(values):
+        """
+        Number of values strictly below each value (NaN counts as 0).
+        
+        One argsort, then a single pass over the sorted order; ties share
+        the position of their first occurrence.
+        """
+        n = values.shape[0]
+        order = np.argsort(values)  # NaN sorts last
+        counts = np.zeros(n, dtype=np.int64)
+        below = 0
+        for i in range(n):
+            idx = order[i]
+            v = values[idx]
+            if np.isnan(v):
+                break
+            if i > 0 and v != values[order[i - 1]]:
+                below = i
+            counts[idx] = below
+        return counts
+    
+    @njit(cache=True)
+    def _nan_mean_std(values):
+        """Mean and population std of non-NaN values in one Welford pass."""
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        for v in values:
+            if not np.isnan(v):
+                n += 1
+                delta = v - mean
+                mean += delta / n
+                m2 += delta * (v - mean)
+        if n == 0:
+            return np.nan, np.nan
+        return mean, np.sqrt(m2 / n)
+    
+    @njit(parallel=True, cache=True)
+    def _weighted_sum_rows(data, weights, out):
+        """out[i] = sum_k data[k, i] * weights[k], fields fused per element."""
+        n_fields = data.shape[0]
+        for i in prange(data.shape[1]):
+            total = 0.0
+            for k in range(n_fields):
+                total += data[k, i] * weights[k]
+            out[i] = total
+    
+    @njit(parallel=True, cache=True)
+    def _normalized_weighted_sum_rows(data, shift, scale, constant, fill, weights, zscore, out):
+        """
+        out[i] = sum_k weights[k] * normalized data[i, k], one pass per row.
+        
+        Column k is normalized as (x - shift) * scale for z-scores and
+        x * scale + shift for min-max; constant columns take fill[k].
+        """
+        n_fields = data.shape[1]
+        for i in prange(data.shape[0]):
+            total = 0.0
+            for k in range(n_fields):
+                if constant[k]:
+                    normalized = fill[k]
+                elif zscore:
+                    normalized = (data[i, k] - shift[k]) * scale[k]
+                else:
+                    normalized = data[i, k] * scale[k] + shift[k]
+                total += normalized * weights[k]
+            out[i] = total
+    
+    @njit(cache=True)
+    def _jenks_breaks(data, n_classes):
+        """
+        Fisher-Jenks natural breaks of sorted data (dynamic programming).
+        
+        Returns n_classes + 1 break values: the minimum followed by the
+        upper limit of each class.
+        """
+        n = data.shape[0]
+        lower_limits = np.zeros((n + 1, n_classes + 1), dtype=np.int64)
+        variances = np.full((n + 1, n_classes + 1), np.inf)
+        
+        for j in range(1, n_classes + 1):
+            lower_limits[1, j] = 1
+            variances[1, j] = 0.0
+        
+        for l in range(2, n + 1):
+            s1 = 0.0
+            s2 = 0.0
+            w = 0.0
+            v = 0.0
+            for m in range(1, l + 1):
+                # Sum of squared deviations of data[l - m:l]
+                i3 = l - m + 1
+                val = data[i3 - 1]
+                s2 += val * val
+                s1 += val
+                w += 1.0
+                v = s2 - (s1 * s1) / w
+                i4 = i3 - 1
+                if i4 != 0:
+                    for j in range(2, n_classes + 1):
+                        candidate = v + variances[i4, j - 1]
+                        if variances[l, j] >= candidate:
+                            lower_limits[l, j] = i3
+                            variances[l, j] = candidate
+            lower_limits[l, 1] = 1
+            variances[l, 1] = v
+        
+        breaks = np.empty(n_classes + 1)
+        breaks[0] = data[0]
+        breaks[n_classes] = data[n - 1]
+        k = n
+        for j in range(n_classes, 1, -1):
+            idx = lower_limits[k, j] - 2
+            breaks[j - 1] = data[idx]
+            k = lower_limits[k, j] - 1
+        return breaks
+    
+    @njit(cache=True)
+    def _ranks_from_order(order, n_valid, descending):
+        """
+        Ranks (1..N) from an ascending argsort, without reversed/arange copies.
+        
+        For descending ranks the first n_valid (non-NaN) entries are read
+        backwards, so NaN values still rank last.
+        """
+        n = order.shape[0]
+        ranks = np.empty(n, dtype=np.int64)
+        for i in range(n):
+            if descending and i < n_valid:
+                ranks[order[n_valid - 1 - i]] = i + 1
+            else:
+                ranks[order[i]] = i + 1
+        return ranks
+
+
+def _label_classes(classes: np.ndarray, labels, n_classes: int) -> np.ndarray:
+    """
+    Map class indices to labels with one vectorized take.
+    
+    Indices above the last class (values beyond the top break) get the
+    last class label. Labels may be a list or a pre-converted array.
+    """
+    labels_arr = np.asarray(labels)
+    return labels_arr.take(np.minimum(classes, n_classes - 1))
+
+
+def _as_f64(values) -> np.ndarray:
+    """
+    View input as a float64 array, copying only when needed.
+    
+    float64 arrays from a previous pipeline stage are returned as-is;
+    the engine methods never modify their input in place.
+    """
+    if isinstance(values, np.ndarray) and values.dtype == np.float64:
+        return values
+    return np.asarray(values, dtype=np.float64)
+
+
+def _as_float(values) -> np.ndarray:
+    """
+    View input as a float32 or float64 array, copying only when needed.
+    
+    Like _as_f64, but float32 input is kept as-is for kernels that read
+    it in float32 and compute in float64.
+    """
+    if isinstance(values, np.ndarray) and values.dtype == np.float32:
+        return values
+    return _as_f64(values)
+
+
+def _attribute_to_float(value, null_value: float = np.nan) -> float:
+    """Convert a feature attribute to float (NULL/invalid become null_value)."""
+    if value is None:
+        return null_value
+    if isinstance(value, QVariant):
+        if value.isNull():
+            return null_value
+        value = value.value()
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return null_value
+
+
+def attribute_column(values, null_value: float = np.nan) -> np.ndarray:
+    """
+    Convert a column of feature attributes to a float64 array.
+    
+    Plain numbers convert in one C pass; a column with NULLs (None,
+    QVariant) or text falls back to _attribute_to_float per value.
+    
+    Args:
+        values (list): Attribute values of one field
+        null_value (float): Value for NULL and non-numeric attributes
+            (scores use 0.0)
+        
+    Returns:
+        np.ndarray: float64 values
+    """
+    try:
+        column = np.fromiter(values, dtype=np.float64, count=len(values))
+        # None converts to NaN - only a column without NaN is final
+        if not np.isnan(column).any():
+            return column
+    except (TypeError, ValueError):
+        pass
+    
+    return np.fromiter(
+        (_attribute_to_float(value, null_value) for value in values),
+        dtype=np.float64,
+        count=len(values)
+    )
+
 
 class PostProcessingEngine:
     """
@@ -44,9 +274,9 @@ class PostProcessingEngine:
             output_range: Tuple (min, max) for output range
             
         Returns:
-            Normalized values
+            Normalized values (read-only if all input values are equal)
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         # Handle edge cases
         if len(values) == 0:
@@ -55,16 +285,19 @@ class PostProcessingEngine:
         v_min = np.nanmin(values)
         v_max = np.nanmax(values)
         
-        # If all values are the same
+        # If all values are the same - constant result as a read-only
+        # broadcast view (no allocation)
         if v_max == v_min:
-            return np.full_like(values, output_range[0])
-        
-        # Normalize
-        normalized = (values - v_min) / (v_max - v_min)
+            return np.broadcast_to(np.float64(output_range[0]), values.shape)
         
-        # Scale to output range
+        # Normalize and scale to output range in one affine transform:
+        # value * scale + offset, written into a single output array
         out_min, out_max = output_range
-        scaled = normalized * (out_max - out_min) + out_min
+        scale = (out_max - out_min) / (v_max - v_min)
+        offset = out_min - v_min * scale
+        
+        scaled = np.multiply(values, scale)
+        np.add(scaled, offset, out=scaled)
         
         return scaled
     
@@ -81,19 +314,218 @@ class PostProcessingEngine:
         Returns:
             Standardized values (mean=0, std=1)
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         if len(values) == 0:
             return values
         
-        mean = np.nanmean(values)
-        std = np.nanstd(values)
+        if NUMBA_AVAILABLE and len(values) > NUMBA_MIN_SIZE:
+            mean, std = _nan_mean_std(values)
+        else:
+            # Same result as nanmean/nanstd without their NaN-replaced copies
+            valid = ~np.isnan(values)
+            n_valid = np.count_nonzero(valid)
+            if n_valid == 0:
+                return np.full_like(values, np.nan)
+            mean = np.sum(values, where=valid) / n_valid
+            deviations = np.subtract(values, mean)
+            np.square(deviations, out=deviations)
+            std = np.sqrt(np.sum(deviations, where=valid) / n_valid)
         
         # Handle zero std
         if std == 0:
             return np.zeros_like(values)
         
-        return (values - mean) / std
+        # Standardize with one subtract and one in-place multiply
+        standardized = np.subtract(values, mean)
+        np.multiply(standardized, 1.0 / std, out=standardized)
+        
+        return standardized
+    
+    @staticmethod
+    def normalize_minmax_2d(values: np.ndarray, output_range: Tuple[float, float] = (0, 100)) -> np.ndarray:
+        """
+        Min-Max normalization of each column of a (features x fields) matrix.
+        
+        Same result per column as normalize_minmax, with the min/max
+        reductions and the affine transform done once for all columns.
+        
+        Args:
+            values: 2-D input values, one field per column
+            output_range: Tuple (min, max) for output range
+            
+        Returns:
+            Normalized matrix (new array, same memory layout as the input)
+        """
+        values = _as_f64(values)
+        
+        if values.shape[0] == 0:
+            return values
+        
+        v_min = np.nanmin(values, axis=0)
+        v_max = np.nanmax(values, axis=0)
+        
+        # Constant columns get a dummy span here and out_min below
+        out_min, out_max = output_range
+        constant = v_max == v_min
+        span = np.where(constant, 1.0, v_max - v_min)
+        scale = (out_max - out_min) / span
+        offset = out_min - v_min * scale
+        
+        scaled = np.multiply(values, scale)
+        np.add(scaled, offset, out=scaled)
+        
+        if constant.any():
+            scaled[:, constant] = out_min
+        
+        return scaled
+    
+    @staticmethod
+    def normalize_zscore_2d(values: np.ndarray) -> np.ndarray:
+        """
+        Z-score standardization of each column of a (features x fields) matrix.
+        
+        Args:
+            values: 2-D input values, one field per column
+            
+        Returns:
+            Standardized matrix (columns with zero std are all 0, columns
+            without valid values are all NaN)
+        """
+        values = _as_f64(values)
+        
+        if values.shape[0] == 0:
+            return values
+        
+        valid = ~np.isnan(values)
+        n_valid = np.count_nonzero(valid, axis=0)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.sum(values, axis=0, where=valid) / n_valid
+            standardized = np.subtract(values, mean)
+            np.square(standardized, out=standardized)
+            std = np.sqrt(np.sum(standardized, axis=0, where=valid) / n_valid)
+            
+            # Reuse the squared deviations buffer for the result
+            np.subtract(values, mean, out=standardized)
+            np.multiply(standardized, 1.0 / std, out=standardized)
+        
+        standardized[:, std == 0] = 0.0
+        
+        return standardized
+    
+    @staticmethod
+    def normalize_and_weight(values: np.ndarray, weights, method: str = 'minmax',
+                             output_range: Tuple[float, float] = (0, 100)) -> np.ndarray:
+        """
+        Weighted sum of normalized columns without building the normalized matrix.
+        
+        Equivalent to normalize_minmax_2d / normalize_zscore_2d followed by
+        weighted_sum, but streams over the columns: each one is normalized
+        into a single reused buffer, weighted and added to the result.
+        
+        float32 input is read as-is; statistics and the weighted sum are
+        computed in float64 either way.
+        
+        Args:
+            values: 2-D input values, one field per column
+            weights: Weight of each column
+            method: 'minmax' or 'zscore'
+            output_range: Tuple (min, max) for min-max output range
+            
+        Returns:
+            Weighted sum array (one value per row)
+        """
+        values = _as_float(values)
+        n = values.shape[0]
+        result = np.zeros(n, dtype=float)
+        
+        if n == 0:
+            return result
+        
+        out_min, out_max = output_range
+        
+        if NUMBA_AVAILABLE and n > NUMBA_MIN_SIZE:
+            return PostProcessingEngine._normalize_and_weight_jit(
+                values, weights, method, out_min, out_max, result
+            )
+        
+        normalized = np.empty(n, dtype=float)
+        valid = np.empty(n, dtype=bool)
+        
+        for j, weight in enumerate(weights):
+            column = values[:, j]
+            
+            if method == 'minmax':
+                v_min = np.float64(np.nanmin(column))
+                v_max = np.float64(np.nanmax(column))
+                if v_max == v_min:
+                    normalized.fill(out_min)
+                else:
+                    scale = (out_max - out_min) / (v_max - v_min)
+                    np.multiply(column, scale, out=normalized, dtype=np.float64)
+                    np.add(normalized, out_min - v_min * scale, out=normalized)
+            else:
+                np.isnan(column, out=valid)
+                np.logical_not(valid, out=valid)
+                n_valid = np.count_nonzero(valid)
+                if n_valid == 0:
+                    normalized.fill(np.nan)
+                else:
+                    mean = np.sum(column, where=valid, dtype=np.float64) / n_valid
+                    np.subtract(column, mean, out=normalized, dtype=np.float64)
+                    np.square(normalized, out=normalized)
+                    std = np.sqrt(np.sum(normalized, where=valid) / n_valid)
+                    if std == 0:
+                        normalized.fill(0.0)
+                    else:
+                        np.subtract(column, mean, out=normalized, dtype=np.float64)
+                        np.multiply(normalized, 1.0 / std, out=normalized)
+            
+            np.multiply(normalized, weight, out=normalized)
+            np.add(result, normalized, out=result)
+        
+        return result
+    
+    @staticmethod
+    def _normalize_and_weight_jit(values, weights, method, out_min, out_max, result):
+        """
+        normalize_and_weight for large inputs (requires numba).
+        
+        Column statistics are computed the same way as normalize_minmax /
+        normalize_zscore at this size; the normalize, weight and sum of
+        all columns then runs as one parallel pass over the rows.
+        """
+        n_fields = values.shape[1]
+        shift = np.empty(n_fields)
+        scale = np.empty(n_fields)
+        constant = np.zeros(n_fields, dtype=np.bool_)
+        fill = np.zeros(n_fields)
+        
+        for j in range(n_fields):
+            column = values[:, j]
+            if method == 'minmax':
+                v_min = np.float64(np.nanmin(column))
+                v_max = np.float64(np.nanmax(column))
+                if v_max == v_min:
+                    constant[j] = True
+                    fill[j] = out_min
+                    continue
+                scale[j] = (out_max - out_min) / (v_max - v_min)
+                shift[j] = out_min - v_min * scale[j]
+            else:
+                mean, std = _nan_mean_std(column)
+                if std == 0:
+                    constant[j] = True
+                    continue
+                shift[j] = mean
+                scale[j] = 1.0 / std
+        
+        _normalized_weighted_sum_rows(
+            values, shift, scale, constant, fill,
+            np.asarray(weights, dtype=np.float64), method == 'zscore', result
+        )
+        return result
     
     # ========== CLASSIFICATION ==========
     
@@ -111,7 +543,7 @@ class PostProcessingEngine:
         Returns:
             Tuple of (class labels array, break points list)
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         if len(values) == 0:
             return values, []
@@ -122,14 +554,14 @@ class PostProcessingEngine:
         
         breaks = np.linspace(v_min, v_max, n_classes + 1)
         
-        # Classify
-        classes = np.digitize(values, breaks[1:-1])
+        # Classify (breaks are increasing, so this matches np.digitize)
+        classes = np.searchsorted(breaks[1:-1], values, side='right')
         
         # Apply labels
         if labels is None:
             labels = [f"Class {i+1}" for i in range(n_classes)]
         
-        class_labels = np.array([labels[min(c, n_classes-1)] for c in classes])
+        class_labels = _label_classes(classes, labels, n_classes)
         
         return class_labels, breaks.tolist()
     
@@ -147,7 +579,7 @@ class PostProcessingEngine:
         Returns:
             Tuple of (class labels array, break points list)
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         if len(values) == 0:
             return values, []
@@ -156,14 +588,14 @@ class PostProcessingEngine:
         percentiles = np.linspace(0, 100, n_classes + 1)
         breaks = np.nanpercentile(values, percentiles)
         
-        # Classify
-        classes = np.digitize(values, breaks[1:-1])
+        # Classify (breaks are increasing, so this matches np.digitize)
+        classes = np.searchsorted(breaks[1:-1], values, side='right')
         
         # Apply labels
         if labels is None:
             labels = [f"Class {i+1}" for i in range(n_classes)]
         
-        class_labels = np.array([labels[min(c, n_classes-1)] for c in classes])
+        class_labels = _label_classes(classes, labels, n_classes)
         
         return class_labels, breaks.tolist()
     
@@ -173,7 +605,10 @@ class PostProcessingEngine:
         """
         Classify using Jenks Natural Breaks.
         
-        Note: Simplified implementation. For production, consider using jenkspy library.
+        Uses a JIT-compiled Fisher-Jenks kernel (requires numba); without
+        numba, or with fewer values than classes, falls back to quantiles.
+        Inputs above JENKS_MAX_VALUES are sampled evenly from the sorted
+        values to bound the O(N^2) cost.
         
         Args:
             values: Input values
@@ -183,9 +618,33 @@ class PostProcessingEngine:
         Returns:
             Tuple of (class labels array, break points list)
         """
-        # For now, fallback to quantiles
-        # TODO: Implement true Jenks or add jenkspy dependency
-        return PostProcessingEngine.classify_quantiles(values, n_classes, labels)
+        values = _as_f64(values)
+        
+        if len(values) == 0:
+            return values, []
+        
+        data = np.sort(values[~np.isnan(values)])
+        
+        if not NUMBA_AVAILABLE or len(data) <= n_classes:
+            return PostProcessingEngine.classify_quantiles(values, n_classes, labels)
+        
+        if len(data) > JENKS_MAX_VALUES:
+            sample_idx = np.linspace(0, len(data) - 1, JENKS_MAX_VALUES).astype(np.int64)
+            data = data[sample_idx]
+        
+        breaks = _jenks_breaks(data, n_classes)
+        
+        # Breaks are class upper limits - values equal to a break belong to
+        # the lower class. NaN falls into the last class, like digitize.
+        classes = np.searchsorted(breaks[1:-1], values, side='left')
+        
+        # Apply labels
+        if labels is None:
+            labels = [f"Class {i+1}" for i in range(n_classes)]
+        
+        class_labels = _label_classes(classes, labels, n_classes)
+        
+        return class_labels, breaks.tolist()
     
     @staticmethod
     def classify_custom(values: np.ndarray, breaks: List[float],
@@ -201,16 +660,21 @@ class PostProcessingEngine:
         Returns:
             Class labels array
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         if len(values) == 0:
             return values
         
-        # Classify
-        classes = np.digitize(values, breaks)
+        # Classify - np.digitize only needed for user breaks given in
+        # decreasing order; searchsorted gives the same bins otherwise
+        breaks = np.asarray(breaks, dtype=float)
+        if np.all(breaks[1:] >= breaks[:-1]):
+            classes = np.searchsorted(breaks, values, side='right')
+        else:
+            classes = np.digitize(values, breaks)
         
         # Apply labels
-        class_labels = np.array([labels[min(c, len(labels)-1)] for c in classes])
+        class_labels = _label_classes(classes, labels, len(labels))
         
         return class_labels
     
@@ -229,16 +693,21 @@ class PostProcessingEngine:
         Returns:
             Rank values (1 to N)
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         if len(values) == 0:
             return values
         
-        # Get sorting order
-        if ascending:
-            order = np.argsort(values)
-        else:
-            order = np.argsort(-values)  # Descending
+        # Get sorting order (ascending, NaN last) - descending ranks read the
+        # non-NaN part backwards instead of sorting a negated copy
+        order = np.argsort(values)
+        n_valid = len(values) - int(np.count_nonzero(np.isnan(values)))
+        
+        if NUMBA_AVAILABLE and len(values) > NUMBA_MIN_SIZE:
+            return _ranks_from_order(order, n_valid, not ascending)
+        
+        if not ascending:
+            order[:n_valid] = order[n_valid - 1::-1] if n_valid else order[:0]
         
         # Assign ranks
         ranks = np.empty_like(order)
@@ -259,25 +728,30 @@ class PostProcessingEngine:
         Returns:
             Percentile ranks (0-100)
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         if len(values) == 0:
             return values
         
-        # Calculate percentile rank for each value
-        percentiles = np.zeros_like(values)
+        if NUMBA_AVAILABLE and len(values) > NUMBA_MIN_SIZE:
+            return _count_below(values).astype(np.float64) * (100.0 / len(values))
+        
+        # Count how many values are below each one: position of the value in
+        # the sorted non-NaN values (side='left' skips ties)
+        nan_mask = np.isnan(values)
+        sorted_vals = np.sort(values[~nan_mask])
+        count_below = np.searchsorted(sorted_vals, values, side='left')
         
-        for i, val in enumerate(values):
-            # Count how many values are below this one
-            count_below = np.sum(values < val)
-            percentiles[i] = (count_below / len(values)) * 100
+        # NaN compares False with everything, so nothing is below it
+        count_below[nan_mask] = 0
         
-        return percentiles
+        return count_below.astype(np.float64) * (100.0 / len(values))
     
     # ========== FLAGGING ==========
     
     @staticmethod
-    def flag_condition(values: np.ndarray, condition: str, threshold: float) -> np.ndarray:
+    def flag_condition(values: np.ndarray, condition: str, threshold: float,
+                       as_int: bool = True) -> np.ndarray:
         """
         Flag values based on a condition.
         
@@ -285,11 +759,13 @@ class PostProcessingEngine:
             values: Input values
             condition: Condition string: '>', '<', '>=', '<=', '==', '!='
             threshold: Threshold value
+            as_int: If False, return the comparison's bool array as-is
+                    (for callers that only mask or count)
             
         Returns:
-            Boolean array (1 = True, 0 = False)
+            uint8 flag array (1 = True, 0 = False), or bool array
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         if len(values) == 0:
             return values
@@ -306,11 +782,16 @@ class PostProcessingEngine:
         elif condition == '==':
             flags = np.isclose(values, threshold)
         elif condition == '!=':
-            flags = ~np.isclose(values, threshold)
+            flags = np.isclose(values, threshold)
+            np.logical_not(flags, out=flags)
         else:
             raise ValueError(f"Unknown condition: {condition}")
         
-        return flags.astype(int)
+        if not as_int:
+            return flags
+        
+        # Comparisons yield a bool array - reinterpret it as 0/1 bytes (no copy)
+        return flags.view(np.uint8)
     
     @staticmethod
     def flag_percentile(values: np.ndarray, top_percent: Optional[float] = None,
@@ -324,24 +805,36 @@ class PostProcessingEngine:
             bottom_percent: Percentage for bottom flag (e.g., 10 for bottom 10%)
             
         Returns:
-            Dict with 'top' and/or 'bottom' flag arrays
+            Dict with 'top' and/or 'bottom' uint8 flag arrays
         """
-        values = np.array(values, dtype=float)
+        values = _as_f64(values)
         
         if len(values) == 0:
             return {}
         
         result = {}
         
+        # Both thresholds from a single nanpercentile call (one partition)
+        quantiles = []
+        if top_percent is not None:
+            quantiles.append(100 - top_percent)
+        if bottom_percent is not None:
+            quantiles.append(bottom_percent)
+        
+        if not quantiles:
+            return result
+        
+        thresholds = list(np.nanpercentile(values, quantiles))
+        
         # Top percentile
         if top_percent is not None:
-            threshold = np.nanpercentile(values, 100 - top_percent)
-            result['top'] = (values >= threshold).astype(int)
+            threshold = thresholds.pop(0)
+            result['top'] = (values >= threshold).view(np.uint8)
         
         # Bottom percentile
         if bottom_percent is not None:
-            threshold = np.nanpercentile(values, bottom_percent)
-            result['bottom'] = (values <= threshold).astype(int)
+            threshold = thresholds.pop(0)
+            result['bottom'] = (values <= threshold).view(np.uint8)
         
         return result
     
@@ -363,14 +856,27 @@ class PostProcessingEngine:
         if not fields_dict:
             return np.array([])
         
-        # Initialize result
-        first_key = list(fields_dict.keys())[0]
+        if NUMBA_AVAILABLE and len(fields_dict) > 1:
+            arrays = [_as_f64(values) for values in fields_dict.values()]
+            n = arrays[0].shape[0] if arrays[0].ndim == 1 else -1
+            
+            if n > NUMBA_MIN_SIZE and all(arr.ndim == 1 and arr.shape[0] == n for arr in arrays):
+                # One fused pass over all fields instead of a multiply + add per field
+                weights = np.array([weights_dict.get(k, 1.0) for k in fields_dict], dtype=float)
+                result = np.empty(n, dtype=float)
+                _weighted_sum_rows(np.stack(arrays), weights, result)
+                return result
+        
+        # Initialize result and one scratch buffer reused for every field
+        first_key = next(iter(fields_dict))
         result = np.zeros_like(fields_dict[first_key], dtype=float)
+        weighted = np.empty_like(result)
         
         # Sum weighted values
         for field_name, values in fields_dict.items():
             weight = weights_dict.get(field_name, 1.0)
-            result += np.array(values, dtype=float) * weight
+            np.multiply(_as_f64(values), weight, out=weighted)
+            np.add(result, weighted, out=result)
         
         return result
     
@@ -387,15 +893,18 @@ class PostProcessingEngine:
         Returns:
             Weighted average array
         """
-        weighted_sum = PostProcessingEngine.weighted_sum(fields_dict, weights_dict)
-        
         # Sum of weights
         total_weight = sum(weights_dict.get(k, 1.0) for k in fields_dict.keys())
         
         if total_weight == 0:
-            return weighted_sum
+            return PostProcessingEngine.weighted_sum(fields_dict, weights_dict)
         
-        return weighted_sum / total_weight
+        # Fold 1 / total_weight into the weights instead of dividing afterwards
+        scaled_weights = {
+            k: weights_dict.get(k, 1.0) / total_weight for k in fields_dict.keys()
+        }
+        
+        return PostProcessingEngine.weighted_sum(fields_dict, scaled_weights)
 
 
 class PostProcessingOperation:
@@ -414,6 +923,11 @@ class PostProcessingOperation:
         self.operation_type = operation_type
         self.config = config
         self.name = config.get('name', 'Unnamed Operation')
+        
+        # Class labels converted to an array once, not on every execution
+        self._labels_arr = None
+        if operation_type == 'classify' and config.get('labels') is not None:
+            self._labels_arr = np.asarray(config['labels'])
     
     def execute(self, layer: QgsVectorLayer, feature: QgsFeature) -> Dict[str, Any]:
         """
@@ -430,6 +944,93 @@ class PostProcessingOperation:
         # For now, placeholder
         return {}
     
+    def execute_batch(self, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Execute operation on all features at once.
+        
+        Args:
+            arrays: Dict of {field_name: values_array}, one element per feature
+            
+        Returns:
+            Dict of {output_field_name: values_array}
+        """
+        config = self.config
+        engine = PostProcessingEngine
+        
+        if self.operation_type == 'combine':
+            weights = config.get('weights', {})
+            fields = {name: arrays[name] for name in weights}
+            if config.get('method', 'sum') == 'average':
+                combined = engine.weighted_average(fields, weights)
+            else:
+                combined = engine.weighted_sum(fields, weights)
+            return {self._output_field('score'): combined}
+        
+        values = arrays[config['field']]
+        method = config.get('method')
+        
+        if self.operation_type == 'normalize':
+            if method == 'zscore':
+                result = engine.normalize_zscore(values)
+            else:
+                result = engine.normalize_minmax(values, tuple(config.get('output_range', (0, 100))))
+            return {self._output_field('norm'): result}
+        
+        if self.operation_type == 'classify':
+            n_classes = config.get('n_classes', 3)
+            labels = self._labels_arr
+            if method == 'custom':
+                result = engine.classify_custom(values, config['breaks'], labels)
+            elif method == 'quantiles':
+                result, _ = engine.classify_quantiles(values, n_classes, labels)
+            elif method == 'jenks':
+                result, _ = engine.classify_jenks(values, n_classes, labels)
+            else:
+                result, _ = engine.classify_equal_intervals(values, n_classes, labels)
+            return {self._output_field('class'): result}
+        
+        if self.operation_type == 'rank':
+            if config.get('percentile', False):
+                return {self._output_field('pct_rank'): engine.percentile_rank(values)}
+            ranks = engine.rank_values(values, config.get('ascending', False))
+            return {self._output_field('rank'): ranks}
+        
+        if self.operation_type == 'flag':
+            if 'condition' in config:
+                flags = engine.flag_condition(values, config['condition'], config['threshold'])
+                return {self._output_field('flag'): flags}
+            
+            flags = engine.flag_percentile(values, config.get('top_percent'), config.get('bottom_percent'))
+            results = {}
+            if 'top' in flags:
+                results[f"is_top_{config['top_percent']}"] = flags['top']
+            if 'bottom' in flags:
+                results[f"is_bottom_{config['bottom_percent']}"] = flags['bottom']
+            return results
+        
+        raise ValueError(f"Unknown operation type: {self.operation_type}")
+    
+    def _output_field(self, suffix: str) -> str:
+        """Output field name from config, or '<field>_<suffix>' by default."""
+        if 'output_field' in self.config:
+            return self.config['output_field']
+        if 'field' in self.config:
+            return f"{self.config['field']}_{suffix}"
+        return suffix
+    
+    def get_input_fields(self) -> List[str]:
+        """
+        Get list of layer fields this operation reads.
+        
+        Returns:
+            List of field names
+        """
+        if self.operation_type == 'combine':
+            return list(self.config.get('weights', {}))
+        if 'field' in self.config:
+            return [self.config['field']]
+        return []
+    
     def get_output_fields(self) -> List[Tuple[str, QVariant]]:
         """
         Get list of output fields this operation will create.
@@ -437,6 +1038,31 @@ class PostProcessingOperation:
         Returns:
             List of (field_name, field_type) tuples
         """
+        config = self.config
+        
+        if self.operation_type == 'combine':
+            return [(self._output_field('score'), QVariant.Double)]
+        if 'field' not in config:
+            return []
+        
+        if self.operation_type == 'normalize':
+            return [(self._output_field('norm'), QVariant.Double)]
+        if self.operation_type == 'classify':
+            return [(self._output_field('class'), QVariant.String)]
+        if self.operation_type == 'rank':
+            if config.get('percentile', False):
+                return [(self._output_field('pct_rank'), QVariant.Double)]
+            return [(self._output_field('rank'), QVariant.Int)]
+        if self.operation_type == 'flag':
+            if 'condition' in config:
+                return [(self._output_field('flag'), QVariant.Int)]
+            fields = []
+            if config.get('top_percent') is not None:
+                fields.append((f"is_top_{config['top_percent']}", QVariant.Int))
+            if config.get('bottom_percent') is not None:
+                fields.append((f"is_bottom_{config['bottom_percent']}", QVariant.Int))
+            return fields
+        
         return []
 
 
@@ -478,25 +1104,75 @@ class PostProcessingManager:
             Success status
         """
         try:
+            # Edit-buffer layers take the changes through the buffer;
+            # otherwise everything goes straight to the data provider
+            editable = layer.isEditable()
+            provider = layer.dataProvider()
+            
             # Add output fields
+            new_fields = []
             for operation in self.operations:
                 output_fields = operation.get_output_fields()
                 for field_name, field_type in output_fields:
                     if layer.fields().indexOf(field_name) == -1:
-                        layer.addAttribute(QgsField(field_name, field_type))
+                        new_fields.append(QgsField(field_name, field_type))
+            
+            if editable:
+                for field in new_fields:
+                    layer.addAttribute(field)
+            elif new_fields:
+                provider.addAttributes(new_fields)
             
             layer.updateFields()
             
-            # Process each feature
-            for feature in layer.getFeatures():
-                for operation in self.operations:
-                    results = operation.execute(layer, feature)
+            # Read all input columns in one pass over the features
+            input_fields = list(dict.fromkeys(
+                name for operation in self.operations for name in operation.get_input_fields()
+            ))
+            feature_ids = []
+            columns = {name: [] for name in input_fields}
+            
+            # Only fetch the input attributes, and skip geometry decoding
+            request = QgsFeatureRequest()
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+            request.setSubsetOfAttributes([
+                idx for idx in (layer.fields().indexOf(name) for name in input_fields)
+                if idx >= 0
+            ])
+            
+            for feature in layer.getFeatures(request):
+                feature_ids.append(feature.id())
+                for name in input_fields:
+                    columns[name].append(_attribute_to_float(feature[name]))
+            
+            arrays = {name: np.array(column, dtype=float) for name, column in columns.items()}
+            
+            # Run each operation over whole columns; outputs are available
+            # as inputs to later operations
+            changes = {fid: {} for fid in feature_ids}
+            fields = layer.fields()
+            
+            for operation in self.operations:
+                results = operation.execute_batch(arrays)
+                
+                for field_name, values in results.items():
+                    arrays[field_name] = values
                     
-                    # Update feature
-                    for field_name, value in results.items():
-                        field_idx = layer.fields().indexOf(field_name)
-                        if field_idx >= 0:
-                            layer.changeAttributeValue(feature.id(), field_idx, value)
+                    field_idx = fields.indexOf(field_name)
+                    if field_idx < 0:
+                        continue
+                    
+                    for fid, value in zip(feature_ids, values.tolist()):
+                        # NaN becomes NULL
+                        changes[fid][field_idx] = None if value != value else value
+            
+            # Update features
+            if editable:
+                for fid, attributes in changes.items():
+                    if attributes:
+                        layer.changeAttributeValues(fid, attributes)
+            elif any(changes.values()):
+                provider.changeAttributeValues(changes)
             
             return True
             
@@ -16,9 +16,345 @@ License: GPL-3.0
 """
 
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from scipy import stats
+from osgeo import gdal
+
+# Optional JIT kernels for the per-polygon reductions
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _series_stats(values):
+        """
+        Mean, population std, min, max, argmin and argmax in one Welford pass.
+        
+        NaN propagates like the NumPy reductions: every statistic is NaN and
+        both indices point at the first NaN.
+        """
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        min_idx = 0
+        max_idx = 0
+        first_nan = -1
+        for i in range(values.shape[0]):
+            v = values[i]
+            if np.isnan(v):
+                if first_nan < 0:
+                    first_nan = i
+            elif v < values[min_idx]:
+                min_idx = i
+            elif v > values[max_idx]:
+                max_idx = i
+            n += 1
+            delta = v - mean
+            mean += delta / n
+            m2 += delta * (v - mean)
+        if first_nan >= 0:
+            return np.nan, np.nan, np.nan, np.nan, first_nan, first_nan
+        return mean, np.sqrt(m2 / n), values[min_idx], values[max_idx], min_idx, max_idx
+    
+    @njit(cache=True, nogil=True)
+    def _gather_mean(window, flat_idx, nodata, tolerance):
+        """
+        Mean and count of the finite pixels window[flat_idx] that are not
+        within tolerance of nodata, without building the filtered array.
+        """
+        total = 0.0
+        count = 0
+        for k in flat_idx:
+            v = float(window[k])
+            if not np.isfinite(v) or abs(v - nodata) <= tolerance:
+                continue
+            total += v
+            count += 1
+        if count == 0:
+            return np.nan, 0
+        return total / count, count
+    
+    @njit(cache=True)
+    def _sorted_pairwise_slopes(x, y):
+        """Sorted slopes (y[i] - y[j]) / (x[i] - x[j]) over all pairs with x[i] > x[j]."""
+        n = x.shape[0]
+        slopes = np.empty(n * (n - 1) // 2)
+        k = 0
+        for i in range(n):
+            for j in range(n):
+                dx = x[i] - x[j]
+                if dx > 0:
+                    slopes[k] = (y[i] - y[j]) / dx
+                    k += 1
+        out = slopes[:k]
+        out.sort()
+        return out
+    
+    @njit(cache=True)
+    def _regression_moments(x, y, x_mean):
+        """Mean of y, Sxy and Syy for a least-squares fit, fused into two passes."""
+        n = y.shape[0]
+        y_sum = 0.0
+        for i in range(n):
+            y_sum += y[i]
+        y_mean = y_sum / n
+        s_xy = 0.0
+        s_yy = 0.0
+        for i in range(n):
+            dy = y[i] - y_mean
+            s_xy += (x[i] - x_mean) * dy
+            s_yy += dy * dy
+        return y_mean, s_xy, s_yy
+
+
+def _valid_mean(window_data: np.ndarray, flat_idx: np.ndarray, nodata) -> tuple:
+    """
+    Mean of a polygon's valid pixels in a raster window.
+    
+    Applies the same NoData, NaN and Inf rules as
+    ZonalCalculator.filter_nodata, but reduces with a validity mask instead
+    of copying the valid pixels out first.
+    
+    Args:
+        window_data (ndarray): Window read from the band
+        flat_idx (ndarray): Flat indices of the polygon pixels in the window
+        nodata: Band NoData value (or None)
+    
+    Returns:
+        tuple: (mean, count) - mean is NaN when count is 0
+    """
+    # NoData closer than the tolerance is dropped; very large NoData
+    # values (like -3.4e38) must match exactly
+    if nodata is None or np.isnan(nodata):
+        nodata, tolerance = np.nan, 0.0
+    else:
+        nodata = float(nodata)
+        tolerance = 0.0 if abs(nodata) > 1e10 else 0.001
+    
+    if NUMBA_AVAILABLE:
+        return _gather_mean(window_data.ravel(), flat_idx, nodata, tolerance)
+    
+    # Pixels stay in the band's native dtype; only the comparisons and the
+    # accumulator are wide
+    values = window_data.ravel().take(flat_idx)
+    is_float = values.dtype.kind == 'f'
+    
+    if np.isnan(nodata):
+        valid = np.isfinite(values) if is_float else np.ones(values.shape, dtype=bool)
+    else:
+        wide = (np.float64, np.float64, np.bool_)
+        valid = np.less(values, nodata - tolerance, signature=wide)
+        valid |= np.greater(values, nodata + tolerance, signature=wide)
+        if is_float:
+            valid &= np.isfinite(values)
+    
+    count = np.count_nonzero(valid)
+    if count == 0:
+        return np.nan, 0
+    
+    # Integer pixels sum exactly in int64
+    acc_dtype = np.float64 if is_float or values.dtype.itemsize > 4 else np.int64
+    return np.add.reduce(values, where=valid, dtype=acc_dtype) / count, count
+
+
+# Normal quantile for the 95% confidence interval of Sen's slope
+_SENS_Z = stats.norm.ppf(0.025)
+
+
+def _tie_term(values: np.ndarray) -> float:
+    """Sum of k(k-1)(2k+5) over groups of k tied values (Sen 1968, eq. 2.6)."""
+    counts = np.unique(values, return_counts=True)[1]
+    return float((counts * (counts - 1) * (2 * counts + 5)).sum())
+
+
+def _sens_slope(x: np.ndarray, y: np.ndarray) -> tuple:
+    """
+    Theil-Sen slope with its 95% confidence interval.
+    
+    Same results as scipy.stats.theilslopes(y, x) with the default
+    'separate' intercept, without building the full pairwise matrices
+    when numba is available.
+    
+    Args:
+        x (ndarray): float64 regressor values
+        y (ndarray): float64 response values
+    
+    Returns:
+        tuple: (slope, intercept, low_slope, high_slope)
+    """
+    n = len(y)
+    if n < 2:
+        # A single point has no defined slope
+        return np.nan, np.nan, np.nan, np.nan
+    
+    if NUMBA_AVAILABLE:
+        slopes = _sorted_pairwise_slopes(x, y)
+    else:
+        dx = x[:, np.newaxis] - x
+        dy = y[:, np.newaxis] - y
+        increasing = dx > 0
+        slopes = np.sort(dy[increasing] / dx[increasing])
+    
+    slope = np.median(slopes)
+    intercept = np.median(y) - slope * np.median(x)
+    
+    # Confidence interval from the variance of Kendall's statistic
+    n_slopes = len(slopes)
+    sigsq = 1 / 18. * (n * (n - 1) * (2 * n + 5) - _tie_term(x) - _tie_term(y))
+    try:
+        sigma = np.sqrt(sigsq)
+        upper = min(int(np.round((n_slopes - _SENS_Z * sigma) / 2.)), n_slopes - 1)
+        lower = max(int(np.round((n_slopes + _SENS_Z * sigma) / 2.)) - 1, 0)
+        low_slope, high_slope = slopes[lower], slopes[upper]
+    except (ValueError, IndexError):
+        low_slope, high_slope = np.nan, np.nan
+    
+    return slope, intercept, low_slope, high_slope
+
+
+def _parse_dates(date_strs: List[str]) -> np.ndarray:
+    """
+    Parse ISO date strings into a datetime64[s] array in one call.
+    
+    Falls back to datetime.fromisoformat for forms NumPy rejects or
+    misreads (NumPy takes a bare '20200501' as a year).
+    """
+    try:
+        dates64 = np.array(date_strs, dtype='datetime64[s]')
+        in_range = (dates64 >= np.datetime64('0001-01-01')) & (dates64 < np.datetime64('10000-01-01'))
+        if in_range.all():
+            return dates64
+    except ValueError:
+        pass
+    
+    return np.array([datetime.fromisoformat(d) for d in date_strs], dtype='datetime64[s]')
+
+
+def _series_summary(values: np.ndarray) -> tuple:
+    """
+    Summary of a series of per-raster means.
+    
+    Returns:
+        tuple: (mean, std, min, max, argmin, argmax)
+    """
+    if NUMBA_AVAILABLE:
+        return _series_stats(values)
+    
+    min_idx = values.argmin()
+    max_idx = values.argmax()
+    return values.mean(), values.std(), values[min_idx], values[max_idx], min_idx, max_idx
+
+
+def _grid_signature(raster_ds) -> tuple:
+    """Key identifying a raster grid: rasters with equal keys share pixel masks."""
+    return (
+        raster_ds.GetGeoTransform(),
+        raster_ds.RasterXSize,
+        raster_ds.RasterYSize,
+        raster_ds.GetProjection()
+    )
+
+
+def _linear_regression(x: np.ndarray, y: np.ndarray, x_mean: float, s_xx: float) -> tuple:
+    """
+    Closed-form least-squares fit of y on x with precomputed x statistics.
+    
+    Matches scipy.stats.linregress (two-sided p-value) without its
+    per-call overhead.
+    
+    Args:
+        x (ndarray): Regressor values
+        y (ndarray): Response values
+        x_mean (float): Mean of x
+        s_xx (float): Sum of squared deviations of x from x_mean
+    
+    Returns:
+        tuple: (slope, intercept, r_value, p_value, std_err)
+    """
+    n = len(y)
+    if n == 1:
+        # A single point has no defined fit
+        return np.nan, np.nan, np.nan, np.nan, np.nan
+    if s_xx == 0:
+        raise ValueError("Cannot calculate a linear regression if all x values are identical")
+    
+    if NUMBA_AVAILABLE:
+        y_mean, s_xy, s_yy = _regression_moments(x, y, x_mean)
+    else:
+        y_mean = y.mean()
+        y_dev = y - y_mean
+        s_xy = np.dot(x - x_mean, y_dev)
+        s_yy = np.dot(y_dev, y_dev)
+    
+    slope = s_xy / s_xx
+    intercept = y_mean - slope * x_mean
+    
+    if s_yy == 0:
+        r = np.nan if s_xy == 0 else 0.0
+    else:
+        r = min(max(s_xy / np.sqrt(s_xx * s_yy), -1.0), 1.0)
+    
+    if n == 2:
+        # Two points always fit exactly
+        p_value = 1.0 if y[0] == y[1] else 0.0
+        std_err = 0.0
+    else:
+        df = n - 2
+        t = r * np.sqrt(df / ((1.0 - r + 1e-20) * (1.0 + r + 1e-20)))
+        p_value = 2 * stats.t.sf(abs(t), df)
+        std_err = np.sqrt((1 - r ** 2) * s_yy / s_xx / df)
+    
+    return slope, intercept, r, p_value, std_err
+
+
+def _linear_regression_columns(x: np.ndarray, y: np.ndarray, x_mean: float, s_xx: float) -> tuple:
+    """
+    Column-wise _linear_regression: fit every column of y on the same x.
+    
+    Args:
+        x (ndarray): Regressor values, shape (n,)
+        y (ndarray): Response values, shape (n, n_series)
+        x_mean (float): Mean of x
+        s_xx (float): Sum of squared deviations of x from x_mean
+    
+    Returns:
+        tuple: (slope, intercept, r_value, p_value, std_err) arrays of shape (n_series,)
+    """
+    n, n_series = y.shape
+    if n == 1:
+        nan = np.full(n_series, np.nan)
+        return nan, nan, nan, nan, nan
+    
+    y_mean = y.mean(axis=0)
+    y_dev = y - y_mean
+    s_xy = (x - x_mean) @ y_dev
+    s_yy = np.einsum('ij,ij->j', y_dev, y_dev)
+    
+    slope = s_xy / s_xx
+    intercept = y_mean - slope * x_mean
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.clip(s_xy / np.sqrt(s_xx * s_yy), -1.0, 1.0)
+    flat = s_yy == 0
+    r[flat] = np.where(s_xy[flat] == 0, np.nan, 0.0)
+    
+    if n == 2:
+        # Two points always fit exactly
+        p_value = np.where(y[0] == y[1], 1.0, 0.0)
+        std_err = np.zeros(n_series)
+    else:
+        df = n - 2
+        t = r * np.sqrt(df / ((1.0 - r + 1e-20) * (1.0 + r + 1e-20)))
+        p_value = 2 * stats.t.sf(np.abs(t), df)
+        std_err = np.sqrt((1 - r ** 2) * s_yy / s_xx / df)
+    
+    return slope, intercept, r, p_value, std_err
 
 
 class TimeSeriesAnalyzer:
@@ -47,16 +383,104 @@ class TimeSeriesAnalyzer:
         """
         self.config = config
         self.name = config['name']
-        self.rasters = sorted(config['rasters'], key=lambda x: x['date'])
         self.analyses = config['analyses']
         self.prefix = config['output_prefix']
         
-        # Parse dates
-        self.dates = [datetime.fromisoformat(r['date']) for r in self.rasters]
+        # Parse dates in bulk and sort rasters chronologically (stable for equal dates)
+        dates64 = _parse_dates([r['date'] for r in config['rasters']])
+        order = np.argsort(dates64, kind='stable')
+        dates64 = dates64[order]
+        self.rasters = [config['rasters'][i] for i in order]
+        self.dates = dates64.tolist()
+        
+        # Indices of rasters that can be read, resolved on first extraction
+        self._valid_rasters = None
         
         # Validate
         if len(self.rasters) == 0:
             raise ValueError("No rasters provided for time series analysis")
+        
+        # Per-raster arrays, indexed by raster position (structure of arrays)
+        self._dates = dates64.astype('datetime64[D]')
+        self._months = (dates64.astype('datetime64[M]').astype(np.int64) % 12 + 1).astype(np.int8)
+        self._date_strs = [r['date'] for r in self.rasters]
+        
+        # Seasonal group index per raster and (mean, count) field names per group
+        month_names = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
+                      'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+        season_of_month = np.array([0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.intp)
+        month_idx = self._months.astype(np.intp) - 1
+        self._seasonal_groups = {
+            'month': (month_idx, [
+                (f'{self.prefix}month_{m}_mean', f'{self.prefix}month_{m}_count')
+                for m in month_names
+            ]),
+            'quarter': (month_idx // 3, [
+                (f'{self.prefix}quarter_q{q}_mean', f'{self.prefix}quarter_q{q}_count')
+                for q in range(1, 5)
+            ]),
+            'season': (season_of_month[month_idx], [
+                (f'{self.prefix}seasonal_{s}_mean', f'{self.prefix}seasonal_{s}_count')
+                for s in ('winter', 'spring', 'summer', 'fall')
+            ])
+        }
+        
+        # Enabled analyses
+        self._change_enabled = self.analyses.get('change_detection', {}).get('enabled', False)
+        self._trend_enabled = self.analyses.get('trend_analysis', {}).get('enabled', False)
+        self._temporal_enabled = self.analyses.get('temporal_statistics', {}).get('enabled', False)
+        self._seasonal_enabled = self.analyses.get('seasonal_analysis', {}).get('enabled', False)
+        self._extremes_enabled = self.analyses.get('extreme_events', {}).get('enabled', False)
+        
+        # Output field names, built once instead of per polygon
+        self._fn = {name: f'{self.prefix}{name}' for name in (
+            'mean_change', 'percent_change', 'first_value', 'last_value',
+            'first_date', 'last_date',
+            'trend_slope', 'trend_intercept', 'trend_r2', 'trend_pvalue', 'trend_stderr',
+            'sens_slope', 'sens_intercept', 'sens_slope_lo', 'sens_slope_up',
+            'temporal_mean', 'temporal_min', 'temporal_max', 'temporal_std', 'temporal_cv',
+            'max_value', 'max_date', 'min_value', 'min_date'
+        )}
+        self._fn_temporal = [
+            f'{self.prefix}temporal_{stat}'
+            for stat in self.analyses.get('temporal_statistics', {}).get('stats', ['mean'])
+        ]
+        
+        # Trend regressor statistics for a polygon covered by every raster
+        self._x = np.arange(len(self.rasters), dtype=np.float64)
+        self._x_mean = self._x.mean()
+        self._s_xx = float(np.dot(self._x - self._x_mean, self._x - self._x_mean))
+        
+        # Analyses to run per polygon, specialized for this configuration
+        self._temporal_stats = frozenset(
+            self.analyses.get('temporal_statistics', {}).get('stats', ['mean'])
+        )
+        self._seasonal_group = self._seasonal_groups.get(
+            self.analyses.get('seasonal_analysis', {}).get('group_by', 'month')
+        )
+        trend_method = self.analyses.get('trend_analysis', {}).get('method', 'linear_regression')
+        
+        # Every result starts from all output fields set to None; steps fill
+        # in what they compute (in place, so the dict never grows)
+        self._results_template = dict.fromkeys(self.get_output_field_names())
+        
+        self._pipeline = []
+        if self._change_enabled:
+            # Only 'First vs Last' is implemented; other compare modes default to it
+            self._pipeline.append(self._change_detection)
+        if self._trend_enabled and trend_method == 'linear_regression':
+            self._pipeline.append(self._trend_linear)
+        if self._trend_enabled and trend_method == 'sens_slope':
+            self._pipeline.append(self._trend_sens)
+        if self._temporal_enabled and self._extremes_enabled:
+            # Both come from the same pass over the means
+            self._pipeline.append(self._temporal_and_extremes)
+        elif self._temporal_enabled:
+            self._pipeline.append(self._temporal_statistics)
+        if self._seasonal_enabled and self._seasonal_group is not None:
+            self._pipeline.append(self._seasonal_analysis)
+        if self._extremes_enabled and not self._temporal_enabled:
+            self._pipeline.append(self._extreme_events)
     
     def analyze(self, polygon, zonal_calculator) -> Dict[str, Any]:
         """
@@ -70,348 +494,546 @@ class TimeSeriesAnalyzer:
             dict: All analysis results
         """
         # Extract temporal data (mean values from all rasters)
-        temporal_data = self._extract_temporal_data(polygon, zonal_calculator)
+        means, indices = self._extract_temporal_data(polygon, zonal_calculator)
         
-        if len(temporal_data) == 0:
+        if len(means) == 0:
             return self._get_empty_results()
         
-        results = {}
+        results = self._results_template.copy()
         
         # Run each enabled analysis
-        if self.analyses.get('change_detection', {}).get('enabled', False):
-            results.update(self._change_detection(temporal_data))
+        for run in self._pipeline:
+            run(means, indices, results)
+        
+        return results
+    
+    def analyze_batch(self, polygons, zonal_calculator, n_workers: int = 1) -> Dict[int, Dict[str, Any]]:
+        """
+        Perform all enabled analyses for many polygons at once.
         
-        if self.analyses.get('trend_analysis', {}).get('enabled', False):
-            results.update(self._trend_analysis(temporal_data))
+        Every raster is opened once for the whole batch, and polygons with
+        data in every raster are analyzed together on a rasters x polygons
+        matrix of means. Results are the same as calling analyze() per polygon.
         
-        if self.analyses.get('temporal_statistics', {}).get('enabled', False):
-            results.update(self._temporal_statistics(temporal_data))
+        Args:
+            polygons: Iterable of QgsFeature polygons
+            zonal_calculator: ZonalCalculator instance to extract raster values
+            n_workers (int): Threads reading rasters in parallel
+        
+        Returns:
+            dict: {feature id: analysis results} in input order
+        """
+        polygons = list(polygons)
+        means = self._extract_temporal_matrix(polygons, zonal_calculator, n_workers)
+        has_data = ~np.isnan(means)
+        complete = has_data.all(axis=0)
         
-        if self.analyses.get('seasonal_analysis', {}).get('enabled', False):
-            results.update(self._seasonal_analysis(temporal_data))
+        results = dict.fromkeys(polygon.id() for polygon in polygons)
         
-        if self.analyses.get('extreme_events', {}).get('enabled', False):
-            results.update(self._extreme_events(temporal_data))
+        # Polygons covered by every raster: vectorized over columns
+        columns = np.flatnonzero(complete)
+        if len(columns):
+            batch_results = self._analyze_matrix(means[:, columns])
+            for j, polygon_results in zip(columns, batch_results):
+                results[polygons[j].id()] = polygon_results
+        
+        # Polygons with gaps: per polygon on the rasters that have data
+        for j in np.flatnonzero(~complete):
+            indices = np.flatnonzero(has_data[:, j])
+            if len(indices) == 0:
+                results[polygons[j].id()] = self._get_empty_results()
+                continue
+            
+            polygon_results = self._results_template.copy()
+            for run in self._pipeline:
+                run(means[indices, j], indices, polygon_results)
+            results[polygons[j].id()] = polygon_results
         
         return results
     
-    def _extract_temporal_data(self, polygon, zonal_calculator) -> List[Dict]:
+    def _extract_temporal_matrix(self, polygons, zonal_calculator, n_workers: int = 1) -> np.ndarray:
+        """
+        Extract mean values from all rasters for a batch of polygons.
+        
+        Polygons are rasterized on the calling thread (QGIS geometry and CRS
+        work); the raster reads and reductions can then run on worker threads,
+        one raster each, as GDAL reads and the mean kernel release the GIL.
+        
+        Args:
+            polygons (list): QgsFeature polygons
+            zonal_calculator: ZonalCalculator instance to rasterize polygons
+            n_workers (int): Threads reading rasters in parallel
+        
+        Returns:
+            ndarray: float64 (n_rasters, n_polygons) means, NaN where a
+                     polygon has no valid pixels in a raster
+        """
+        means = np.full((len(self.rasters), len(polygons)), np.nan)
+        
+        # Raster index -> grid signature, grid signature -> [(window, flat_idx)]
+        raster_grids = {}
+        grid_pixels = {}
+        
+        for i in self._get_valid_rasters():
+            raster_info = self.rasters[i]
+            try:
+                raster_ds = gdal.Open(raster_info['path'])
+                if raster_ds is None:
+                    raise IOError('cannot open raster')
+                grid = _grid_signature(raster_ds)
+            except Exception as e:
+                print(f"Warning: Failed to extract data from {raster_info['path']}: {str(e)}")
+                continue
+            
+            raster_grids[i] = grid
+            if grid in grid_pixels:
+                continue
+            
+            pixels_on_grid = grid_pixels[grid] = []
+            for polygon in polygons:
+                try:
+                    pixels_on_grid.append(self._polygon_pixels(polygon, raster_ds, zonal_calculator))
+                except Exception as e:
+                    print(f"Warning: Failed to extract data from {raster_info['path']}: {str(e)}")
+                    pixels_on_grid.append((None, None))
+        
+        def fill_row(i):
+            self._read_raster_means(self.rasters[i]['path'], grid_pixels[raster_grids[i]], means[i])
+        
+        if n_workers > 1 and len(raster_grids) > 1:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                list(executor.map(fill_row, raster_grids))
+        else:
+            for i in raster_grids:
+                fill_row(i)
+        
+        return means
+    
+    def _read_raster_means(self, path: str, polygon_pixels: List[tuple], row: np.ndarray):
+        """
+        Fill row[j] with the mean of polygon j's valid pixels in one raster.
+        
+        Opens its own dataset handle, so it is safe to run on a worker thread.
+        
+        Args:
+            path (str): Raster path
+            polygon_pixels (list): (window, flat_idx) per polygon on this raster's grid
+            row (ndarray): Output means, left NaN where a polygon has no data
+        """
+        try:
+            raster_ds = gdal.Open(path)
+            if raster_ds is None:
+                raise IOError('cannot open raster')
+            band = raster_ds.GetRasterBand(1)
+            nodata = band.GetNoDataValue()
+        except Exception as e:
+            print(f"Warning: Failed to extract data from {path}: {str(e)}")
+            return
+        
+        for j, (window, flat_idx) in enumerate(polygon_pixels):
+            if window is None:
+                continue
+            
+            try:
+                window_data = band.ReadAsArray(*window)
+                
+                if window_data is None:
+                    continue
+                
+                mean, count = _valid_mean(window_data, flat_idx, nodata)
+                
+                if count:
+                    row[j] = mean
+            
+            except Exception as e:
+                print(f"Warning: Failed to extract data from {path}: {str(e)}")
+    
+    def _analyze_matrix(self, means: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Run the enabled analyses on polygons with data in every raster.
+        
+        Args:
+            means (ndarray): (n_rasters, n_polygons) means without gaps
+        
+        Returns:
+            list: Results dict per polygon (column)
+        """
+        # Field name -> one value per polygon, in pipeline order
+        columns = {}
+        fn = self._fn
+        n_polygons = means.shape[1]
+        
+        for run in self._pipeline:
+            if run in (self._trend_linear, self._trend_sens) and means.shape[0] < 2:
+                # No trend through a single point; fields stay None
+                continue
+            
+            if run == self._change_detection:
+                first = means[0]
+                last = means[-1]
+                change = last - first
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    percent = change / first * 100
+                columns[fn['mean_change']] = change.tolist()
+                columns[fn['percent_change']] = [
+                    p if abs(f) > 1e-10 else None
+                    for p, f in zip(percent.tolist(), first.tolist())
+                ]
+                columns[fn['first_value']] = first.tolist()
+                columns[fn['last_value']] = last.tolist()
+                columns[fn['first_date']] = [self._date_strs[0]] * n_polygons
+                columns[fn['last_date']] = [self._date_strs[-1]] * n_polygons
+            
+            elif run == self._trend_linear:
+                slope, intercept, r_value, p_value, std_err = _linear_regression_columns(
+                    self._x, means, self._x_mean, self._s_xx
+                )
+                columns[fn['trend_slope']] = slope.tolist()
+                columns[fn['trend_intercept']] = intercept.tolist()
+                columns[fn['trend_r2']] = (r_value ** 2).tolist()
+                columns[fn['trend_pvalue']] = p_value.tolist()
+                columns[fn['trend_stderr']] = std_err.tolist()
+            
+            elif run in (self._temporal_statistics, self._extreme_events, self._temporal_and_extremes):
+                cols = np.arange(n_polygons)
+                min_idx = means.argmin(axis=0)
+                max_idx = means.argmax(axis=0)
+                min_val = means[min_idx, cols]
+                max_val = means[max_idx, cols]
+                
+                if run != self._extreme_events:
+                    stats_config = self._temporal_stats
+                    mean_val = means.mean(axis=0)
+                    std_val = means.std(axis=0)
+                    if 'mean' in stats_config:
+                        columns[fn['temporal_mean']] = mean_val.tolist()
+                    if 'min' in stats_config:
+                        columns[fn['temporal_min']] = min_val.tolist()
+                    if 'max' in stats_config:
+                        columns[fn['temporal_max']] = max_val.tolist()
+                    if 'std' in stats_config:
+                        columns[fn['temporal_std']] = std_val.tolist()
+                    if 'cv' in stats_config:
+                        with np.errstate(divide='ignore', invalid='ignore'):
+                            cv = std_val / mean_val * 100
+                        columns[fn['temporal_cv']] = [
+                            c if abs(m) > 1e-10 else None
+                            for c, m in zip(cv.tolist(), mean_val.tolist())
+                        ]
+                
+                if run != self._temporal_statistics:
+                    columns[fn['max_value']] = max_val.tolist()
+                    columns[fn['max_date']] = [self._date_strs[t] for t in max_idx]
+                    columns[fn['min_value']] = min_val.tolist()
+                    columns[fn['min_date']] = [self._date_strs[t] for t in min_idx]
+            
+            elif run == self._seasonal_analysis:
+                group_idx, field_names = self._seasonal_group
+                n_groups = len(field_names)
+                counts = np.bincount(group_idx, minlength=n_groups)
+                sums = np.zeros((n_groups, n_polygons))
+                np.add.at(sums, group_idx, means)
+                for group in np.flatnonzero(counts):
+                    mean_name, count_name = field_names[group]
+                    columns[mean_name] = (sums[group] / counts[group]).tolist()
+                    columns[count_name] = [int(counts[group])] * n_polygons
+            
+            else:
+                # No column form (e.g. Sen's slope): one polygon at a time
+                indices = np.arange(means.shape[0])
+                per_polygon = [{} for _ in range(n_polygons)]
+                for j in range(n_polygons):
+                    run(means[:, j], indices, per_polygon[j])
+                for name in dict.fromkeys(k for r in per_polygon for k in r):
+                    columns[name] = [r.get(name) for r in per_polygon]
+        
+        names = list(columns)
+        rows = []
+        for values in zip(*columns.values()):
+            row = self._results_template.copy()
+            row.update(zip(names, values))
+            rows.append(row)
+        
+        return rows
+    
+    def _extract_temporal_data(self, polygon, zonal_calculator):
         """
         Extract mean values from all rasters for this polygon.
         
+        The polygon is rasterized once per raster grid; every raster on
+        the same grid reuses that window and mask and only reads the window.
+        
         Returns:
-            list: [{'date': datetime, 'mean': float, 'index': int}, ...]
+            tuple: (means, indices) - float64 mean per raster with data, and
+                   the int index of each of those rasters in self.rasters
         """
-        data = []
+        means = []
+        indices = []
+        
+        # Grid signature -> (window, flat_idx), for this call only
+        grid_pixels = {}
         
-        for i, raster_info in enumerate(self.rasters):
+        for i in self._get_valid_rasters():
+            raster_info = self.rasters[i]
             try:
+                raster_ds = gdal.Open(raster_info['path'])
+                if raster_ds is None:
+                    raise IOError('cannot open raster')
+                
+                grid = _grid_signature(raster_ds)
+                if grid not in grid_pixels:
+                    grid_pixels[grid] = self._polygon_pixels(polygon, raster_ds, zonal_calculator)
+                window, flat_idx = grid_pixels[grid]
+                
+                if window is None:
+                    continue
+                
                 # Extract pixels for this raster
-                pixels = zonal_calculator._extract_pixels(raster_info['path'], polygon)
+                band = raster_ds.GetRasterBand(1)
+                window_data = band.ReadAsArray(*window)
                 
-                if pixels is None or len(pixels) == 0:
+                if window_data is None:
                     continue
                 
-                # Calculate mean
-                mean_value = np.mean(pixels)
+                mean, count = _valid_mean(window_data, flat_idx, band.GetNoDataValue())
+                
+                if count == 0:
+                    continue
                 
-                data.append({
-                    'date': self.dates[i],
-                    'mean': float(mean_value),
-                    'index': i,
-                    'date_str': raster_info['date']
-                })
+                means.append(mean)
+                indices.append(i)
             
             except Exception as e:
                 print(f"Warning: Failed to extract data from {raster_info['path']}: {str(e)}")
                 continue
         
-        return data
+        return np.array(means, dtype=np.float64), np.array(indices, dtype=np.intp)
     
-    def _change_detection(self, temporal_data: List[Dict]) -> Dict[str, Any]:
-        """Compare first vs last period."""
-        compare_mode = self.analyses['change_detection'].get('compare', 'First vs Last')
+    def _get_valid_rasters(self) -> List[int]:
+        """
+        Indices of the rasters that open and have a band, checked once.
         
-        if compare_mode == 'First vs Last':
-            first = temporal_data[0]
-            last = temporal_data[-1]
-        else:
-            # Default to first vs last for now
-            first = temporal_data[0]
-            last = temporal_data[-1]
+        Unreadable rasters are reported here a single time and skipped for
+        every polygon afterwards.
+        """
+        if self._valid_rasters is None:
+            self._valid_rasters = []
+            for i, raster_info in enumerate(self.rasters):
+                try:
+                    raster_ds = gdal.Open(raster_info['path'])
+                    if raster_ds is None or raster_ds.RasterCount < 1:
+                        raise IOError('cannot open raster')
+                except Exception as e:
+                    print(f"Warning: Failed to extract data from {raster_info['path']}: {str(e)}")
+                    continue
+                self._valid_rasters.append(i)
+        
+        return self._valid_rasters
+    
+    def _polygon_pixels(self, polygon, raster_ds, zonal_calculator) -> tuple:
+        """
+        Window and flat in-window pixel indices of a polygon on a raster grid.
+        
+        Callers keep the result per grid signature for as long as they need
+        it (one batch, one analyze call), so no mask outlives its polygon.
+        
+        Returns:
+            tuple: (window, flat_idx) or (None, None) if the polygon
+                   can't be rasterized on the grid
+        """
+        window, mask = zonal_calculator.build_polygon_mask(polygon.geometry(), raster_ds)
+        return window, None if mask is None else np.flatnonzero(mask)
+    
+    def _change_detection(self, means: np.ndarray, indices: np.ndarray, results: Dict[str, Any]):
+        """Compare first vs last period."""
+        first = float(means[0])
+        last = float(means[-1])
         
-        change = last['mean'] - first['mean']
+        change = last - first
         
         # Percent change (handle division by zero)
-        if abs(first['mean']) > 1e-10:
-            percent_change = (change / first['mean']) * 100
+        if abs(first) > 1e-10:
+            percent_change = (change / first) * 100
         else:
             percent_change = None
         
-        return {
-            f'{self.prefix}mean_change': change,
-            f'{self.prefix}percent_change': percent_change,
-            f'{self.prefix}first_value': first['mean'],
-            f'{self.prefix}last_value': last['mean'],
-            f'{self.prefix}first_date': first['date_str'],
-            f'{self.prefix}last_date': last['date_str']
-        }
+        fn = self._fn
+        results[fn['mean_change']] = change
+        results[fn['percent_change']] = percent_change
+        results[fn['first_value']] = first
+        results[fn['last_value']] = last
+        results[fn['first_date']] = self._date_strs[indices[0]]
+        results[fn['last_date']] = self._date_strs[indices[-1]]
     
-    def _trend_analysis(self, temporal_data: List[Dict]) -> Dict[str, Any]:
-        """Calculate linear trend."""
-        method = self.analyses['trend_analysis'].get('method', 'linear_regression')
-        
-        # Prepare data
-        x = np.array([d['index'] for d in temporal_data])
-        y = np.array([d['mean'] for d in temporal_data])
+    def _trend_x(self, indices: np.ndarray) -> tuple:
+        """Trend regressor (raster positions), its mean and Sxx."""
+        if len(indices) == len(self.rasters):
+            return self._x, self._x_mean, self._s_xx
         
-        if method == 'linear_regression':
-            # Linear regression
-            try:
-                slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-                
-                return {
-                    f'{self.prefix}trend_slope': float(slope),
-                    f'{self.prefix}trend_intercept': float(intercept),
-                    f'{self.prefix}trend_r2': float(r_value ** 2),
-                    f'{self.prefix}trend_pvalue': float(p_value),
-                    f'{self.prefix}trend_stderr': float(std_err)
-                }
-            except Exception as e:
-                print(f"Trend analysis failed: {str(e)}")
-                return {
-                    f'{self.prefix}trend_slope': None,
-                    f'{self.prefix}trend_r2': None,
-                    f'{self.prefix}trend_pvalue': None
-                }
+        # Some rasters had no data for this polygon
+        x = indices.astype(np.float64)
+        x_mean = x.mean()
+        return x, x_mean, float(np.dot(x - x_mean, x - x_mean))
+    
+    def _trend_linear(self, means: np.ndarray, indices: np.ndarray, results: Dict[str, Any]):
+        """Calculate linear trend by least squares."""
+        if len(means) < 2:
+            # No trend through a single point; fields stay None
+            return
         
-        elif method == 'sens_slope':
-            # Sen's slope (non-parametric)
-            try:
-                from scipy.stats import theilslopes
-                slope, intercept, lo_slope, up_slope = theilslopes(y, x)
-                
-                return {
-                    f'{self.prefix}sens_slope': float(slope),
-                    f'{self.prefix}sens_intercept': float(intercept),
-                    f'{self.prefix}sens_slope_lo': float(lo_slope),
-                    f'{self.prefix}sens_slope_up': float(up_slope)
-                }
-            except Exception as e:
-                print(f"Sen's slope failed: {str(e)}")
-                return {
-                    f'{self.prefix}sens_slope': None
-                }
+        fn = self._fn
+        x, x_mean, s_xx = self._trend_x(indices)
         
-        return {}
+        try:
+            slope, intercept, r_value, p_value, std_err = _linear_regression(x, means, x_mean, s_xx)
+            
+            results[fn['trend_slope']] = float(slope)
+            results[fn['trend_intercept']] = float(intercept)
+            results[fn['trend_r2']] = float(r_value ** 2)
+            results[fn['trend_pvalue']] = float(p_value)
+            results[fn['trend_stderr']] = float(std_err)
+        except Exception as e:
+            print(f"Trend analysis failed: {str(e)}")
+            results[fn['trend_slope']] = None
+            results[fn['trend_r2']] = None
+            results[fn['trend_pvalue']] = None
     
-    def _temporal_statistics(self, temporal_data: List[Dict]) -> Dict[str, Any]:
-        """Calculate statistics over time."""
-        stats_config = self.analyses['temporal_statistics'].get('stats', ['mean'])
+    def _trend_sens(self, means: np.ndarray, indices: np.ndarray, results: Dict[str, Any]):
+        """Calculate Sen's slope (non-parametric trend)."""
+        if len(means) < 2:
+            # No trend through a single point; fields stay None
+            return
         
-        means = np.array([d['mean'] for d in temporal_data])
+        fn = self._fn
+        x = self._trend_x(indices)[0]
         
-        results = {}
+        try:
+            slope, intercept, lo_slope, up_slope = _sens_slope(x, means)
+            
+            results[fn['sens_slope']] = float(slope)
+            results[fn['sens_intercept']] = float(intercept)
+            results[fn['sens_slope_lo']] = float(lo_slope)
+            results[fn['sens_slope_up']] = float(up_slope)
+        except Exception as e:
+            print(f"Sen's slope failed: {str(e)}")
+            results[fn['sens_slope']] = None
+    
+    def _temporal_statistics(self, means: np.ndarray, indices: np.ndarray, results: Dict[str, Any]):
+        """Calculate statistics over time."""
+        self._put_temporal_statistics(_series_summary(means), results)
+    
+    def _temporal_and_extremes(self, means: np.ndarray, indices: np.ndarray, results: Dict[str, Any]):
+        """Temporal statistics and extreme events from a single pass over the means."""
+        summary = _series_summary(means)
+        self._put_temporal_statistics(summary, results)
+        self._put_extremes(summary, indices, results)
+    
+    def _put_temporal_statistics(self, summary: tuple, results: Dict[str, Any]):
+        """Store the configured temporal statistics from a _series_summary tuple."""
+        stats_config = self._temporal_stats
+        fn = self._fn
+        mean_val, std_val, min_val, max_val = summary[:4]
         
         if 'mean' in stats_config:
-            results[f'{self.prefix}temporal_mean'] = float(np.mean(means))
+            results[fn['temporal_mean']] = float(mean_val)
         
         if 'min' in stats_config:
-            results[f'{self.prefix}temporal_min'] = float(np.min(means))
+            results[fn['temporal_min']] = float(min_val)
         
         if 'max' in stats_config:
-            results[f'{self.prefix}temporal_max'] = float(np.max(means))
+            results[fn['temporal_max']] = float(max_val)
         
         if 'std' in stats_config:
-            results[f'{self.prefix}temporal_std'] = float(np.std(means))
+            results[fn['temporal_std']] = float(std_val)
         
         if 'cv' in stats_config:
-            mean_val = np.mean(means)
             if abs(mean_val) > 1e-10:
-                cv = (np.std(means) / mean_val) * 100
-                results[f'{self.prefix}temporal_cv'] = float(cv)
+                cv = (std_val / mean_val) * 100
+                results[fn['temporal_cv']] = float(cv)
             else:
-                results[f'{self.prefix}temporal_cv'] = None
-        
-        return results
+                results[fn['temporal_cv']] = None
     
-    def _seasonal_analysis(self, temporal_data: List[Dict]) -> Dict[str, Any]:
-        """Group by season and calculate means."""
-        group_by = self.analyses['seasonal_analysis'].get('group_by', 'month')
+    def _seasonal_analysis(self, means: np.ndarray, indices: np.ndarray, results: Dict[str, Any]):
+        """Group by month (1-12), quarter (Q1-Q4) or season and calculate means."""
+        group_idx, field_names = self._seasonal_group
+        group_idx = group_idx[indices]
+        n_groups = len(field_names)
         
-        if group_by == 'month':
-            # Group by month (1-12)
-            monthly_groups = {m: [] for m in range(1, 13)}
-            
-            for data in temporal_data:
-                month = data['date'].month
-                monthly_groups[month].append(data['mean'])
-            
-            results = {}
-            month_names = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
-                          'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-            
-            for month, values in monthly_groups.items():
-                if values:
-                    month_name = month_names[month - 1]
-                    results[f'{self.prefix}month_{month_name}_mean'] = float(np.mean(values))
-                    results[f'{self.prefix}month_{month_name}_count'] = len(values)
-            
-            return results
+        sums = np.bincount(group_idx, weights=means, minlength=n_groups)
+        counts = np.bincount(group_idx, minlength=n_groups)
         
-        elif group_by == 'quarter':
-            # Group by quarter (Q1-Q4)
-            quarterly_groups = {1: [], 2: [], 3: [], 4: []}
-            
-            for data in temporal_data:
-                quarter = (data['date'].month - 1) // 3 + 1
-                quarterly_groups[quarter].append(data['mean'])
-            
-            results = {}
-            for quarter, values in quarterly_groups.items():
-                if values:
-                    results[f'{self.prefix}quarter_q{quarter}_mean'] = float(np.mean(values))
-                    results[f'{self.prefix}quarter_q{quarter}_count'] = len(values)
-            
-            return results
-        
-        elif group_by == 'season':
-            # Group by season (Winter, Spring, Summer, Fall)
-            seasonal_groups = {
-                'winter': [],
-                'spring': [],
-                'summer': [],
-                'fall': []
-            }
-            
-            for data in temporal_data:
-                month = data['date'].month
-                
-                if month in [12, 1, 2]:
-                    seasonal_groups['winter'].append(data['mean'])
-                elif month in [3, 4, 5]:
-                    seasonal_groups['spring'].append(data['mean'])
-                elif month in [6, 7, 8]:
-                    seasonal_groups['summer'].append(data['mean'])
-                else:
-                    seasonal_groups['fall'].append(data['mean'])
-            
-            results = {}
-            for season, values in seasonal_groups.items():
-                if values:
-                    results[f'{self.prefix}seasonal_{season}_mean'] = float(np.mean(values))
-                    results[f'{self.prefix}seasonal_{season}_count'] = len(values)
-            
-            return results
-        
-        return {}
+        for group in np.flatnonzero(counts):
+            mean_name, count_name = field_names[group]
+            results[mean_name] = float(sums[group] / counts[group])
+            results[count_name] = int(counts[group])
     
-    def _extreme_events(self, temporal_data: List[Dict]) -> Dict[str, Any]:
+    def _extreme_events(self, means: np.ndarray, indices: np.ndarray, results: Dict[str, Any]):
         """Find extreme values and their dates."""
-        means = [d['mean'] for d in temporal_data]
-        
-        max_idx = np.argmax(means)
-        min_idx = np.argmin(means)
+        min_idx = means.argmin()
+        max_idx = means.argmax()
+        self._put_extremes((None, None, means[min_idx], means[max_idx], min_idx, max_idx), indices, results)
+    
+    def _put_extremes(self, summary: tuple, indices: np.ndarray, results: Dict[str, Any]):
+        """Store extreme values and their dates from a _series_summary tuple."""
+        min_val, max_val, min_idx, max_idx = summary[2:]
         
-        return {
-            f'{self.prefix}max_value': temporal_data[max_idx]['mean'],
-            f'{self.prefix}max_date': temporal_data[max_idx]['date_str'],
-            f'{self.prefix}min_value': temporal_data[min_idx]['mean'],
-            f'{self.prefix}min_date': temporal_data[min_idx]['date_str']
-        }
+        fn = self._fn
+        results[fn['max_value']] = float(max_val)
+        results[fn['max_date']] = self._date_strs[indices[max_idx]]
+        results[fn['min_value']] = float(min_val)
+        results[fn['min_date']] = self._date_strs[indices[min_idx]]
     
     def _get_empty_results(self) -> Dict[str, Any]:
         """Return empty results when no data available."""
-        results = {}
-        
-        # Add None for all possible fields
-        if self.analyses.get('change_detection', {}).get('enabled', False):
-            results.update({
-                f'{self.prefix}mean_change': None,
-                f'{self.prefix}percent_change': None,
-                f'{self.prefix}first_value': None,
-                f'{self.prefix}last_value': None
-            })
-        
-        if self.analyses.get('trend_analysis', {}).get('enabled', False):
-            results.update({
-                f'{self.prefix}trend_slope': None,
-                f'{self.prefix}trend_r2': None,
-                f'{self.prefix}trend_pvalue': None
-            })
-        
-        if self.analyses.get('temporal_statistics', {}).get('enabled', False):
-            stats_config = self.analyses['temporal_statistics'].get('stats', ['mean'])
-            for stat in stats_config:
-                results[f'{self.prefix}temporal_{stat}'] = None
-        
-        return results
+        # None for all possible fields
+        return self._results_template.copy()
     
     def get_output_field_names(self) -> List[str]:
         """Get list of all possible output field names."""
         fields = []
         
-        if self.analyses.get('change_detection', {}).get('enabled', False):
+        if self._change_enabled:
             fields.extend([
-                f'{self.prefix}mean_change',
-                f'{self.prefix}percent_change',
-                f'{self.prefix}first_value',
-                f'{self.prefix}last_value',
-                f'{self.prefix}first_date',
-                f'{self.prefix}last_date'
+                self._fn['mean_change'],
+                self._fn['percent_change'],
+                self._fn['first_value'],
+                self._fn['last_value'],
+                self._fn['first_date'],
+                self._fn['last_date']
             ])
         
-        if self.analyses.get('trend_analysis', {}).get('enabled', False):
+        if self._trend_enabled:
             method = self.analyses['trend_analysis'].get('method', 'linear_regression')
             if method == 'linear_regression':
                 fields.extend([
-                    f'{self.prefix}trend_slope',
-                    f'{self.prefix}trend_intercept',
-                    f'{self.prefix}trend_r2',
-                    f'{self.prefix}trend_pvalue',
-                    f'{self.prefix}trend_stderr'
+                    self._fn['trend_slope'],
+                    self._fn['trend_intercept'],
+                    self._fn['trend_r2'],
+                    self._fn['trend_pvalue'],
+                    self._fn['trend_stderr']
                 ])
             else:
                 fields.extend([
-                    f'{self.prefix}sens_slope',
-                    f'{self.prefix}sens_intercept'
+                    self._fn['sens_slope'],
+                    self._fn['sens_intercept']
                 ])
         
-        if self.analyses.get('temporal_statistics', {}).get('enabled', False):
-            stats_config = self.analyses['temporal_statistics'].get('stats', ['mean'])
-            for stat in stats_config:
-                fields.append(f'{self.prefix}temporal_{stat}')
+        if self._temporal_enabled:
+            fields.extend(self._fn_temporal)
         
-        if self.analyses.get('seasonal_analysis', {}).get('enabled', False):
+        if self._seasonal_enabled:
             group_by = self.analyses['seasonal_analysis'].get('group_by', 'month')
             
-            if group_by == 'month':
-                month_names = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
-                              'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-                for month_name in month_names:
-                    fields.extend([
-                        f'{self.prefix}month_{month_name}_mean',
-                        f'{self.prefix}month_{month_name}_count'
-                    ])
-            elif group_by == 'quarter':
-                for q in range(1, 5):
-                    fields.extend([
-                        f'{self.prefix}quarter_q{q}_mean',
-                        f'{self.prefix}quarter_q{q}_count'
-                    ])
-            elif group_by == 'season':
-                for season in ['winter', 'spring', 'summer', 'fall']:
-                    fields.extend([
-                        f'{self.prefix}seasonal_{season}_mean',
-                        f'{self.prefix}seasonal_{season}_count'
-                    ])
-        
-        if self.analyses.get('extreme_events', {}).get('enabled', False):
+            if group_by in self._seasonal_groups:
+                for mean_name, count_name in self._seasonal_groups[group_by][1]:
+                    fields.extend([mean_name, count_name])
+        
+        if self._extremes_enabled:
             fields.extend([
-                f'{self.prefix}max_value',
-                f'{self.prefix}max_date',
-                f'{self.prefix}min_value',
-                f'{self.prefix}min_date'
+                self._fn['max_value'],
+                self._fn['max_date'],
+                self._fn['min_value'],
+                self._fn['min_date']
             ])
         
         return fields
@@ -13,20 +13,26 @@ License: GPL-3.0
 """
 # FORCE RELOAD MARKER - DO NOT REMOVE
 __RELOAD_TIMESTAMP__ = "2025-12-05"
-print(f"★★★ PROCESSOR.PY LOADED - TIMESTAMP: {__RELOAD_TIMESTAMP__} ★★★")
 import time
 import os
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import numpy as np
 from osgeo import gdal
 from qgis.core import (
     QgsVectorLayer, QgsField, QgsFeature, QgsGeometry,
     QgsVectorFileWriter, QgsCoordinateReferenceSystem,
-    QgsCoordinateTransformContext
+    QgsCoordinateTransformContext, QgsCoordinateTransform, QgsProject,
+    QgsFeatureRequest, QgsRectangle, QgsSpatialIndex, QgsVectorLayerFeatureSource
 )
 from qgis.PyQt.QtCore import QVariant
 from ..utils.logger import Logger
 from .zonal_calculator import ZonalCalculator
-from ..algorithms.post_processing_engine import PostProcessingEngine
+from ..algorithms.post_processing_engine import PostProcessingEngine, attribute_column
+from ..export.csv_exporter import CSVExporter
+from ..export.html_exporter import HTMLExporter
+from ..export.json_exporter import JSONExporter
+from ..export.report_context import ReportContext
 # Advanced features
 try:
     from ..algorithms.custom_algorithm_engine import CustomAlgorithmManager
@@ -36,6 +42,65 @@ except ImportError:
     ADVANCED_FEATURES_AVAILABLE = False
     print("Warning: Advanced features not available (missing algorithms package)")
 
+# Polygons analyzed together per time series batch
+TIME_SERIES_BATCH_SIZE = 500
+
+# Polygons whose statistics are reduced together per raster
+ZONAL_BATCH_SIZE = 500
+
+# Rasters up to this many pixels are read into memory once per run
+# (larger ones are read window by window for each feature)
+MAX_IN_MEMORY_PIXELS = 50_000_000
+
+# Seconds between progress updates while rasters are processed on threads
+RASTER_POLL_INTERVAL = 0.5
+
+# Additional exports that may run at the same time
+MAX_EXPORT_WORKERS = 4
+
+# Additional export formats: (config flag, format name, is a report);
+# reports need elapsed_time and share one ReportContext
+ADDITIONAL_EXPORTS = (
+    ('export_csv', 'CSV', False),
+    ('export_html', 'HTML', True),
+    ('export_pdf', 'PDF', True),
+    ('export_json', 'JSON', False),
+)
+
+
+class _LayerSource:
+    """
+    Read-only view of a layer for one exporter on a worker thread.
+    
+    A QgsVectorLayer must not be iterated from several threads at once,
+    so each export gets its own QgsVectorLayerFeatureSource, created on
+    the main thread; its features are streamed, not copied into memory.
+    Provides the subset of the layer API the exporters use.
+    """
+    
+    def __init__(self, layer):
+        self._name = layer.name()
+        self._crs = layer.crs()
+        self._fields = layer.fields()
+        self._feature_count = layer.featureCount()
+        self._source = QgsVectorLayerFeatureSource(layer)
+    
+    def name(self):
+        return self._name
+    
+    def crs(self):
+        return self._crs
+    
+    def fields(self):
+        return self._fields
+    
+    def featureCount(self):
+        return self._feature_count
+    
+    def getFeatures(self, request=None):
+        return self._source.getFeatures(request or QgsFeatureRequest())
+
+
 class BatchProcessor:
     """
     Batch processor for zonal statistics.
@@ -63,6 +128,9 @@ class BatchProcessor:
         self.processed_polygons = 0
         self.total_polygons = 0
         self.total_rasters = 0
+        self._raster_progress = []  # Polygons computed per raster (worker threads)
+        self._polygon_index = None  # R-tree of polygon bounding boxes
+        self._feature_bboxes = {}  # Polygon bounding boxes by feature id
         
         # Results
         self.errors = []
@@ -126,6 +194,9 @@ class BatchProcessor:
             raster_paths = self.config['raster_paths']
             self.total_rasters = len(raster_paths)
             self.total_polygons = output_layer.featureCount()
+            
+            # Raster base names (field prefixes and log labels), computed once
+            raster_names = [os.path.splitext(os.path.basename(path))[0] for path in raster_paths]
 
             # LOG RASTERS TO BE PROCESSED
             self.logger.info(f"=== RASTERS TO PROCESS ===")
@@ -154,29 +225,22 @@ class BatchProcessor:
 
             self.logger.info("=" * 50)
 
-            for raster_index, raster_path in enumerate(raster_paths):
+            # Check rasters and add all statistic fields before computing
+            rasters = []
+            for raster_index, (raster_path, raster_name) in enumerate(zip(raster_paths, raster_names)):
                 if self.is_cancelled:
                     return self._create_error_result('Processing cancelled')
                 
-                self.current_raster_index = raster_index
-                
-                # Process this raster
-                raster_name = os.path.splitext(os.path.basename(raster_path))[0]
-                self._log_progress(
-                    f'Processing raster {raster_index + 1}/{self.total_rasters}: {raster_name}',
-                    10 + (raster_index / self.total_rasters * 80)
-                )
-                
-                success = self._process_raster(
-                    raster_path,
-                    raster_name,
-                    output_layer
-                )
-                
-                if not success:
+                if self._prepare_raster(raster_path, raster_name, output_layer):
+                    rasters.append((raster_index, raster_path, raster_name))
+                else:
                     self.logger.error(f'Failed to process raster: {raster_name}')
                     self.errors.append(f'Raster {raster_name}: Processing failed')
             
+            # Process rasters (in parallel when several CPU cores are allowed)
+            if not self._process_rasters(rasters, output_layer):
+                return self._create_error_result('Processing cancelled')
+            
             # Step 3.4: Calculate Scores (after all rasters, before time series)
             if self.config.get('score_configs'):
                 self._log_progress('Calculating scores...', 90)
@@ -190,8 +254,9 @@ class BatchProcessor:
                 try:
                     # Add time series fields
                     ts_fields = self.time_series_analyzer.get_output_field_names()
+                    existing_names = {field.name() for field in output_layer.fields()}
                     for field_name in ts_fields:
-                        if output_layer.fields().indexFromName(field_name) == -1:
+                        if field_name not in existing_names:
                             # Determine field type
                             if field_name.endswith('_date'):
                                 output_layer.addAttribute(QgsField(field_name, QVariant.String))
@@ -202,29 +267,43 @@ class BatchProcessor:
                     # Create calculator for time series
                     ts_calculator = ZonalCalculator(self.config)
                     
-                    # Process each polygon
+                    fields = output_layer.fields()
+                    ts_field_indices = {
+                        field_name: fields.indexFromName(field_name)
+                        for field_name in ts_fields
+                    }
+                    
+                    # Process polygons in batches (analyzed together); the
+                    # analysis only needs ids and geometry
                     ts_count = 0
-                    for feature in output_layer.getFeatures():
+                    features = list(output_layer.getFeatures(QgsFeatureRequest().setNoAttributes()))
+                    for start in range(0, len(features), TIME_SERIES_BATCH_SIZE):
                         if self.is_cancelled:
                             break
                         
-                        # Analyze this polygon
-                        ts_results = self.time_series_analyzer.analyze(feature, ts_calculator)
+                        # Analyze this batch of polygons
+                        batch = features[start:start + TIME_SERIES_BATCH_SIZE]
+                        ts_batch_results = self.time_series_analyzer.analyze_batch(
+                            batch, ts_calculator, n_workers=self.config.get('cpu_cores', 1)
+                        )
                         
-                        # Update feature
-                        for field_name, value in ts_results.items():
-                            field_index = output_layer.fields().indexFromName(field_name)
-                            if field_index != -1:
-                                output_layer.changeAttributeValue(feature.id(), field_index, value)
+                        # Update features
+                        pending_changes = {}
+                        for fid, ts_results in ts_batch_results.items():
+                            attributes = pending_changes.setdefault(fid, {})
+                            for field_name, value in ts_results.items():
+                                field_index = ts_field_indices.get(field_name, -1)
+                                if field_index != -1:
+                                    attributes[field_index] = value
+                        self._apply_attribute_changes(output_layer, pending_changes)
                         
-                        ts_count += 1
+                        ts_count += len(batch)
                         
                         # Progress update
-                        if ts_count % 50 == 0:
-                            self._log_progress(
-                                f'Time series: {ts_count}/{self.total_polygons} polygons',
-                                92 + (ts_count / self.total_polygons * 3)
-                            )
+                        self._log_progress(
+                            f'Time series: {ts_count}/{self.total_polygons} polygons',
+                            92 + (ts_count / self.total_polygons * 3)
+                        )
                     
                     
                     
@@ -232,43 +311,23 @@ class BatchProcessor:
                     self.logger.info(f'✓ Time series analysis completed for {ts_count} polygons')
                 
                 except Exception as e:
-                    self.logger.error(f'Time series analysis failed: {str(e)}')
-                    import traceback
-                    self.logger.error(traceback.format_exc()) 
+                    self.logger.exception(f'Time series analysis failed: {str(e)}')
 
             # Step 4: Finalize
             self._log_progress('Finalizing results...', 95)
             self._finalize_output(output_layer)
             
             # Step 5: Export additional formats (if requested)
-            print("=" * 80)
-            print("DEBUG: Checking export flags...")
             export_flags = {
-                'csv': self.config.get('export_csv'),
-                'html': self.config.get('export_html'),
-                'pdf': self.config.get('export_pdf'),
-                'json': self.config.get('export_json')
+                name.lower(): self.config.get(flag)
+                for flag, name, _ in ADDITIONAL_EXPORTS
             }
-            print(f"DEBUG: Export flags = {export_flags}")
-            print(f"DEBUG: Config keys = {list(self.config.keys())}")
-            print(f"DEBUG: export_html value = {self.config.get('export_html')}")
-            print(f"DEBUG: export_html type = {type(self.config.get('export_html'))}")
             self.logger.info(f'Export flags: {export_flags}')
-            print("=" * 80)
-            
-            if any([
-                self.config.get('export_csv'),
-                self.config.get('export_html'),
-                self.config.get('export_pdf'),
-                self.config.get('export_json')
-            ]):
-                print("DEBUG: Starting exports...")
+            
+            if any(export_flags.values()):
                 self._log_progress('Exporting additional formats...', 98)
-                self.logger.info('CALLING _export_additional_formats')
                 self._export_additional_formats(output_layer)
-                self.logger.info('FINISHED _export_additional_formats')
             else:
-                print("DEBUG: No exports selected")
                 self.logger.info('No exports selected - skipping export step')
             
             self._log_progress('Complete!', 100)
@@ -278,9 +337,7 @@ class BatchProcessor:
             return self._create_success_result(output_layer)
             
         except Exception as e:
-            self.logger.error(f'Fatal error during processing: {str(e)}')
-            import traceback
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f'Fatal error during processing: {str(e)}')
             return self._create_error_result(str(e))
 
     def _validate_inputs(self):
@@ -382,6 +439,9 @@ class BatchProcessor:
             return
         
         try:
+            # Names already on the layer, kept up to date as fields are added
+            existing_names = {field.name() for field in output_layer.fields()}
+            
             # Create dummy statistics dict to get all possible custom field names
             dummy_stats = {}
             for stat in statistics:
@@ -393,8 +453,9 @@ class BatchProcessor:
                 custom_agg_results = self.custom_algorithm_manager.calculate_all_aggregated(dummy_stats)
                 if custom_agg_results:
                     for field_name in custom_agg_results.keys():
-                        if output_layer.fields().indexFromName(field_name) == -1:
+                        if field_name not in existing_names:
                             output_layer.addAttribute(QgsField(field_name, QVariant.Double))
+                            existing_names.add(field_name)
                             self.logger.debug(f'Pre-created custom aggregated field: {field_name}')
             except Exception as e:
                 self.logger.warning(f'Could not pre-create custom aggregated fields: {e}')
@@ -406,8 +467,9 @@ class BatchProcessor:
                     custom_pixel_results = self.custom_algorithm_manager.calculate_all_pixel(dummy_pixels)
                     if custom_pixel_results:
                         for field_name in custom_pixel_results.keys():
-                            if output_layer.fields().indexFromName(field_name) == -1:
+                            if field_name not in existing_names:
                                 output_layer.addAttribute(QgsField(field_name, QVariant.Double))
+                                existing_names.add(field_name)
                                 self.logger.debug(f'Pre-created custom pixel field: {field_name}')
                 except Exception as e:
                     self.logger.warning(f'Could not pre-create custom pixel fields: {e}')
@@ -419,9 +481,26 @@ class BatchProcessor:
         except Exception as e:
             self.logger.error(f'Error pre-creating custom fields: {e}')
     
-    def _process_raster(self, raster_path, raster_name, output_layer):
+    def _stat_field_names(self, raster_name, statistics):
         """
-        Process a single raster against all polygons.
+        Output field name of each statistic of a raster.
+        
+        Args:
+            raster_name (str): Base name of raster
+            statistics (list): Statistic names
+            
+        Returns:
+            dict: {stat: '{raster_name}_{stat}'} truncated to 63 characters
+                  (PostgreSQL limit)
+        """
+        return {stat: f'{raster_name}_{stat}'[:63] for stat in statistics}
+    
+    def _prepare_raster(self, raster_path, raster_name, output_layer):
+        """
+        Check a raster and add its statistic fields to the output layer.
+        
+        Runs on the main thread before any statistics are computed, so
+        worker threads never modify the layer schema.
         
         Args:
             raster_path (str): Path to raster file
@@ -429,11 +508,9 @@ class BatchProcessor:
             output_layer (QgsVectorLayer): Output layer
             
         Returns:
-            bool: Success status
+            bool: True if the raster can be processed
         """
         try:
-            # Reset polygon counter for this raster
-            processed_count = 0
             # Open raster with GDAL (force fresh read)
             raster_ds = gdal.Open(raster_path, gdal.GA_ReadOnly)
             if raster_ds is None:
@@ -444,6 +521,7 @@ class BatchProcessor:
             raster_ds.FlushCache()  # <-- Flush DATASET cache, not module
             proj = raster_ds.GetProjection()
             geotransform = raster_ds.GetGeoTransform()
+            raster_ds = None
 
             # Verify we got valid data
             if not proj or len(proj) < 10:
@@ -454,123 +532,228 @@ class BatchProcessor:
             from osgeo import osr
             srs = osr.SpatialReference()
             srs.ImportFromWkt(proj)
-            self.logger.info(f"_process_raster: Raster={os.path.basename(raster_path)}")
+            self.logger.info(f"_prepare_raster: Raster={raster_name}")
             self.logger.info(f"  Full path: {raster_path}")
             self.logger.info(f"  CRS: {srs.GetAuthorityName(None)}:{srs.GetAuthorityCode(None)}")
             self.logger.info(f"  Geotransform: {geotransform}")
-            self.logger.info(f"  Dataset ID: {id(raster_ds)}")
             # Get statistics to calculate
             statistics = self.config['statistics']
             
             # Add fields for this raster's statistics (if they don't exist)
             # Coverage is now treated as a regular statistic (coverage_pct)
-            for stat in statistics:
-                field_name = f'{raster_name}_{stat}'
-                
-                # Truncate field name to 63 characters (PostgreSQL limit)
-                if len(field_name) > 63:
-                    field_name = field_name[:63]
-                
+            existing_names = {field.name() for field in output_layer.fields()}
+            for field_name in self._stat_field_names(raster_name, statistics).values():
                 # Check if field already exists
-                if output_layer.fields().indexFromName(field_name) == -1:
+                if field_name not in existing_names:
                     output_layer.addAttribute(QgsField(field_name, QVariant.Double))
+                    existing_names.add(field_name)
 
             output_layer.updateFields()
             
             # Pre-create ALL custom algorithm fields BEFORE processing loop
             # This prevents updateFields() during iteration which causes data loss
             self._add_custom_fields_upfront(output_layer, raster_name, statistics)
+            return True
             
-            # Create zonal calculator
-            calculator = ZonalCalculator(self.config)
+        except Exception as e:
+            self.logger.exception(f'Error preparing raster {raster_name}: {str(e)}')
+            return False
+    
+    def _process_rasters(self, rasters, output_layer):
+        """
+        Compute statistics for all prepared rasters and write them.
+        
+        Rasters are independent, so with more than one CPU core configured
+        they are computed on worker threads (GDAL releases the GIL while
+        reading). Each worker uses its own calculator and GDAL handles;
+        layer edits and custom algorithms stay on the main thread, which
+        writes each raster's results as soon as it completes.
+        
+        Args:
+            rasters (list): (raster_index, raster_path, raster_name) tuples
+            output_layer (QgsVectorLayer): Output layer
+        
+        Returns:
+            bool: False if processing was cancelled
+        """
+        # Geometry is all the rasters need: fetch it once, without the
+        # attributes, and keep the bboxes for per-raster ordering
+        features = list(output_layer.getFeatures(QgsFeatureRequest().setNoAttributes()))
+        self._feature_bboxes = {feature.id(): feature.geometry().boundingBox() for feature in features}
+        self._raster_progress = [0] * self.total_rasters
+        
+        # R-tree of the cached polygon bboxes, shared by all rasters
+        self._polygon_index = QgsSpatialIndex()
+        for fid, bbox in self._feature_bboxes.items():
+            self._polygon_index.addFeature(fid, bbox)
+        n_workers = min(self.config.get('cpu_cores', 1), len(rasters))
+        
+        if n_workers <= 1:
+            # Read the next raster's band in the background while the
+            # current one is computed and written
+            with ThreadPoolExecutor(max_workers=1) as prefetcher:
+                next_band = prefetcher.submit(self._read_raster_band, rasters[0][1]) if rasters else None
+                
+                for position, (raster_index, raster_path, raster_name) in enumerate(rasters):
+                    if self.is_cancelled:
+                        return False
+                    
+                    raster_data = next_band.result()
+                    next_band = None
+                    if position + 1 < len(rasters):
+                        next_band = prefetcher.submit(self._read_raster_band, rasters[position + 1][1])
+                    
+                    self.current_raster_index = raster_index
+                    self._log_progress(
+                        f'Processing raster {raster_index + 1}/{self.total_rasters}: {raster_name}',
+                        10 + (raster_index / self.total_rasters * 80)
+                    )
+                    
+                    results = self._process_raster(
+                        raster_index, raster_path, raster_name, features, ZonalCalculator(self.config),
+                        report_progress=True, raster_data=raster_data
+                    )
+                    raster_data = None
+                    if results is None:
+                        return False
+                    raster_results, custom_pixels = results
+                    self._write_raster_results(raster_name, features, raster_results, custom_pixels, output_layer)
+            return True
+        
+        self.logger.info(f'Processing {len(rasters)} rasters on {n_workers} threads')
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            pending = {
+                executor.submit(
+                    self._process_raster,
+                    raster_index, raster_path, raster_name, features, ZonalCalculator(self.config)
+                ): (raster_index, raster_path, raster_name)
+                for raster_index, raster_path, raster_name in rasters
+            }
             
-            # Process each polygon
-            processed_count = 0
-            for feature in output_layer.getFeatures():
+            while pending:
+                done, _ = wait(pending, timeout=RASTER_POLL_INTERVAL, return_when=FIRST_COMPLETED)
                 if self.is_cancelled:
                     return False
                 
-                # LOG ÎNAINTE DE APEL
-                self.logger.info(f">>> About to call calculate_for_feature for feature {feature.id()} with raster {os.path.basename(raster_path)}")
-                
-                # Calculate statistics for this feature
-                results = calculator.calculate_for_feature(
-                    feature,
-                    raster_path,
-                    statistics  
-                )
-                
-                # LOG DUPĂ APEL
-                self.logger.info(f"<<< Returned from calculate_for_feature, results: {results}")
+                if not done:
+                    # Keep the progress dialog (and its Cancel button) responsive
+                    computed = sum(self._raster_progress)
+                    self._log_progress(
+                        f'Processing: {computed}/{self.total_polygons * self.total_rasters} polygon-raster pairs',
+                        10 + computed / max(1, self.total_polygons * self.total_rasters) * 80
+                    )
+                    continue
                 
-                # Update feature attributes
-                for stat, value in results.items():
-                    # All statistics use the same naming: {raster_name}_{stat}
-                    field_name = f'{raster_name}_{stat}'
+                for future in done:
+                    raster_index, raster_path, raster_name = pending.pop(future)
+                    results = future.result()
+                    if results is None:
+                        return False
                     
-                    if len(field_name) > 63:
-                        field_name = field_name[:63]
-                    
-                    field_index = output_layer.fields().indexFromName(field_name)
-                    
-                    # DEBUG
-                    self.logger.info(f'>>> Writing {stat}={value} to field "{field_name}", index={field_index}')
-                    
-                    if field_index != -1:
-                        output_layer.changeAttributeValue(feature.id(), field_index, value)
+                    raster_results, custom_pixels = results
+                    self.current_raster_index = raster_index
+                    self._write_raster_results(raster_name, features, raster_results, custom_pixels, output_layer)
+        
+        return True
+    
+    def _process_raster(self, raster_index, raster_path, raster_name, features, calculator,
+                        report_progress=False, raster_data=None):
+        """
+        Calculate statistics of a single raster for all polygons.
+        
+        Safe to run on a worker thread: only reads the given features and
+        opens its own raster dataset. Rasters up to MAX_IN_MEMORY_PIXELS
+        are read once, not once per feature.
+        
+        Args:
+            raster_index (int): Position of the raster in the run
+            raster_path (str): Path to raster file
+            raster_name (str): Base name of raster (for logging)
+            features (list): Polygon features (QgsFeature)
+            calculator (ZonalCalculator): Calculator owned by this raster
+            report_progress (bool): Log progress after each batch (main thread only)
+            raster_data (np.ndarray): Band 1 already read by _read_raster_band (optional)
+        
+        Returns:
+            tuple: (raster_results, custom_pixels) - {feature id: {statistic: value}}
+                   and {feature id: pixel values} for pixel-by-pixel custom
+                   algorithms (both empty if the raster failed), or None if
+                   cancelled
+        """
+        statistics = self.config['statistics']
+        raster_results = {}
+        custom_pixels = {}
+        extract_pixels = bool(
+            self.custom_algorithm_manager and self.custom_algorithm_manager.has_pixel_algorithms()
+        )
+        
+        try:
+            # Read the band once; every feature window is then sliced from memory
+            candidate_ids = None
+            raster_ds = gdal.Open(raster_path, gdal.GA_ReadOnly)
+            if raster_ds is not None:
+                if raster_ds.RasterXSize * raster_ds.RasterYSize <= MAX_IN_MEMORY_PIXELS:
+                    if raster_data is None:
+                        raster_data = raster_ds.GetRasterBand(1).ReadAsArray()
+                else:
+                    # Too large for memory: read windows in block order instead
+                    features = self._sort_by_raster_block(features, raster_ds, calculator.poly_crs)
+                candidate_ids = self._features_in_raster_extent(raster_ds, calculator.poly_crs)
+            
+            # Polygons outside the raster extent can't get pixels - give them
+            # empty results without rasterizing them. The results are only
+            # read when writing, so they share one dict.
+            skipped_count = 0
+            if candidate_ids is not None:
+                empty = calculator.empty_results(statistics)
+                inside = []
+                for feature in features:
+                    if feature.id() in candidate_ids:
+                        inside.append(feature)
                     else:
-                        self.logger.warning(f'>>> Field "{field_name}" NOT FOUND in layer!')
+                        raster_results[feature.id()] = empty
+                skipped_count = len(raster_results)
+                features = inside
+                self.logger.info(f'{len(features)} polygons intersect raster {raster_name}')
+            
+            # Burn the polygons into a few label rasters instead of one mask per polygon
+            zones = None
+            if raster_data is not None:
+                zones = calculator.rasterize_zones(features, raster_ds)
+            if not extract_pixels:
+                raster_ds = None
+            
+            for start in range(0, len(features), ZONAL_BATCH_SIZE):
+                if self.is_cancelled:
+                    return None
                 
+                batch = features[start:start + ZONAL_BATCH_SIZE]
+                self.logger.info(f">>> Calculating {len(batch)} features with raster {raster_name}")
                 
+                # Calculate statistics for this batch of features
+                raster_results.update(calculator.calculate_for_features(
+                    batch,
+                    raster_path,
+                    statistics,
+                    raster_data,
+                    zones
+                ))
                 
-                # === CUSTOM ALGORITHMS ===
-                # MUTAT AFARĂ DIN LOOP!
-                if self.custom_algorithm_manager:
-                    try:
-                        # Build full statistics dict with raster names as keys
-                        full_stats = {}
-                        for stat, value in results.items():
-                            field_name = f'{raster_name}_{stat}'
-                            full_stats[field_name] = value
-                        
-                        # Aggregated algorithms (use full statistics)
-                        custom_agg_results = self.custom_algorithm_manager.calculate_all_aggregated(full_stats)
-                        
-                        if custom_agg_results:
-                            # Fields already pre-created - just update values
-                            for field_name, value in custom_agg_results.items():
-                                field_index = output_layer.fields().indexFromName(field_name)
-                                if field_index != -1:
-                                    output_layer.changeAttributeValue(feature.id(), field_index, value)
-                                else:
-                                    self.logger.warning(f'Custom aggregated field not found: {field_name}')
-                        
-                        # Pixel-by-pixel algorithms
-                        if self.custom_algorithm_manager.has_pixel_algorithms():
-                            pixels = calculator.extract_pixels_for_custom(raster_path, feature)
-                            if pixels is not None and len(pixels) > 0:
-                                pixel_arrays = {raster_name: pixels}
-                                custom_pixel_results = self.custom_algorithm_manager.calculate_all_pixel(pixel_arrays)
-                                
-                                if custom_pixel_results:
-                                    # Fields already pre-created - just update values
-                                    for field_name, value in custom_pixel_results.items():
-                                        field_index = output_layer.fields().indexFromName(field_name)
-                                        if field_index != -1:
-                                            output_layer.changeAttributeValue(feature.id(), field_index, value)
-                                        else:
-                                            self.logger.warning(f'Custom pixel field not found: {field_name}')
-                    
-                    except Exception as e:
-                        self.logger.warning(f"Custom algorithm failed for feature {feature.id()}: {str(e)}")
+                if extract_pixels and raster_ds is not None:
+                    # Pixels for pixel-by-pixel custom algorithms, from the same band and zones
+                    for feature in batch:
+                        pixels = calculator.extract_pixels_for_custom(
+                            feature, raster_ds, raster_data, zones.get(feature.id()) if zones else None
+                        )
+                        if pixels is not None and len(pixels) > 0:
+                            custom_pixels[feature.id()] = pixels
                 
-                processed_count += 1
-                self.processed_polygons += 1
+                processed_count = skipped_count + start + len(batch)
+                self._raster_progress[raster_index] = processed_count
                 
-                # Update progress every 100 polygons
-                if processed_count % 100 == 0:
+                if report_progress:
                     # Calculate correct progress: base_progress + raster_progress
-                    base_progress = 10 + (self.current_raster_index / self.total_rasters * 80)
+                    base_progress = 10 + (raster_index / self.total_rasters * 80)
                     raster_progress = (processed_count / self.total_polygons) * (80 / self.total_rasters)
                     total_progress = base_progress + raster_progress
                     
@@ -579,26 +762,219 @@ class BatchProcessor:
                         total_progress
                     )
             
-            # DON'T commit here - keep editing mode active for next rasters!
-            # Final commit happens after all rasters are processed
+            return raster_results, custom_pixels
+        
+        except Exception as e:
+            self.logger.exception(f'Error processing raster {raster_name}: {str(e)}')
+            self.errors.append(f'Raster {raster_name}: Processing failed')
+            return {}, {}
+    
+    def _read_raster_band(self, raster_path):
+        """
+        Read band 1 of a raster if it fits in memory (MAX_IN_MEMORY_PIXELS).
+        
+        Args:
+            raster_path (str): Path to raster file
             
-            # Close raster and flush dataset cache
-            if raster_ds:
-                raster_ds.FlushCache()  # <-- Pe DATASET, nu pe module
-                del raster_ds
-            raster_ds = None
-
-            self.logger.info(f'Closed raster dataset for: {raster_name}')
+        Returns:
+            np.ndarray: Band data, or None if too large or unreadable
+        """
+        try:
+            raster_ds = gdal.Open(raster_path, gdal.GA_ReadOnly)
+            if raster_ds is None:
+                return None
+            if raster_ds.RasterXSize * raster_ds.RasterYSize > MAX_IN_MEMORY_PIXELS:
+                return None
+            return raster_ds.GetRasterBand(1).ReadAsArray()
+        except Exception as e:
+            self.logger.warning(f'Could not prefetch raster {raster_path}: {e}')
+            return None
+    
+    def _raster_crs(self, raster_ds):
+        """QGIS CRS of a GDAL raster dataset (invalid if it has no projection)."""
+        raster_crs = QgsCoordinateReferenceSystem()
+        raster_crs.createFromWkt(raster_ds.GetProjection())
+        return raster_crs
+    
+    def _sort_by_raster_block(self, features, raster_ds, poly_crs):
+        """
+        Order features by the raster block holding their top-left corner.
+        
+        Used for rasters too large to read at once: consecutive features
+        then read neighbouring windows, so each GDAL block is fetched from
+        disk about once and served from GDAL's block cache afterwards,
+        instead of being re-read for features scattered across the raster.
+        
+        Args:
+            features (list): Polygon features (QgsFeature)
+            raster_ds (gdal.Dataset): Raster dataset
+            poly_crs (QgsCoordinateReferenceSystem): Polygon layer CRS
             
-            self.logger.info(f'✓ Completed processing raster: {raster_name}')
-            return True
+        Returns:
+            list: Features sorted by (block row, block column)
+        """
+        block_xsize, block_ysize = raster_ds.GetRasterBand(1).GetBlockSize()
+        gt = raster_ds.GetGeoTransform()
+        
+        transform = None
+        try:
+            raster_crs = self._raster_crs(raster_ds)
+            if poly_crs and raster_crs.isValid() and poly_crs != raster_crs:
+                transform = QgsCoordinateTransform(poly_crs, raster_crs, QgsProject.instance())
+        except Exception as e:
+            self.logger.warning(f'Could not transform polygons to raster CRS: {e}')
+            return features
+        
+        def block_key(feature):
+            try:
+                bbox = self._feature_bboxes.get(feature.id())
+                if bbox is None:
+                    bbox = feature.geometry().boundingBox()
+                if transform is not None:
+                    bbox = transform.transformBoundingBox(bbox)
+                col = int((bbox.xMinimum() - gt[0]) / gt[1])
+                row = int((bbox.yMaximum() - gt[3]) / gt[5])
+            except Exception:
+                # Untransformable polygons go last
+                return (float('inf'), float('inf'))
+            return (max(row, 0) // block_ysize, max(col, 0) // block_xsize)
+        
+        return sorted(features, key=block_key)
+    
+    def _features_in_raster_extent(self, raster_ds, poly_crs):
+        """
+        Find the polygons whose bounding box intersects a raster's extent.
+        
+        Args:
+            raster_ds (gdal.Dataset): Raster dataset
+            poly_crs (QgsCoordinateReferenceSystem): Polygon layer CRS
             
+        Returns:
+            set: Candidate feature ids, or None if the extent can't be
+                 determined (rotated grid, failed transform) - then every
+                 polygon must be processed
+        """
+        if self._polygon_index is None:
+            return None
+        
+        gt = raster_ds.GetGeoTransform()
+        if gt[2] != 0 or gt[4] != 0:
+            return None
+        
+        xs = (gt[0], gt[0] + raster_ds.RasterXSize * gt[1])
+        ys = (gt[3], gt[3] + raster_ds.RasterYSize * gt[5])
+        extent = QgsRectangle(min(xs), min(ys), max(xs), max(ys))
+        
+        try:
+            raster_crs = self._raster_crs(raster_ds)
+            if poly_crs and raster_crs.isValid() and poly_crs != raster_crs:
+                transform = QgsCoordinateTransform(raster_crs, poly_crs, QgsProject.instance())
+                extent = transform.transformBoundingBox(extent)
+                # The transformed box is built from edge samples - pad it
+                extent.scale(1.01)
         except Exception as e:
-            self.logger.error(f'Error processing raster {raster_name}: {str(e)}')
-            import traceback
-            self.logger.error(traceback.format_exc())
-            return False
+            self.logger.warning(f'Could not compute raster extent in polygon CRS: {e}')
+            return None
+        
+        return set(self._polygon_index.intersects(extent))
+    
+    def _write_raster_results(self, raster_name, features, raster_results, custom_pixels, output_layer):
+        """
+        Write one raster's statistics and custom algorithm results to the layer.
+        
+        Args:
+            raster_name (str): Base name of raster (for field naming)
+            features (list): Polygon features (QgsFeature)
+            raster_results (dict): {feature id: {statistic: value}}
+            custom_pixels (dict): {feature id: pixel values} from _process_raster
+            output_layer (QgsVectorLayer): Output layer
+        """
+        pending_changes = {}
+        
+        # Pixel-by-pixel algorithm inputs, evaluated for all features at once
+        pixel_fids = []
+        pixel_batch = []
+        
+        # Resolve field names and indices once per raster, not per feature
+        field_indices = {field.name(): i for i, field in enumerate(output_layer.fields())}
+        stat_field_names = self._stat_field_names(
+            raster_name, list(self.config['statistics']) + ['coverage_pct']
+        )
+        # Custom algorithms see the untruncated {raster_name}_{stat} names
+        stat_keys = {stat: f'{raster_name}_{stat}' for stat in stat_field_names}
+        
+        for feature in features:
+            fid = feature.id()
+            results = raster_results.get(fid)
+            if results is None:
+                continue
+            
+            attributes = pending_changes.setdefault(fid, {})
+            
+            # Update feature attributes
+            for stat, value in results.items():
+                # All statistics use the same naming: {raster_name}_{stat}
+                field_name = stat_field_names[stat]
+                field_index = field_indices.get(field_name, -1)
+                
+                if field_index != -1:
+                    attributes[field_index] = value
+                else:
+                    self.logger.warning(f'>>> Field "{field_name}" NOT FOUND in layer!')
+            
+            # === CUSTOM ALGORITHMS ===
+            if self.custom_algorithm_manager:
+                try:
+                    # Build full statistics dict with raster names as keys
+                    full_stats = {stat_keys[stat]: value for stat, value in results.items()}
+                    
+                    # Aggregated algorithms (use full statistics)
+                    custom_agg_results = self.custom_algorithm_manager.calculate_all_aggregated(full_stats)
+                    
+                    if custom_agg_results:
+                        # Fields already pre-created - just update values
+                        for field_name, value in custom_agg_results.items():
+                            field_index = field_indices.get(field_name, -1)
+                            if field_index != -1:
+                                attributes[field_index] = value
+                            else:
+                                self.logger.warning(f'Custom aggregated field not found: {field_name}')
+                    
+                    # Pixel-by-pixel algorithms
+                    pixels = custom_pixels.get(fid)
+                    if pixels is not None:
+                        pixel_fids.append(fid)
+                        pixel_batch.append({raster_name: pixels})
+                
+                except Exception as e:
+                    self.logger.warning(f"Custom algorithm failed for feature {fid}: {str(e)}")
+            
+            self.processed_polygons += 1
         
+        if pixel_batch:
+            # One batched (concatenated pixels + offsets) evaluation per raster
+            try:
+                pixel_results = self.custom_algorithm_manager.calculate_all_pixel_batch(pixel_batch)
+            except Exception as e:
+                self.logger.warning(f"Custom pixel algorithms failed for raster {raster_name}: {str(e)}")
+                pixel_results = []
+            
+            for fid, custom_pixel_results in zip(pixel_fids, pixel_results):
+                attributes = pending_changes[fid]
+                # Fields already pre-created - just update values
+                for field_name, value in custom_pixel_results.items():
+                    field_index = field_indices.get(field_name, -1)
+                    if field_index != -1:
+                        attributes[field_index] = value
+                    else:
+                        self.logger.warning(f'Custom pixel field not found: {field_name}')
+        
+        self._apply_attribute_changes(output_layer, pending_changes)
+        
+        # DON'T commit here - keep editing mode active for next rasters!
+        # Final commit happens after all rasters are processed
+        self.logger.info(f'✓ Completed processing raster: {raster_name}')
+    
     def _calculate_scores(self, output_layer):
         """
         Calculate configured scores for all features.
@@ -613,20 +989,88 @@ class BatchProcessor:
         
         self.logger.info(f'Calculating {len(score_configs)} score(s)...')
         
+        # Field name -> index, kept up to date as score fields are added
+        field_index = {field.name(): i for i, field in enumerate(output_layer.fields())}
+        
+        # Read the indicator columns of all scores in one pass over the layer
+        indicator_names = set()
+        for score_config in score_configs:
+            indicator_names.update(score_config['indicators'].keys())
+        feature_ids, columns = self._read_score_columns(output_layer, indicator_names, field_index)
+        
         for score_config in score_configs:
             try:
-                self._calculate_single_score(output_layer, score_config)
+                scores = self._calculate_single_score(
+                    output_layer, score_config, feature_ids, columns, field_index
+                )
+                # Later scores may use this score as an indicator
+                columns[score_config['name']] = scores
                 self.logger.info(f"✓ Score '{score_config['name']}' calculated")
             except Exception as e:
                 self.logger.error(f"Failed to calculate score '{score_config['name']}': {e}")
     
-    def _calculate_single_score(self, layer, score_config):
+    def _read_score_columns(self, layer, field_names, field_index):
+        """
+        Read indicator fields as float columns in one pass over the layer.
+        
+        Args:
+            layer: Vector layer
+            field_names (set): Indicator field names (missing ones are skipped)
+            field_index (dict): {field name: index} of the layer's fields
+            
+        Returns:
+            tuple: (feature_ids, {field_name: np.ndarray}) in feature order;
+                   the columns are views of one (features x fields) float64
+                   matrix, or float32 if that holds every value exactly
+        """
+        field_indices = {
+            field_name: idx
+            for field_name, idx in field_index.items()
+            if field_name in field_names
+        }
+        
+        # Only the indicator attributes, no geometry
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(list(field_indices.values()))
+        
+        feature_ids = []
+        rows = []
+        for feature in layer.getFeatures(request):
+            feature_ids.append(feature.id())
+            rows.append(feature.attributes())
+        
+        # Column-major, so each field's column is contiguous
+        matrix = np.empty((len(rows), len(field_indices)), order='F')
+        for j, field_idx in enumerate(field_indices.values()):
+            # NULL and non-numeric indicator values count as 0
+            matrix[:, j] = attribute_column(list(map(itemgetter(field_idx), rows)), 0.0)
+        
+        # Keep float32 when no value loses precision (e.g. counts, integer
+        # or float32 raster values) - halves what normalization reads
+        compact = matrix.astype(np.float32, order='F')
+        if np.array_equal(compact, matrix, equal_nan=True):
+            matrix = compact
+        
+        columns = {
+            field_name: matrix[:, j]
+            for j, field_name in enumerate(field_indices)
+        }
+        return feature_ids, columns
+    
+    def _calculate_single_score(self, layer, score_config, feature_ids, columns, field_index):
         """
         Calculate a single score for all features.
         
         Args:
             layer: Vector layer
             score_config: Score configuration dict
+            feature_ids (list): Feature ids, in the order of the columns
+            columns (dict): Indicator values from _read_score_columns
+            field_index (dict): {field name: index}; the score field is added
+            
+        Returns:
+            np.ndarray: Score of each feature
         """
         from qgis.core import QgsField
         from qgis.PyQt.QtCore import QVariant
@@ -637,14 +1081,15 @@ class BatchProcessor:
         normalization = score_config.get('normalization', 'Min-Max (0-100)')
         
         # Add score field if doesn't exist
-        if layer.fields().indexOf(score_name) == -1:
+        if score_name not in field_index:
             layer.addAttribute(QgsField(score_name, QVariant.Double))
-        layer.updateFields()
+            layer.updateFields()
+            field_index[score_name] = layer.fields().indexOf(score_name)
         
         # Get field indices
         field_indices = {}
         for field_name in indicators.keys():
-            idx = layer.fields().indexOf(field_name)
+            idx = field_index.get(field_name, -1)
             if idx == -1:
                 self.logger.warning(f"Field '{field_name}' not found in layer")
                 continue
@@ -653,65 +1098,76 @@ class BatchProcessor:
         if not field_indices:
             raise ValueError(f"No valid fields found for score '{score_name}'")
         
-        # Extract all values for normalization
-        field_values = {field: [] for field in field_indices.keys()}
-        feature_ids = []
-        
-        for feature in layer.getFeatures():
-            feature_ids.append(feature.id())
-            for field_name, field_idx in field_indices.items():
-                value = feature[field_idx]
-
-                # Convert QVariant to native Python type
-                if isinstance(value, QVariant):
-                    if value.isNull():
-                        value = None
-                    else:
-                        value = value.value()
-
-                # Convert to float
-                if value is not None:
-                    try:
-                        field_values[field_name].append(float(value))
-                    except (ValueError, TypeError):
-                        # Invalid value - use 0
-                        field_values[field_name].append(0.0)
-                else:
-                    field_values[field_name].append(0.0)
-        
-        # Normalize values
-        normalized_values = {}
+        # Values for normalization; fields added during this run without
+        # values (NULL) count as 0
+        field_values = {
+            field_name: columns[field_name] if field_name in columns else np.zeros(len(feature_ids))
+            for field_name in field_indices
+        }
         
-        if 'Min-Max' in normalization:
-            for field_name, values in field_values.items():
-                normalized_values[field_name] = self.post_processing_engine.normalize_minmax(
-                    np.array(values),
-                    output_range=(0, 100)
-                )
-        elif 'Z-Score' in normalization:
-            for field_name, values in field_values.items():
-                normalized_values[field_name] = self.post_processing_engine.normalize_zscore(
-                    np.array(values)
-                )
+        # Normalize and weight in one pass over a (features x fields)
+        # matrix; stacking rows and transposing keeps each column contiguous
+        if 'Min-Max' in normalization or 'Z-Score' in normalization:
+            matrix = np.stack(list(field_values.values())).T
+            scores = self.post_processing_engine.normalize_and_weight(
+                matrix,
+                [weights.get(field_name, 1.0) for field_name in field_values],
+                method='minmax' if 'Min-Max' in normalization else 'zscore',
+                output_range=(0, 100)
+            )
         else:  # No normalization
-            normalized_values = {k: np.array(v) for k, v in field_values.items()}
-        
-        # Calculate weighted scores
-        scores = self.post_processing_engine.weighted_sum(
-            normalized_values,
-            weights
-        )
+            scores = self.post_processing_engine.weighted_sum(
+                field_values,
+                weights
+            )
         
         # Update features
-        score_field_idx = layer.fields().indexOf(score_name)
+        score_field_idx = field_index[score_name]
+        
+        self._apply_attribute_changes(layer, {
+            feature_id: {score_field_idx: score}
+            for feature_id, score in zip(feature_ids, scores.tolist())
+        })
+        
+        self.logger.info(f"Calculated score '{score_name}' for {len(feature_ids)} features")
+        return scores
+    
+    def _apply_attribute_changes(self, layer, changes):
+        """
+        Write {feature id: {field index: value}} changes in one go.
         
-        for i, feature_id in enumerate(feature_ids):
-            layer.changeAttributeValue(feature_id, score_field_idx, float(scores[i]))
+        Fields added during processing only exist in the layer's edit
+        buffer until commit, so editable layers take one
+        changeAttributeValues call per feature through the buffer, grouped
+        into a single undo command; other layers get a single data
+        provider call.
         
-        self.logger.info(f"Calculated score '{score_name}' for {len(feature_ids)} features")    
+        Args:
+            layer (QgsVectorLayer): Layer to update
+            changes (dict): {feature id: {field index: value}}
+        """
+        if layer.isEditable():
+            layer.beginEditCommand('Zonify results')
+            try:
+                for fid, attributes in changes.items():
+                    if attributes:
+                        layer.changeAttributeValues(fid, attributes)
+            except Exception:
+                layer.destroyEditCommand()
+                raise
+            layer.endEditCommand()
+        elif any(changes.values()):
+            layer.dataProvider().changeAttributeValues(changes)
     
     def _finalize_output(self, output_layer):
-        """Finalize output layer."""
+        """
+        Finalize output layer.
+        
+        Results and scores are written into the layer's edit buffer, so
+        this commit is the only write to the data source: new outputs are
+        GeoPackages, and a modified layer in a text format (GeoJSON,
+        shapefile) is written once here rather than once per feature.
+        """
         if output_layer.isEditable():
             output_layer.commitChanges()
         
@@ -726,122 +1182,95 @@ class BatchProcessor:
         Args:
             output_layer (QgsVectorLayer): Layer with results
         """
-        print("=" * 80)
-        print("DEBUG: _export_additional_formats CALLED!")
         self.logger.info('=== Starting additional format exports ===')
         
-        base_path = self.config.get('output_path', '')
+        config = self.config
+        base_path = config.get('output_path', '')
         if not base_path:
             self.logger.warning('No output path for additional exports')
-            print("DEBUG: No base path - returning")
             return
         
-        print(f"DEBUG: Base path = {base_path}")
+        exporter_classes = {
+            'CSV': CSVExporter,
+            'HTML': HTMLExporter,
+            'JSON': JSONExporter
+        }
+        selected = [
+            (name, is_report)
+            for flag, name, is_report in ADDITIONAL_EXPORTS
+            if config.get(flag)
+        ]
         
-        # Debug: show what's selected
-        self.logger.info(f"Export flags - CSV: {self.config.get('export_csv')}, HTML: {self.config.get('export_html')}, PDF: {self.config.get('export_pdf')}, JSON: {self.config.get('export_json')}")
+        # Imported only when needed - it requires reportlab
+        if config.get('export_pdf'):
+            from ..export.pdf_exporter import PDFExporter
+            exporter_classes['PDF'] = PDFExporter
         
-        # Import exporters
-        from ..export.csv_exporter import CSVExporter
-        from ..export.html_exporter import HTMLExporter
-        from ..export.pdf_exporter import PDFExporter
-        from ..export.json_exporter import JSONExporter
+        # Add elapsed_time to config (once) and read the attributes the
+        # HTML and PDF reports both need in a single pass
+        report_kwargs = {}
+        if any(is_report for _, is_report in selected):
+            config['elapsed_time'] = time.time() - self.start_time
+            report_kwargs['context'] = ReportContext.build(output_layer)
         
-        # CSV Export
-        if self.config.get('export_csv'):
-            self.logger.info('Starting CSV export...')
-            print("DEBUG: Starting CSV export...")
-            try:
-                exporter = CSVExporter()
-                success, path, error = exporter.export(output_layer, base_path, self.config)
-                if success:
-                    self.logger.info(f'✓ CSV exported: {path}')
-                    print(f"DEBUG: CSV success: {path}")
-                else:
-                    self.logger.error(f'✗ CSV export failed: {error}')
-                    print(f"DEBUG: CSV failed: {error}")
-                    self.errors.append(f'CSV: {error}')
-            except Exception as e:
-                self.logger.error(f'✗ CSV export exception: {str(e)}')
-                print(f"DEBUG: CSV exception: {str(e)}")
-                import traceback
-                self.logger.error(traceback.format_exc())
-        
-        # HTML Export
-        if self.config.get('export_html'):
-            self.logger.info('Starting HTML export...')
-            print("DEBUG: Starting HTML export...")
-            try:
-                # Add elapsed_time to config before export
-                elapsed_time = time.time() - self.start_time
-                self.config['elapsed_time'] = elapsed_time
-                
-                exporter = HTMLExporter()
-                success, path, error = exporter.export(output_layer, base_path, self.config)
-                if success:
-                    self.logger.info(f'✓ HTML exported: {path}')
-                    print(f"DEBUG: HTML success: {path}")
-                else:
-                    self.logger.error(f'✗ HTML export failed: {error}')
-                    print(f"DEBUG: HTML failed: {error}")
-                    self.errors.append(f'HTML: {error}')
-            except Exception as e:
-                self.logger.error(f'✗ HTML export exception: {str(e)}')
-                print(f"DEBUG: HTML exception: {str(e)}")
-                import traceback
-                self.logger.error(traceback.format_exc())
-        
-        # PDF Export
-        if self.config.get('export_pdf'):
-            self.logger.info('Starting PDF export...')
-            print("DEBUG: Starting PDF export...")
-            try:
-                # Add elapsed_time to config before export
-                elapsed_time = time.time() - self.start_time
-                self.config['elapsed_time'] = elapsed_time
-                
-                exporter = PDFExporter()
-                success, path, error = exporter.export(output_layer, base_path, self.config)
-                if success:
-                    self.logger.info(f'✓ PDF exported: {path}')
-                    print(f"DEBUG: PDF success: {path}")
-                else:
-                    self.logger.error(f'✗ PDF export failed: {error}')
-                    print(f"DEBUG: PDF failed: {error}")
-                    self.errors.append(f'PDF: {error}')
-            except Exception as e:
-                self.logger.error(f'✗ PDF export exception: {str(e)}')
-                print(f"DEBUG: PDF exception: {str(e)}")
-                import traceback
-                self.logger.error(traceback.format_exc())
+        exports = [
+            (name, exporter_classes[name], report_kwargs if is_report else {})
+            for name, is_report in selected
+        ]
+        
+        if len(exports) <= 1:
+            errors = [
+                self._run_export(name, exporter_class, output_layer, base_path, **kwargs)
+                for name, exporter_class, kwargs in exports
+            ]
         else:
-            self.logger.info('PDF export not selected (checkbox not checked)')
-            print("DEBUG: PDF not selected")
+            # The exports are independent - overlap their I/O and rendering,
+            # each streaming from its own feature source
+            with ThreadPoolExecutor(max_workers=min(MAX_EXPORT_WORKERS, len(exports))) as executor:
+                futures = [
+                    executor.submit(
+                        self._run_export, name, exporter_class, _LayerSource(output_layer), base_path, **kwargs
+                    )
+                    for name, exporter_class, kwargs in exports
+                ]
+            errors = [future.result() for future in futures]
         
-        # JSON Export
-        if self.config.get('export_json'):
-            self.logger.info('Starting JSON export...')
-            print("DEBUG: Starting JSON export...")
-            try:
-                exporter = JSONExporter()
-                success, paths, error = exporter.export(output_layer, base_path, self.config)
-                if success:
-                    for path in paths:
-                        self.logger.info(f'✓ JSON exported: {path}')
-                        print(f"DEBUG: JSON success: {path}")
-                else:
-                    self.logger.error(f'✗ JSON export failed: {error}')
-                    print(f"DEBUG: JSON failed: {error}")
-                    self.errors.append(f'JSON: {error}')
-            except Exception as e:
-                self.logger.error(f'✗ JSON export exception: {str(e)}')
-                print(f"DEBUG: JSON exception: {str(e)}")
-                import traceback
-                self.logger.error(traceback.format_exc())
+        # Record failures in the order of the formats
+        self.errors.extend(error for error in errors if error)
         
-        print("=" * 80)
         self.logger.info('=== Finished additional format exports ===')
     
+    def _run_export(self, name, exporter_class, layer, base_path, **kwargs):
+        """
+        Run one additional format export and log its outcome.
+        
+        Safe to run on a worker thread when given a _LayerSource.
+        
+        Args:
+            name (str): Format name (for logging)
+            exporter_class (type): Exporter class with an export() method
+            layer: Output layer or a _LayerSource of it
+            base_path (str): Output path the export paths are derived from
+            **kwargs: Extra arguments for export() (the reports' context)
+        
+        Returns:
+            str: Error to record, or None
+        """
+        self.logger.info(f'Starting {name} export...')
+        try:
+            exporter = exporter_class()
+            success, paths, error = exporter.export(layer, base_path, self.config, **kwargs)
+            if success:
+                # JSON export returns a list of paths
+                for path in (paths if isinstance(paths, list) else [paths]):
+                    self.logger.info(f'✓ {name} exported: {path}')
+                return None
+            self.logger.error(f'✗ {name} export failed: {error}')
+            return f'{name}: {error}'
+        except Exception as e:
+            self.logger.exception(f'✗ {name} export exception: {str(e)}')
+            return None
+    
     def _log_progress(self, message, percent):
         """
         Log progress and call callback.
@@ -852,6 +1281,9 @@ class BatchProcessor:
         """
         self.logger.info(f'[{percent}%] {message}')
         
+        if not (self.progress_callback or self.progress_dialog):
+            return
+        
         progress_data = {
             'message': message,
             'percent': percent,
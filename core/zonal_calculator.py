@@ -18,12 +18,161 @@ Handles:
 Author: Dragos Gontariu
 License: GPL-3.0
 """
-import os
 from osgeo import gdal, ogr, osr
 import numpy as np
 from qgis.core import QgsGeometry, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject
 from ..utils.logger import Logger
 
+# Optional JIT kernel for batched statistics
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Statistics derived from per-feature count, sum, min, max and variance
+MOMENT_STATISTICS = frozenset([
+    'mean', 'sum', 'min', 'max', 'count', 'range', 'stddev', 'variance', 'cv'
+])
+
+# Moment statistics that need the (second pass) variance
+SPREAD_STATISTICS = frozenset(['stddev', 'variance', 'cv'])
+
+# Statistics derived from one np.unique of the pixel values
+UNIQUE_STATISTICS = frozenset(['mode', 'minority', 'variety'])
+
+# Label rasters burned per raster by rasterize_zones; polygons that don't
+# fit in one of them are rasterized one by one
+MAX_ZONE_GROUPS = 8
+
+# Cell size (pixels) of the occupancy grid used to group polygons
+ZONE_CELL_SIZE = 8
+
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True)
+    def _segment_moments_kernel(values, offsets, sums, mins, maxs, variances, with_variance):
+        """
+        Sum, min, max and (if with_variance) population variance of each
+        non-empty segment values[offsets[i]:offsets[i + 1]].
+        
+        Serial and releases the GIL: rasters are processed on several
+        threads at once, and numba's workqueue threading layer aborts on
+        concurrent calls to a parallel kernel.
+        """
+        for i in range(offsets.shape[0] - 1):
+            start = offsets[i]
+            end = offsets[i + 1]
+            total = 0.0
+            lo = values[start]
+            hi = values[start]
+            for j in range(start, end):
+                v = values[j]
+                total += v
+                if v < lo:
+                    lo = v
+                if v > hi:
+                    hi = v
+            
+            sums[i] = total
+            mins[i] = lo
+            maxs[i] = hi
+            
+            if with_variance:
+                # Second pass around the mean (as np.var) for a stable variance
+                mean = total / (end - start)
+                m2 = 0.0
+                for j in range(start, end):
+                    d = values[j] - mean
+                    m2 += d * d
+                variances[i] = m2 / (end - start)
+
+
+def _segment_moments(values, offsets, with_variance=True):
+    """
+    Reduce pixel values of many features at once.
+    
+    Values keep the raster's native dtype; sums and variances are
+    accumulated in float64.
+    
+    Args:
+        values (np.ndarray): Concatenated pixel values of all features
+        offsets (np.ndarray): int64 segment bounds, feature i owns
+            values[offsets[i]:offsets[i + 1]] (no empty segments)
+        with_variance (bool): Also compute variances (a second pass)
+        
+    Returns:
+        tuple: (sums, mins, maxs, variances) float64 arrays, one per feature;
+               variances are NaN when not computed
+    """
+    n = len(offsets) - 1
+    
+    if NUMBA_AVAILABLE:
+        sums = np.empty(n)
+        mins = np.empty(n)
+        maxs = np.empty(n)
+        variances = np.full(n, np.nan)
+        _segment_moments_kernel(values, offsets, sums, mins, maxs, variances, with_variance)
+        return sums, mins, maxs, variances
+    
+    starts = offsets[:-1]
+    counts = np.diff(offsets)
+    sums = np.add.reduceat(values, starts, dtype=np.float64)
+    mins = np.minimum.reduceat(values, starts).astype(np.float64)
+    maxs = np.maximum.reduceat(values, starts).astype(np.float64)
+    if not with_variance:
+        return sums, mins, maxs, np.full(n, np.nan)
+    deviations = values - np.repeat(sums / counts, counts)
+    variances = np.add.reduceat(deviations * deviations, starts) / counts
+    return sums, mins, maxs, variances
+
+
+def _read_window(band, window, raster_data=None):
+    """
+    Read a (x_off, y_off, width, height) pixel window of a band.
+    
+    Slices the window from raster_data when the band is already in memory,
+    otherwise reads it from disk.
+    """
+    if raster_data is None:
+        return band.ReadAsArray(*window)
+    x_off, y_off, width, height = window
+    return raster_data[y_off:y_off + height, x_off:x_off + width]
+
+
+def _moment_statistic(stat_name, count, total, min_value, max_value, variance):
+    """
+    Derive a statistic from segment moments, rounded like _calculate_statistic.
+    
+    Returns:
+        float: Statistic value (int for count), None if not finite
+    """
+    if stat_name == 'count':
+        return int(count)
+    
+    if stat_name == 'mean':
+        val = total / count
+    elif stat_name == 'sum':
+        val = total
+    elif stat_name == 'min':
+        val = min_value
+    elif stat_name == 'max':
+        val = max_value
+    elif stat_name == 'range':
+        val = max_value - min_value
+    elif stat_name == 'stddev':
+        val = np.sqrt(variance)
+    elif stat_name == 'variance':
+        val = variance
+    else:  # cv
+        mean = total / count
+        if mean == 0 or not np.isfinite(mean):
+            return None
+        val = np.sqrt(variance) / mean * 100
+    
+    val = float(val)
+    return None if not np.isfinite(val) else round(val, 6)
+
 
 class ZonalCalculator:
     """
@@ -81,347 +230,622 @@ class ZonalCalculator:
         
         Args:
             feature (QgsFeature): Polygon feature
-            raster_ds (gdal.Dataset): Raster dataset
+            raster_path (str): Path to raster file
             statistics (list): List of statistic names to calculate
             
         Returns:
             dict: Dictionary of statistic_name: value
         """
-        try:
-            # PRIMUL LOG - să vedem dacă ajunge aici
-            self.logger.info(f"=== ENTER calculate_for_feature: {os.path.basename(raster_path)} ===")
-            # Open fresh dataset
-            raster_ds = gdal.Open(raster_path)
-            if not raster_ds:
-                self.logger.error(f"Failed to open raster: {raster_path}")
-                results = {stat: None for stat in statistics}
-                results['coverage_pct'] = 0.0
-                return results
-                
-            self.logger.info(f"calculate_for_feature OPENED: {os.path.basename(raster_path)}")
-            # === DEBUG: Log what we actually opened ===
-            from osgeo import osr
-            proj_wkt = raster_ds.GetProjection()
-            srs = osr.SpatialReference()
-            srs.ImportFromWkt(proj_wkt)
-            self.logger.info(f"calculate_for_feature OPENED: {os.path.basename(raster_path)}")
-            self.logger.info(f"  WKT snippet: {proj_wkt[:150]}")
-            self.logger.info(f"  GDAL says CRS: {srs.GetAuthorityName(None)}:{srs.GetAuthorityCode(None)}")
-            # Get feature geometry
-            geom = feature.geometry()
+        return self.calculate_for_features([feature], raster_path, statistics)[feature.id()]
+    
+    def calculate_for_features(self, features, raster_path, statistics, raster_data=None, zones=None):
+        """
+        Calculate statistics for many features (polygons) from one raster.
+        
+        Valid pixels of all features are packed into one array with
+        per-feature offsets, and the moment statistics (MOMENT_STATISTICS)
+        of every feature are reduced in a single batched kernel. Order
+        statistics (median, mode, percentiles, ...) are computed per
+        feature from its own pixels.
+        
+        Args:
+            features (list): Polygon features (QgsFeature)
+            raster_path (str): Path to raster file
+            statistics (list): List of statistic names to calculate
+            raster_data (np.ndarray): Band 1 already read in full (optional);
+                feature windows are then sliced from it instead of read
+                from disk
+            zones (dict): Pixels of features from rasterize_zones (optional,
+                needs raster_data); other features are rasterized one by one
+            
+        Returns:
+            dict: {feature id: {statistic_name: value}}
+        """
+        raster_ds = gdal.Open(raster_path)
+        if not raster_ds:
+            self.logger.error(f"Failed to open raster: {raster_path}")
+            return {feature.id(): self.empty_results(statistics) for feature in features}
+        
+        results = {}
+        batched_ids = []
+        batched_coverage = []
+        batched_pixels = []
+        
+        for feature in features:
+            try:
+                zone = zones.get(feature.id()) if zones else None
+                pixel_values, coverage_pct = self._extract_feature(feature, raster_ds, statistics, raster_data, zone)
+            except Exception as e:
+                self.logger.exception(f'Error calculating statistics for feature {feature.id()}: {str(e)}')
+                pixel_values, coverage_pct = None, 0.0
             
-            self.logger.debug(f'Processing feature ID: {feature.id()}')
-            
-            if geom.isEmpty():
-                self.logger.warning(f'Feature {feature.id()} has empty geometry')
-                results = {stat: None for stat in statistics}
-                results['coverage_pct'] = 0.0
-                return results
-            
-            if not geom.isGeosValid():
-                self.logger.warning(f'Feature {feature.id()} has invalid geometry')
-                results = {stat: None for stat in statistics}
-                results['coverage_pct'] = 0.0
-                return results
-            
-            # Log geometry info
-            bbox = geom.boundingBox()
-            self.logger.debug(f'Geometry bbox: {bbox.xMinimum():.6f}, {bbox.yMinimum():.6f}, {bbox.xMaximum():.6f}, {bbox.yMaximum():.6f}')
-            # DEBUG: Log what CRS we think the raster has
-            from osgeo import osr
-            proj = raster_ds.GetProjection()
-            srs = osr.SpatialReference()
-            srs.ImportFromWkt(proj)
-            self.logger.info(f"calculate_for_feature: About to extract pixels, raster CRS={srs.GetAuthorityName(None)}:{srs.GetAuthorityCode(None)}")
-            # Extract pixel values within polygon (now returns tuple)
-            extraction_result = self._extract_pixels(geom, raster_ds, feature.id())
-            # Calculate geometric coverage if requested
-            if extraction_result and 'coverage_pct' in statistics:
-                pixel_values, _ = extraction_result  # Ignore default coverage
-                coverage_pct = self._calculate_geometric_coverage(geom, raster_ds)
-                extraction_result = (pixel_values, coverage_pct)  # Replace with geometric
-
-            # CRITICAL: Check None BEFORE unpacking
-            if extraction_result is None:
-                self.logger.warning(f'Feature {feature.id()}: No pixels extracted (returned None)')
-                # Return coverage 0% for all stats
-                results = {stat: None for stat in statistics}
-                results['coverage_pct'] = 0.0
-                return results
-
-            # Unpack the tuple
-            pixel_values, coverage_pct = extraction_result
-            # DEBUG - handle None safely
-            if coverage_pct is not None:
-                self.logger.info(f'>>> DEBUG: Feature {feature.id()}, coverage_pct = {coverage_pct:.2f}%')
-            else:
-                self.logger.info(f'>>> DEBUG: Feature {feature.id()}, coverage_pct = None')
-            # Check if pixel_values is None
             if pixel_values is None:
-                self.logger.warning(f'Feature {feature.id()}: No valid pixel values')
-                results = {stat: None for stat in statistics}
-                results['coverage_pct'] = self._safe_pct(coverage_pct)
-                return results
-
-            # Check minimum coverage threshold
-            if coverage_pct < self.min_coverage_percent:
-                self.logger.debug(f'Feature {feature.id()}: coverage {coverage_pct:.1f}% below threshold {self.min_coverage_percent}%')
-                results = {stat: None for stat in statistics}
-                results['coverage_pct'] = self._safe_pct(coverage_pct)
-                return results
-
-            if len(pixel_values) == 0:
-                self.logger.warning(f'Feature {feature.id()}: No pixels found (empty array)')
-                results = {stat: None for stat in statistics}
-                results['coverage_pct'] = self._safe_pct(coverage_pct)
-                return results
-            
-            self.logger.debug(f'Feature {feature.id()}: Found {len(pixel_values)} pixels, min={pixel_values.min():.2f}, max={pixel_values.max():.2f}')
-            
-            # Calculate requested statistics
-            # Coverage is handled separately (already calculated from extraction)
-            results = {'coverage_pct': self._safe_pct(coverage_pct)}
+                results[feature.id()] = self.empty_results(statistics, coverage_pct)
+            else:
+                # Placeholder keeps the results in input order
+                results[feature.id()] = None
+                batched_ids.append(feature.id())
+                batched_coverage.append(coverage_pct)
+                batched_pixels.append(pixel_values)
+        
+        raster_ds = None
+        
+        if not batched_ids:
+            return results
+        
+        # Struct-of-arrays layout: pixels of feature i are values[offsets[i]:offsets[i + 1]]
+        counts = np.array([len(pixels) for pixels in batched_pixels], dtype=np.int64)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        values = np.concatenate(batched_pixels)  # Native dtype, float64 accumulators
+        sums, mins, maxs, variances = _segment_moments(
+            values, offsets, with_variance=not SPREAD_STATISTICS.isdisjoint(statistics)
+        )
+        other_statistics = [
+            stat for stat in statistics
+            if stat != 'coverage_pct' and stat not in MOMENT_STATISTICS
+        ]
+        
+        for i, fid in enumerate(batched_ids):
+            feature_results = {'coverage_pct': self._safe_pct(batched_coverage[i])}
+            other_results = self._order_statistics(other_statistics, batched_pixels[i]) if other_statistics else {}
             
             for stat in statistics:
-                # Skip coverage_pct - already added above
                 if stat == 'coverage_pct':
                     continue
-                    
-                value = self._calculate_statistic(stat, pixel_values)
-                results[stat] = value
-                self.logger.debug(f'Feature {feature.id()}: {stat} = {value}')
-
-            # DEBUG - Verifică dacă coverage_pct e în results
-            self.logger.info(f'>>> DEBUG: Final results = {results}')
-            self.logger.info(f'>>> DEBUG: coverage_pct in results? {"coverage_pct" in results}')  
-              
-            del raster_ds
-            return results
+                
+                if stat in MOMENT_STATISTICS:
+                    feature_results[stat] = _moment_statistic(
+                        stat, counts[i], sums[i], mins[i], maxs[i], variances[i]
+                    )
+                else:
+                    feature_results[stat] = other_results[stat]
             
-        except Exception as e:
-            self.logger.error(f'Error calculating statistics for feature {feature.id()}: {str(e)}')
-            import traceback
-            self.logger.error(traceback.format_exc())
-            # Always return coverage_pct to avoid NULL fields
-            results = {stat: None for stat in statistics}
-            results['coverage_pct'] = 0.0
-            return results
+            results[fid] = feature_results
+        
+        return results
     
-    def _extract_pixels(self, geom, raster_ds, fid=None):
+    def _order_statistics(self, statistics, pixel_values):
         """
-        Extract pixel values within a polygon geometry.
-        Uses QGIS coordinate transformation (more reliable than OSR).
+        Calculate the non-moment statistics of one feature together.
+        
+        Median and percentiles share one sort (each lookup then only scans
+        sorted values), mode, minority and variety share one np.unique. Anything else (or
+        a group that fails) goes through _calculate_statistic.
         
         Args:
-            geom (QgsGeometry): Polygon geometry (in polygon layer CRS)
-            raster_ds (gdal.Dataset): Raster dataset
-            fid: Feature ID for logging
+            statistics (list): Statistic names outside MOMENT_STATISTICS
+            pixel_values (np.ndarray): Valid pixel values of the feature
             
         Returns:
-            tuple: (pixel_values, coverage_pct) or (None, 0.0)
+            dict: {statistic_name: value}
         """
-        try:
-            self.logger.info('=== Starting _extract_pixels ===')
-            
-            # Get raster info
-            gt = raster_ds.GetGeoTransform()
-            band = raster_ds.GetRasterBand(1)
-            nodata = band.GetNoDataValue()
-            
-            self.logger.info(f"Raster NoData value: {nodata}")
-            self.logger.info(f"Raster size: {raster_ds.RasterXSize} x {raster_ds.RasterYSize}")
-            
-            # Get raster CRS
-            raster_projection = raster_ds.GetProjection()
-            raster_srs = osr.SpatialReference()
-            raster_srs.ImportFromWkt(raster_projection)
+        results = {}
+        
+        quantile_stats = [
+            stat for stat in statistics
+            if stat == 'median' or (stat.startswith('p') and stat[1:].isdigit())
+        ]
+        if quantile_stats:
+            try:
+                sorted_values = np.sort(pixel_values)
+                for stat in quantile_stats:
+                    if stat == 'median':
+                        val = float(np.median(sorted_values))
+                    else:
+                        val = float(np.percentile(sorted_values, int(stat[1:])))
+                    results[stat] = None if not np.isfinite(val) else round(val, 6)
+            except Exception:
+                for stat in quantile_stats:
+                    results.pop(stat, None)
+        
+        unique_stats = UNIQUE_STATISTICS.intersection(statistics)
+        if unique_stats:
+            try:
+                unique, counts = np.unique(pixel_values, return_counts=True)
+                if 'mode' in unique_stats:
+                    val = float(unique[np.argmax(counts)])
+                    results['mode'] = None if not np.isfinite(val) else round(val, 6)
+                if 'minority' in unique_stats:
+                    # Least frequently occurring value (as _calculate_statistic)
+                    if len(unique) == 0:
+                        results['minority'] = None
+                    elif len(unique) == 1:
+                        results['minority'] = float(unique[0])
+                    else:
+                        results['minority'] = float(unique[np.argmin(counts)])
+                if 'variety' in unique_stats:
+                    results['variety'] = len(unique)
+            except Exception:
+                for stat in unique_stats:
+                    results.pop(stat, None)
+        
+        for stat in statistics:
+            if stat not in results:
+                results[stat] = self._calculate_statistic(stat, pixel_values)
+        
+        return results
+    
+    def empty_results(self, statistics, coverage_pct=0.0):
+        """Results of a feature without valid pixels (coverage_pct is always set)."""
+        results = {stat: None for stat in statistics}
+        results['coverage_pct'] = self._safe_pct(coverage_pct)
+        return results
+    
+    def _extract_feature(self, feature, raster_ds, statistics, raster_data=None, zone=None):
+        """
+        Extract the valid pixel values of a feature from an open raster.
+        
+        Args:
+            feature (QgsFeature): Polygon feature
+            raster_ds (gdal.Dataset): Raster dataset
+            statistics (list): List of statistic names to calculate
+            raster_data (np.ndarray): Band 1 in memory (optional)
+            zone (np.ndarray): Flat pixel indices of the feature from
+                rasterize_zones (optional, needs raster_data)
             
-            # Create QGIS CRS from raster
-            raster_crs = QgsCoordinateReferenceSystem()
-            raster_crs.createFromWkt(raster_projection)
+        Returns:
+            tuple: (pixel_values, coverage_pct) - pixel_values is None when
+                   the feature yields no statistics (empty or invalid geometry,
+                   no valid pixels, coverage below the threshold)
+        """
+        # Get feature geometry
+        geom = feature.geometry()
+        
+        if geom.isEmpty():
+            self.logger.warning(f'Feature {feature.id()} has empty geometry')
+            return None, 0.0
+        
+        if not geom.isGeosValid():
+            self.logger.warning(f'Feature {feature.id()} has invalid geometry')
+            return None, 0.0
+        
+        # Extract pixel values within polygon (now returns tuple)
+        if zone is not None:
+            extraction_result = self._extract_zone_pixels(zone, raster_ds, raster_data)
+        else:
+            extraction_result = self._extract_pixels(geom, raster_ds, feature.id(), raster_data)
+        # Calculate geometric coverage if requested
+        if extraction_result and 'coverage_pct' in statistics:
+            pixel_values, _ = extraction_result  # Ignore default coverage
+            coverage_pct = self._calculate_geometric_coverage(geom, raster_ds, raster_data=raster_data)
+            extraction_result = (pixel_values, coverage_pct)  # Replace with geometric
 
-            if not raster_crs.isValid():
-                self.logger.error('Invalid raster CRS')
-                return None, 0.0
+        # CRITICAL: Check None BEFORE unpacking
+        if extraction_result is None:
+            self.logger.warning(f'Feature {feature.id()}: No pixels extracted (returned None)')
+            # Return coverage 0% for all stats
+            return None, 0.0
 
-            self.logger.info(f'Raster CRS: {raster_crs.authid()}')
-            
-            # Transform geometry if needed
-            transformed_geom = geom
+        # Unpack the tuple
+        pixel_values, coverage_pct = extraction_result
+        # Check if pixel_values is None
+        if pixel_values is None:
+            self.logger.warning(f'Feature {feature.id()}: No valid pixel values')
+            return None, coverage_pct
+
+        # Check minimum coverage threshold
+        if coverage_pct < self.min_coverage_percent:
+            return None, coverage_pct
+
+        if len(pixel_values) == 0:
+            self.logger.warning(f'Feature {feature.id()}: No pixels found (empty array)')
+            return None, coverage_pct
+        
+        return pixel_values, coverage_pct
+    
+    
+    def build_polygon_mask(self, geom, raster_ds):
+        """
+        Rasterize a polygon onto the grid of a raster.
+        
+        The result depends only on the raster grid (geotransform, size, CRS),
+        so it can be reused for every raster sharing that grid.
+        
+        Args:
+            geom (QgsGeometry): Polygon geometry (in polygon layer CRS)
+            raster_ds (gdal.Dataset): Raster dataset defining the grid
             
-            if self.poly_crs and self.poly_crs != raster_crs:
-                self.logger.info(f'Transforming polygon from {self.poly_crs.authid()} to {raster_crs.authid()}')
-                
-                transform = QgsCoordinateTransform(
-                    self.poly_crs,
-                    raster_crs,
-                    QgsProject.instance()
-                )
-                
-                transformed_geom = QgsGeometry(geom)
-                result = transformed_geom.transform(transform)
-                
-                if result != 0:
-                    self.logger.error(f'Transformation failed with code: {result}')
-                    return None, 0.0
-                
-                bbox_transformed = transformed_geom.boundingBox()
-                self.logger.info(f'Transformed bbox: X=[{bbox_transformed.xMinimum():.2f}, {bbox_transformed.xMaximum():.2f}], Y=[{bbox_transformed.yMinimum():.2f}, {bbox_transformed.yMaximum():.2f}]')
+        Returns:
+            tuple: (window, mask) - window is (x_off, y_off, width, height)
+                   in pixels, mask a bool array of shape (height, width);
+                   (None, None) if the polygon can't be rasterized on the grid
+        """
+        gt = raster_ds.GetGeoTransform()
+        
+        # Get raster CRS
+        raster_projection = raster_ds.GetProjection()
+        raster_srs = osr.SpatialReference()
+        raster_srs.ImportFromWkt(raster_projection)
+        
+        # Create QGIS CRS from raster
+        raster_crs = QgsCoordinateReferenceSystem()
+        raster_crs.createFromWkt(raster_projection)
+
+        if not raster_crs.isValid():
+            self.logger.error('Invalid raster CRS')
+            return None, None
+        
+        # Transform geometry if needed
+        transformed_geom = geom
+        
+        if self.poly_crs and self.poly_crs != raster_crs:
+            transform = QgsCoordinateTransform(
+                self.poly_crs,
+                raster_crs,
+                QgsProject.instance()
+            )
             
-            # Convert to OGR geometry
-            ogr_geom = ogr.CreateGeometryFromWkt(transformed_geom.asWkt())
+            transformed_geom = QgsGeometry(geom)
+            result = transformed_geom.transform(transform)
             
-            if ogr_geom is None:
-                self.logger.error('Failed to create OGR geometry')
-                return None, 0.0
+            if result != 0:
+                self.logger.error(f'Transformation failed with code: {result}')
+                return None, None
+        
+        # Convert to OGR geometry
+        ogr_geom = ogr.CreateGeometryFromWkt(transformed_geom.asWkt())
+        
+        if ogr_geom is None:
+            self.logger.error('Failed to create OGR geometry')
+            return None, None
+        
+        # Get envelope
+        env = ogr_geom.GetEnvelope()
+        minx, maxx, miny, maxy = env
+        
+        # Convert to pixel coordinates
+        px_min = int((minx - gt[0]) / gt[1])
+        px_max = int((maxx - gt[0]) / gt[1]) + 1
+        py_min = int((maxy - gt[3]) / gt[5])
+        py_max = int((miny - gt[3]) / gt[5]) + 1
+        
+        # Clip to raster bounds
+        px_min = max(0, px_min)
+        py_min = max(0, py_min)
+        px_max = min(raster_ds.RasterXSize, px_max)
+        py_max = min(raster_ds.RasterYSize, py_max)
+        
+        width = px_max - px_min
+        height = py_max - py_min
+        
+        if width <= 0 or height <= 0:
+            self.logger.warning(f'Empty pixel window ({width}x{height})')
+            return None, None
+        
+        # Create mask raster
+        mem_driver = gdal.GetDriverByName('MEM')
+        mask_ds = mem_driver.Create('', width, height, 1, gdal.GDT_Byte)
+        
+        # Set geotransform for mask
+        mask_gt = [
+            gt[0] + px_min * gt[1],
+            gt[1],
+            0,
+            gt[3] + py_min * gt[5],
+            0,
+            gt[5]
+        ]
+        mask_ds.SetGeoTransform(mask_gt)
+        mask_ds.SetProjection(raster_projection)
+        
+        # Rasterize geometry
+        mask_band = mask_ds.GetRasterBand(1)
+        mask_band.Fill(0)
+        
+        # Create temp vector layer
+        mem_vector_ds = ogr.GetDriverByName('Memory').CreateDataSource('')
+        mem_layer = mem_vector_ds.CreateLayer('mask', srs=raster_srs)
+        
+        layer_defn = mem_layer.GetLayerDefn()
+        ogr_feature = ogr.Feature(layer_defn)
+        ogr_feature.SetGeometry(ogr_geom)
+        mem_layer.CreateFeature(ogr_feature)
+        
+        # Rasterize with ALL_TOUCHED
+        err = gdal.RasterizeLayer(
+            mask_ds, 
+            [1], 
+            mem_layer, 
+            burn_values=[1],
+            options=['ALL_TOUCHED=TRUE']
+        )
+        
+        if err != 0:
+            self.logger.error(f'Rasterize error: {err}')
+            return None, None
+        
+        # Read mask
+        mask = mask_band.ReadAsArray()
+        
+        if mask is None:
+            self.logger.error('Failed to read mask')
+            return None, None
+        
+        # Cleanup
+        mask_ds = None
+        mem_vector_ds = None
+        ogr_geom = None
+        
+        return (px_min, py_min, width, height), mask == 1
+    
+    def rasterize_zones(self, features, raster_ds):
+        """
+        Rasterize many polygons onto the grid of a raster with few GDAL calls.
+        
+        Polygons are split into groups whose pixel windows don't overlap,
+        and each group is burned into one label raster (label = position in
+        the group, ALL_TOUCHED as build_polygon_mask). Overlapping or
+        neighbouring polygons sharing boundary pixels land in different
+        groups, so every polygon gets the same pixels as its own mask.
+        
+        Args:
+            features (list): Polygon features (QgsFeature)
+            raster_ds (gdal.Dataset): Raster dataset defining the grid
             
-            # Get envelope
-            env = ogr_geom.GetEnvelope()
-            minx, maxx, miny, maxy = env
+        Returns:
+            dict: {feature id: flat int64 pixel indices, row-major}; features
+                  left out must be rasterized one by one (build_polygon_mask)
+        """
+        gt = raster_ds.GetGeoTransform()
+        x_size = raster_ds.RasterXSize
+        y_size = raster_ds.RasterYSize
+        
+        if gt[2] != 0 or gt[4] != 0:
+            # Rotated grid: pixel windows can't be derived from envelopes
+            return {}
+        
+        raster_projection = raster_ds.GetProjection()
+        raster_srs = osr.SpatialReference()
+        raster_srs.ImportFromWkt(raster_projection)
+        
+        raster_crs = QgsCoordinateReferenceSystem()
+        raster_crs.createFromWkt(raster_projection)
+        
+        if not raster_crs.isValid():
+            return {}
+        
+        transform = None
+        if self.poly_crs and self.poly_crs != raster_crs:
+            transform = QgsCoordinateTransform(self.poly_crs, raster_crs, QgsProject.instance())
+        
+        # Greedy grouping on a coarse occupancy grid: windows (grown by one
+        # pixel for edge-touching pixels) of one group never share a cell
+        grid_shape = ((y_size - 1) // ZONE_CELL_SIZE + 1, (x_size - 1) // ZONE_CELL_SIZE + 1)
+        occupancy = []
+        groups = []
+        
+        for feature in features:
+            geom = feature.geometry()
+            if geom.isEmpty() or not geom.isGeosValid():
+                continue
             
-            # Convert to pixel coordinates
-            px_min = int((minx - gt[0]) / gt[1])
-            px_max = int((maxx - gt[0]) / gt[1]) + 1
-            py_min = int((maxy - gt[3]) / gt[5])
-            py_max = int((miny - gt[3]) / gt[5]) + 1
+            if transform is not None:
+                geom = QgsGeometry(geom)
+                if geom.transform(transform) != 0:
+                    continue
             
-            # Clip to raster bounds
-            px_min = max(0, px_min)
-            py_min = max(0, py_min)
-            px_max = min(raster_ds.RasterXSize, px_max)
-            py_max = min(raster_ds.RasterYSize, py_max)
+            ogr_geom = ogr.CreateGeometryFromWkt(geom.asWkt())
+            if ogr_geom is None:
+                continue
             
-            width = px_max - px_min
-            height = py_max - py_min
+            # Same pixel window as build_polygon_mask
+            minx, maxx, miny, maxy = ogr_geom.GetEnvelope()
+            px_min = max(0, int((minx - gt[0]) / gt[1]))
+            px_max = min(x_size, int((maxx - gt[0]) / gt[1]) + 1)
+            py_min = max(0, int((maxy - gt[3]) / gt[5]))
+            py_max = min(y_size, int((miny - gt[3]) / gt[5]) + 1)
             
-            self.logger.info(f'Pixel window: x={px_min}, y={py_min}, size={width}x{height}')
+            if px_max <= px_min or py_max <= py_min:
+                continue
             
-            if width <= 0 or height <= 0:
-                self.logger.warning(f'Empty pixel window ({width}x{height})')
-                return None, 0.0
+            cells = (
+                slice(max(0, py_min - 1) // ZONE_CELL_SIZE, py_max // ZONE_CELL_SIZE + 1),
+                slice(max(0, px_min - 1) // ZONE_CELL_SIZE, px_max // ZONE_CELL_SIZE + 1)
+            )
             
-            # Read raster data
-            data = band.ReadAsArray(px_min, py_min, width, height)
+            for group_index, occupied in enumerate(occupancy):
+                if not occupied[cells].any():
+                    break
+            else:
+                if len(occupancy) == MAX_ZONE_GROUPS:
+                    continue
+                occupancy.append(np.zeros(grid_shape, dtype=bool))
+                groups.append([])
+                group_index = len(groups) - 1
             
-            if data is None:
-                self.logger.error('Failed to read raster data')
-                return None, 0.0
+            occupancy[group_index][cells] = True
+            groups[group_index].append((feature.id(), ogr_geom, (px_min, py_min, px_max, py_max)))
+        
+        if not groups:
+            return {}
+        
+        label_ds = gdal.GetDriverByName('MEM').Create('', x_size, y_size, 1, gdal.GDT_Int32)
+        label_ds.SetGeoTransform(gt)
+        label_ds.SetProjection(raster_projection)
+        label_band = label_ds.GetRasterBand(1)
+        
+        zones = {}
+        
+        for group in groups:
+            label_band.Fill(0)
             
-            # Create mask raster
-            mem_driver = gdal.GetDriverByName('MEM')
-            mask_ds = mem_driver.Create('', width, height, 1, gdal.GDT_Byte)
-            
-            # Set geotransform for mask
-            mask_gt = [
-                gt[0] + px_min * gt[1],
-                gt[1],
-                0,
-                gt[3] + py_min * gt[5],
-                0,
-                gt[5]
-            ]
-            mask_ds.SetGeoTransform(mask_gt)
-            mask_ds.SetProjection(raster_projection)
-            
-            # Rasterize geometry
-            mask_band = mask_ds.GetRasterBand(1)
-            mask_band.Fill(0)
-            
-            # Create temp vector layer
             mem_vector_ds = ogr.GetDriverByName('Memory').CreateDataSource('')
-            mem_layer = mem_vector_ds.CreateLayer('mask', srs=raster_srs)
-            
+            mem_layer = mem_vector_ds.CreateLayer('zones', srs=raster_srs)
+            mem_layer.CreateField(ogr.FieldDefn('zone', ogr.OFTInteger))
             layer_defn = mem_layer.GetLayerDefn()
-            ogr_feature = ogr.Feature(layer_defn)
-            ogr_feature.SetGeometry(ogr_geom)
-            mem_layer.CreateFeature(ogr_feature)
             
-            # Rasterize with ALL_TOUCHED
+            for label, (_, ogr_geom, _) in enumerate(group, start=1):
+                ogr_feature = ogr.Feature(layer_defn)
+                ogr_feature.SetGeometry(ogr_geom)
+                ogr_feature.SetField('zone', label)
+                mem_layer.CreateFeature(ogr_feature)
+            
             err = gdal.RasterizeLayer(
-                mask_ds, 
-                [1], 
-                mem_layer, 
-                burn_values=[1],
-                options=['ALL_TOUCHED=TRUE']
+                label_ds,
+                [1],
+                mem_layer,
+                options=['ATTRIBUTE=zone', 'ALL_TOUCHED=TRUE']
             )
+            mem_vector_ds = None
             
             if err != 0:
                 self.logger.error(f'Rasterize error: {err}')
+                continue
+            
+            labels = label_band.ReadAsArray().ravel()
+            
+            # Group labelled pixels by label; a stable sort keeps each
+            # polygon's pixels in row-major order, as data[mask]
+            pixels = np.flatnonzero(labels)
+            pixel_labels = labels[pixels]
+            pixels = pixels[np.argsort(pixel_labels, kind='stable')]
+            counts = np.bincount(pixel_labels, minlength=len(group) + 1)[1:]
+            
+            for (fid, _, window), zone in zip(group, np.split(pixels, np.cumsum(counts)[:-1])):
+                # Drop pixels touched just outside the window build_polygon_mask reads
+                px_min, py_min, px_max, py_max = window
+                rows, cols = np.divmod(zone, x_size)
+                inside = (rows >= py_min) & (rows < py_max) & (cols >= px_min) & (cols < px_max)
+                zones[fid] = zone if inside.all() else zone[inside]
+        
+        label_ds = None
+        return zones
+    
+    def filter_nodata(self, masked_data, nodata):
+        """
+        Drop NoData, NaN and Inf values from extracted pixels.
+        
+        Args:
+            masked_data (np.ndarray): Pixel values inside the polygon
+            nodata: Band NoData value (or None)
+            
+        Returns:
+            np.ndarray: Valid pixel values
+        """
+        # Filter NoData values CORRECTLY
+        if nodata is not None:
+            # Handle different data types and NoData representations
+            if np.isnan(nodata):
+                # NoData is NaN
+                valid_mask = ~np.isnan(masked_data)
+            else:
+                # Convert both to float for reliable comparison
+                masked_data_float = masked_data.astype(np.float64)
+                nodata_float = float(nodata)
+                
+                # Use tolerance for float comparison
+                # For NoData=255 or other integer values, tolerance should be small
+                if abs(nodata_float) > 1e10:  # Very large NoData (like -3.4e38)
+                    valid_mask = masked_data_float != nodata_float
+                else:  # Normal NoData values
+                    valid_mask = ~np.isclose(masked_data_float, nodata_float, rtol=0, atol=0.001)
+            
+            # Also filter NaN and Inf (integer pixels are always finite)
+            if not np.issubdtype(masked_data.dtype, np.integer):
+                valid_mask = valid_mask & np.isfinite(masked_data)
+            
+            return masked_data[valid_mask]
+        
+        # No NoData value - just filter NaN/Inf
+        if np.issubdtype(masked_data.dtype, np.integer):
+            return masked_data
+        return masked_data[np.isfinite(masked_data)]
+    
+    def _extract_pixels(self, geom, raster_ds, fid=None, raster_data=None):
+        """
+        Extract pixel values within a polygon geometry.
+        Uses QGIS coordinate transformation (more reliable than OSR).
+        
+        Args:
+            geom (QgsGeometry): Polygon geometry (in polygon layer CRS)
+            raster_ds (gdal.Dataset): Raster dataset
+            fid: Feature ID for logging
+            raster_data (np.ndarray): Band 1 in memory (optional)
+            
+        Returns:
+            tuple: (pixel_values, coverage_pct) or (None, 0.0)
+        """
+        try:
+            # Get raster info
+            band = raster_ds.GetRasterBand(1)
+            nodata = band.GetNoDataValue()
+            
+            # Rasterize polygon onto the raster grid
+            window, mask = self.build_polygon_mask(geom, raster_ds)
+            
+            if window is None:
                 return None, 0.0
             
-            # Read mask
-            mask = mask_band.ReadAsArray()
+            # Read raster data
+            data = _read_window(band, window, raster_data)
             
-            if mask is None:
-                self.logger.error('Failed to read mask')
+            if data is None:
+                self.logger.error('Failed to read raster data')
                 return None, 0.0
             
             # Extract pixels
-            masked_data = data[mask == 1]
-            
-            self.logger.info(f'Pixels in mask: {len(masked_data)}')
+            masked_data = data[mask]
             
             if len(masked_data) == 0:
                 self.logger.warning('No pixels in mask')
                 return None, 0.0
             
             # === CRITICAL FIX: PROPER NoData FILTERING ===
-            import numpy as np
-            
-            # Filter NoData values CORRECTLY
-            if nodata is not None:
-                # Handle different data types and NoData representations
-                if np.isnan(nodata):
-                    # NoData is NaN
-                    valid_mask = ~np.isnan(masked_data)
-                else:
-                    # Convert both to float for reliable comparison
-                    masked_data_float = masked_data.astype(np.float64)
-                    nodata_float = float(nodata)
-                    
-                    # Use tolerance for float comparison
-                    # For NoData=255 or other integer values, tolerance should be small
-                    if abs(nodata_float) > 1e10:  # Very large NoData (like -3.4e38)
-                        valid_mask = masked_data_float != nodata_float
-                    else:  # Normal NoData values
-                        valid_mask = ~np.isclose(masked_data_float, nodata_float, rtol=0, atol=0.001)
-                
-                # Also filter NaN and Inf
-                valid_mask = valid_mask & np.isfinite(masked_data.astype(np.float64))
-                
-                masked_values = masked_data[valid_mask]
-            else:
-                # No NoData value - just filter NaN/Inf
-                masked_values = masked_data[np.isfinite(masked_data.astype(np.float64))]
-            
-            self.logger.info(f'Valid pixels after NoData filtering: {len(masked_values)}')
+            masked_values = self.filter_nodata(masked_data, nodata)
             
             if len(masked_values) == 0:
                 self.logger.warning('No valid pixels after filtering NoData')
                 return None, 0.0
             
-            # Log statistics
-            self.logger.info(f'Extracted pixels: {len(masked_values)}')
-            self.logger.info(f'  Unique values: {np.unique(masked_values)[:20]}')  # First 20
-            self.logger.info(f'  Range: {masked_values.min():.4f} - {masked_values.max():.4f}')
-            self.logger.info(f'  Mean: {masked_values.mean():.4f}')
-            self.logger.info(f'  Sum: {masked_values.sum():.2f}')
-            
-            # Cleanup
-            mask_ds = None
-            mem_vector_ds = None
-            ogr_geom = None
-            
             # Return pixels and default coverage (will be recalculated if needed)
             return masked_values, 0.0
             
         except Exception as e:
-            self.logger.error(f'Error extracting pixels: {str(e)}')
-            import traceback
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f'Error extracting pixels: {str(e)}')
+            return None, 0.0
+        
+    def _extract_zone_pixels(self, zone, raster_ds, raster_data):
+        """
+        Pixel values of a rasterize_zones zone, filtered as in _extract_pixels.
+        
+        Returns:
+            tuple: (pixel_values, coverage_pct) or (None, 0.0)
+        """
+        if len(zone) == 0:
+            return None, 0.0
+        
+        masked_values = self.filter_nodata(
+            raster_data.ravel()[zone],
+            raster_ds.GetRasterBand(1).GetNoDataValue()
+        )
+        
+        if len(masked_values) == 0:
             return None, 0.0
         
-    def _calculate_geometric_coverage(self, geom, raster_ds, nodata_threshold=0.0000001):
+        return masked_values, 0.0
+        
+    def _calculate_geometric_coverage(self, geom, raster_ds, nodata_threshold=0.0000001, raster_data=None):
         """
         Calculate geometric coverage - precise pixel-by-pixel intersection.
         
@@ -429,6 +853,7 @@ class ZonalCalculator:
             geom: QgsGeometry of polygon (in polygon layer CRS)
             raster_ds: GDAL raster dataset
             nodata_threshold: Minimum value to consider valid
+            raster_data (np.ndarray): Band 1 in memory (optional)
             
         Returns:
             float: Coverage percentage (0-100)
@@ -436,8 +861,6 @@ class ZonalCalculator:
         from osgeo import ogr, osr
         
         try:
-            self.logger.info('=== GEOMETRIC COVERAGE: Pixel-by-pixel intersection ===')
-            
             # STEP 1: Transform geometry to raster CRS
             from qgis.core import QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject
             
@@ -491,14 +914,12 @@ class ZonalCalculator:
                 return 0.0
             
             # STEP 4: Read raster data
-            data = band.ReadAsArray(px_min, py_min, width, height)
+            data = _read_window(band, (px_min, py_min, width, height), raster_data)
             
             if data is None:
                 self.logger.error('Failed to read raster data')
                 return 0.0
             
-            self.logger.debug(f'Processing {width}x{height} pixels')
-            
             # STEP 5: Calculate intersection area pixel by pixel
             total_intersection_area = 0.0
             valid_pixels_count = 0
@@ -538,44 +959,39 @@ class ZonalCalculator:
             # STEP 6: Calculate coverage percentage
             coverage_pct = (total_intersection_area / polygon_area) * 100.0
             
-            self.logger.info(f'Geometric coverage: {coverage_pct:.2f}% (intersection={total_intersection_area:.2f}m², polygon={polygon_area:.2f}m², valid_pixels={valid_pixels_count})')
-            
             return min(100.0, max(0.0, coverage_pct))
             
         except Exception as e:
-            self.logger.error(f'Error calculating geometric coverage: {e}')
-            import traceback
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f'Error calculating geometric coverage: {e}')
             return 0.0
     
-    def extract_pixels_for_custom(self, raster_path, polygon):
+    def extract_pixels_for_custom(self, feature, raster_ds, raster_data=None, zone=None):
         """
-        Extract raw pixel values for custom algorithms.
-        Public wrapper that doesn't require dataset to be pre-opened.
+        Extract the valid pixel values of a feature for custom algorithms.
+        
+        Uses the same pixels as the statistics: the feature's zone from
+        rasterize_zones when given, else its own mask, read from the band
+        in memory when available.
         
         Args:
-            raster_path (str): Path to raster file
-            polygon: QgsFeature polygon
+            feature (QgsFeature): Polygon feature
+            raster_ds (gdal.Dataset): Raster dataset
+            raster_data (np.ndarray): Band 1 in memory (optional)
+            zone (np.ndarray): Flat pixel indices of the feature from
+                rasterize_zones (optional, needs raster_data)
             
         Returns:
             np.ndarray: Pixel values or None
         """
         try:
-            # Open raster
-            raster_ds = gdal.Open(raster_path)
-            if raster_ds is None:
-                self.logger.error(f'Cannot open raster: {raster_path}')
+            geom = feature.geometry()
+            if geom.isEmpty() or not geom.isGeosValid():
                 return None
             
-            # Extract pixels using existing method
-            pixel_values = self._extract_pixels_from_dataset(
-                raster_ds,
-                polygon,
-                raster_ds.GetRasterBand(1).GetNoDataValue()
-            )
-            
-            # Close
-            raster_ds = None
+            if zone is not None:
+                pixel_values, _ = self._extract_zone_pixels(zone, raster_ds, raster_data)
+            else:
+                pixel_values, _ = self._extract_pixels(geom, raster_ds, feature.id(), raster_data)
             
             return pixel_values
             
@@ -644,9 +1060,7 @@ class ZonalCalculator:
                         self.logger.debug(f'Minority: value={minority_value}, count={counts[min_idx]}')
                         return minority_value
                 except Exception as e:
-                    self.logger.error(f'Error calculating minority: {e}')
-                    import traceback
-                    self.logger.error(traceback.format_exc())
+                    self.logger.exception(f'Error calculating minority: {e}')
                     return None
 
             elif stat_name == 'variety':
@@ -76,7 +76,5 @@ class CSVExporter:
             return True, csv_path, ''
             
         except Exception as e:
-            self.logger.error(f'CSV export failed: {str(e)}')
-            import traceback
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f'CSV export failed: {str(e)}')
             return False, '', str(e)
\ No newline at end of file
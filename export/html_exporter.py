@@ -11,6 +11,7 @@ License: GPL-3.0
 from datetime import datetime
 import json
 from ..utils.logger import Logger
+from .report_context import ReportContext
 
 
 class HTMLExporter:
@@ -22,7 +23,7 @@ class HTMLExporter:
         """Constructor."""
         self.logger = Logger('HTMLExporter')
     
-    def export(self, output_layer, output_path, config):
+    def export(self, output_layer, output_path, config, context=None):
         """
         Export layer to interactive HTML dashboard.
         
@@ -30,6 +31,8 @@ class HTMLExporter:
             output_layer (QgsVectorLayer): Layer with results
             output_path (str): Base output path
             config (dict): Export configuration
+            context (ReportContext): Attributes already read for another
+                report (optional, read from the layer otherwise)
             
         Returns:
             tuple: (success, output_file_path, error_message)
@@ -43,7 +46,9 @@ class HTMLExporter:
                 html_path = output_path + '.html'
             
             # Collect all data from layer
-            data = self._collect_data(output_layer, config)
+            if context is None:
+                context = ReportContext.build(output_layer)
+            data = self._collect_data(context, config)
             
             # Generate HTML content
             html_content = self._generate_html_dashboard(data)
@@ -56,20 +61,21 @@ class HTMLExporter:
             return True, html_path, ''
             
         except Exception as e:
-            self.logger.error(f'HTML export failed: {str(e)}')
-            import traceback
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f'HTML export failed: {str(e)}')
             return False, '', str(e)
     
-    def _collect_data(self, output_layer, config):
+    def _collect_data(self, context, config):
         """
         Collect all data from output layer.
         
+        Args:
+            context (ReportContext): Attributes of the output layer
+            config (dict): Export configuration
+        
         Returns:
             dict: Comprehensive data structure
         """
-        fields = output_layer.fields()
-        field_names = [field.name() for field in fields]
+        field_names = context.field_names
         
         # Identify field types
         coverage_fields = [fn for fn in field_names if 'coverage_pct' in fn]
@@ -93,12 +99,11 @@ class HTMLExporter:
         features_data = []
         raster_data = {raster: {} for raster in raster_names}
         
-        for feature in output_layer.getFeatures():
-            feature_dict = {'fid': feature.id()}
+        for fid, row in zip(context.feature_ids, context.rows):
+            feature_dict = {'fid': fid}
             
             # Collect all field values
-            for field_name in field_names:
-                val = feature.attribute(field_name)
+            for field_name, val in zip(field_names, row):
                 feature_dict[field_name] = val
                 
                 # Organize by raster
@@ -180,7 +185,7 @@ class HTMLExporter:
             'metadata': {
                 'title': 'Zonify - Zonal Statistics Dashboard',
                 'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'layer_name': output_layer.name(),
+                'layer_name': context.layer_name,
                 'total_features': total_features,
                 'features_with_data': features_with_data,
                 'features_not_analyzed': features_not_analyzed,
@@ -58,9 +58,7 @@ class JSONExporter:
             return True, output_files, ''
             
         except Exception as e:
-            self.logger.error(f'JSON export failed: {str(e)}')
-            import traceback
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f'JSON export failed: {str(e)}')
             return False, [], str(e)
     
     def _export_json(self, layer, output_path, config):
@@ -70,24 +68,23 @@ class JSONExporter:
         fields = layer.fields()
         field_names = [field.name() for field in fields]
         
-        # Collect features
-        features_data = []
-        for feature in layer.getFeatures():
-            feature_dict = {'id': feature.id()}
-            
-            for field_name in field_names:
-                value = feature[field_name]
+        def features_data():
+            for feature in layer.getFeatures():
+                feature_dict = {'id': feature.id()}
                 
-                # Convert QVariant to Python type
-                if value is None or (hasattr(value, 'isNull') and value.isNull()):
-                    feature_dict[field_name] = None
-                else:
-                    # Convert to native Python type
-                    feature_dict[field_name] = value if not hasattr(value, 'value') else value.value()
-            
-            features_data.append(feature_dict)
+                for field_name in field_names:
+                    value = feature[field_name]
+                    
+                    # Convert QVariant to Python type
+                    if value is None or (hasattr(value, 'isNull') and value.isNull()):
+                        feature_dict[field_name] = None
+                    else:
+                        # Convert to native Python type
+                        feature_dict[field_name] = value if not hasattr(value, 'value') else value.value()
+                
+                yield feature_dict
         
-        # Build final JSON
+        # Build final JSON (features are written as they are read)
         output_data = {
             'type': 'FeatureCollection',
             'metadata': {
@@ -96,13 +93,10 @@ class JSONExporter:
                 'rasters_processed': config.get('raster_count', 0),
                 'statistics': config.get('statistics', []),
                 'processing_time': config.get('elapsed_time', 0)
-            },
-            'features': features_data
+            }
         }
         
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        self._write_collection(output_path, output_data, features_data())
         
         self.logger.info(f'JSON exported: {output_path}')
     
@@ -113,35 +107,32 @@ class JSONExporter:
         fields = layer.fields()
         field_names = [field.name() for field in fields]
         
-        # Collect features
-        features_data = []
-        for feature in layer.getFeatures():
-            # Get geometry
-            geom = feature.geometry()
-            geom_json = json.loads(geom.asJson())
-            
-            # Get properties
-            properties = {}
-            for field_name in field_names:
-                value = feature[field_name]
+        def features_data():
+            for feature in layer.getFeatures():
+                # Get geometry
+                geom = feature.geometry()
+                geom_json = json.loads(geom.asJson())
                 
-                # Convert QVariant to Python type
-                if value is None or (hasattr(value, 'isNull') and value.isNull()):
-                    properties[field_name] = None
-                else:
-                    properties[field_name] = value if not hasattr(value, 'value') else value.value()
-            
-            # Build feature
-            feature_geojson = {
-                'type': 'Feature',
-                'id': feature.id(),
-                'geometry': geom_json,
-                'properties': properties
-            }
-            
-            features_data.append(feature_geojson)
+                # Get properties
+                properties = {}
+                for field_name in field_names:
+                    value = feature[field_name]
+                    
+                    # Convert QVariant to Python type
+                    if value is None or (hasattr(value, 'isNull') and value.isNull()):
+                        properties[field_name] = None
+                    else:
+                        properties[field_name] = value if not hasattr(value, 'value') else value.value()
+                
+                # Build feature
+                yield {
+                    'type': 'Feature',
+                    'id': feature.id(),
+                    'geometry': geom_json,
+                    'properties': properties
+                }
         
-        # Build GeoJSON
+        # Build GeoJSON (features are written as they are read)
         output_data = {
             'type': 'FeatureCollection',
             'name': layer.name(),
@@ -150,12 +141,38 @@ class JSONExporter:
                 'properties': {
                     'name': layer.crs().authid()
                 }
-            },
-            'features': features_data
+            }
         }
         
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        self._write_collection(output_path, output_data, features_data())
+        
+        self.logger.info(f'GeoJSON exported: {output_path}')
+    
+    def _write_collection(self, output_path, output_data, features):
+        """
+        Write a feature collection, streaming its 'features' list.
+        
+        Produces the same text as json.dump(..., indent=2) of output_data
+        with a trailing 'features' list, without holding all features in
+        memory.
         
-        self.logger.info(f'GeoJSON exported: {output_path}')
\ No newline at end of file
+        Args:
+            output_path (str): Output file path
+            output_data (dict): Collection members written before 'features'
+            features (iterable): Feature dicts
+        """
+        # Object text without its closing brace, then the features list
+        # one item at a time, indented to its depth in the document
+        head = json.dumps(output_data, indent=2, ensure_ascii=False)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(head[:-2] + ',\n  "features": [')
+            
+            separator = '\n    '
+            for feature in features:
+                f.write(separator)
+                f.write(json.dumps(feature, indent=2, ensure_ascii=False).replace('\n', '\n    '))
+                separator = ',\n    '
+            
+            # Empty list is written as [] like json.dump does
+            f.write(']\n}' if separator == '\n    ' else '\n  ]\n}')
@@ -16,6 +16,7 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
 import os
 from ..utils.logger import Logger
+from .report_context import ReportContext
 
 
 class PDFExporter:
@@ -27,7 +28,7 @@ class PDFExporter:
         """Constructor."""
         self.logger = Logger('PDFExporter')
     
-    def export(self, output_layer, output_path, config):
+    def export(self, output_layer, output_path, config, context=None):
         """
         Export layer to professional PDF with adaptive layout.
         
@@ -35,6 +36,8 @@ class PDFExporter:
             output_layer (QgsVectorLayer): Layer with results
             output_path (str): Base output path
             config (dict): Export configuration
+            context (ReportContext): Attributes already read for another
+                report (optional, read from the layer otherwise)
             
         Returns:
             tuple: (success, output_file_path, error_message)
@@ -47,9 +50,10 @@ class PDFExporter:
             if pdf_path == output_path:
                 pdf_path = output_path + '.pdf'
             
-            # Get fields
-            fields = output_layer.fields()
-            field_names = [field.name() for field in fields]
+            # Get fields and all attribute rows (one pass over the layer)
+            if context is None:
+                context = ReportContext.build(output_layer)
+            field_names = context.field_names
             num_cols = len(field_names)
             
             # Adaptive page size based on columns
@@ -127,7 +131,7 @@ class PDFExporter:
             story.append(Spacer(1, 0.1*inch))
             
             # Calculate summary statistics
-            total_features = output_layer.featureCount()
+            total_features = context.feature_count
 
             # Find ALL coverage fields (if coverage was calculated)
             coverage_fields = [fn for fn in field_names if 'coverage_pct' in fn]
@@ -144,11 +148,12 @@ class PDFExporter:
 
             # Count features with ANY VALID data (not NULL)
             features_with_data = 0
-            for feature in output_layer.getFeatures():
+            stat_indices = [field_names.index(field) for field in stat_fields]
+            for row in context.rows:
                 has_valid_data = False
                 
-                for field in stat_fields:
-                    val = feature.attribute(field)
+                for field_idx in stat_indices:
+                    val = row[field_idx]
                     # Check for valid data: not None, not QVariant NULL, and is a number
                     if val is not None:
                         try:
@@ -199,13 +204,14 @@ class PDFExporter:
                 
                 for cov_field in coverage_fields:
                     raster_name = cov_field.replace('_coverage_pct', '')
+                    cov_idx = field_names.index(cov_field)
                     
                     raster_with_data = 0
                     raster_coverage_values = []
                     raster_all_coverage = []
                     
-                    for feature in output_layer.getFeatures():
-                        cov = feature.attribute(cov_field)
+                    for row in context.rows:
+                        cov = row[cov_idx]
                         
                         if cov is not None:
                             raster_all_coverage.append(cov)
@@ -281,10 +287,10 @@ class PDFExporter:
             
             # Build data in chunks
             chunk_size = max_rows_per_page
-            all_features = list(output_layer.getFeatures())
+            all_rows = context.rows
             
-            for chunk_idx in range(0, len(all_features), chunk_size):
-                chunk_features = all_features[chunk_idx:chunk_idx + chunk_size]
+            for chunk_idx in range(0, len(all_rows), chunk_size):
+                chunk_rows = all_rows[chunk_idx:chunk_idx + chunk_size]
                 
                 # Header row with word wrap
                 header_row = [Paragraph(f'<b>{name}</b>', ParagraphStyle(
@@ -298,11 +304,9 @@ class PDFExporter:
                 data_table = [header_row]
                 
                 # Data rows
-                for feature in chunk_features:
+                for attributes in chunk_rows:
                     row = []
-                    for field_name in field_names:
-                        value = feature[field_name]
-                        
+                    for value in attributes:
                         if value is None:
                             cell_text = '<font color="#94a3b8">NULL</font>'
                         elif isinstance(value, float):
@@ -338,10 +342,10 @@ class PDFExporter:
                 story.append(data_table_obj)
                 
                 # Page break between chunks (except last)
-                if chunk_idx + chunk_size < len(all_features):
+                if chunk_idx + chunk_size < len(all_rows):
                     story.append(PageBreak())
                     story.append(Paragraph(
-                        f'Detailed Results (continued) - Features {chunk_idx + chunk_size + 1} to {min(chunk_idx + 2*chunk_size, len(all_features))}',
+                        f'Detailed Results (continued) - Features {chunk_idx + chunk_size + 1} to {min(chunk_idx + 2*chunk_size, len(all_rows))}',
                         styles['Heading2']
                     ))
                     story.append(Spacer(1, 0.1*inch))
@@ -368,7 +372,5 @@ class PDFExporter:
             return True, pdf_path, ''
             
         except Exception as e:
-            self.logger.error(f'PDF export failed: {str(e)}')
-            import traceback
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f'PDF export failed: {str(e)}')
             return False, '', str(e)
\ No newline at end of file
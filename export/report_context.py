@@ -0,0 +1,65 @@
+"""
+Report Context for Zonify
+
+Attribute snapshot shared by the report exporters (HTML dashboard, PDF).
+Both reports read every attribute of every feature; building the snapshot
+once lets them skip their own passes over the layer.
+
+Author: Dragos Gontariu
+License: GPL-3.0
+"""
+
+from qgis.core import QgsFeatureRequest
+
+
+class ReportContext:
+    """
+    Field names and attribute rows of an output layer, read once.
+    """
+    
+    def __init__(self, layer_name, field_names, feature_ids, rows):
+        """
+        Constructor.
+        
+        Args:
+            layer_name (str): Name of the output layer
+            field_names (list): Field names, in attribute order
+            feature_ids (list): Feature ids, in iteration order
+            rows (list): Attribute list of each feature
+        """
+        self.layer_name = layer_name
+        self.field_names = field_names
+        self.feature_ids = feature_ids
+        self.rows = rows
+    
+    @property
+    def feature_count(self):
+        """Number of features in the snapshot."""
+        return len(self.rows)
+    
+    @classmethod
+    def build(cls, output_layer):
+        """
+        Read all attributes of a layer in one pass (geometry is skipped).
+        
+        Args:
+            output_layer (QgsVectorLayer): Layer with results
+        
+        Returns:
+            ReportContext: Snapshot of the layer's attributes
+        """
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        
+        feature_ids = []
+        rows = []
+        for feature in output_layer.getFeatures(request):
+            feature_ids.append(feature.id())
+            rows.append(feature.attributes())
+        
+        return cls(
+            output_layer.name(),
+            [field.name() for field in output_layer.fields()],
+            feature_ids,
+            rows
+        )
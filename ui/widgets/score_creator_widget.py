@@ -17,6 +17,7 @@ from qgis.PyQt.QtWidgets import (
 )
 from qgis.PyQt.QtCore import Qt, pyqtSignal
 from qgis.PyQt.QtGui import QFont
+from operator import itemgetter
 import json
 
 
@@ -623,10 +624,10 @@ class ScoreCreatorWidget(QWidget):
         """
         from qgis.core import (
             QgsVectorFileWriter, QgsVectorLayer, QgsField, 
-            QgsProject, QgsCoordinateTransformContext
+            QgsProject, QgsCoordinateTransformContext, QgsFeatureRequest
         )
         from qgis.PyQt.QtCore import QVariant
-        from ...algorithms.post_processing_engine import PostProcessingEngine
+        from ...algorithms.post_processing_engine import PostProcessingEngine, attribute_column
         import numpy as np
         
         # Copy layer to new file
@@ -649,48 +650,38 @@ class ScoreCreatorWidget(QWidget):
         if not output_layer.isValid():
             raise Exception("Failed to load output layer")
         
-        # Start editing
-        output_layer.startEditing()
-        
-        # Add score field
+        # Add score field directly in the data source, so the scores can be
+        # written with one provider call instead of through the edit buffer
         if output_layer.fields().indexOf(score_name) == -1:
-            output_layer.addAttribute(QgsField(score_name, QVariant.Double))
+            output_layer.dataProvider().addAttributes([QgsField(score_name, QVariant.Double)])
         output_layer.updateFields()
+        fields = output_layer.fields()
         
         # Get field indices
         field_indices = {}
         for field_name in self.selected_indicators.keys():
-            idx = output_layer.fields().indexOf(field_name)
+            idx = fields.indexOf(field_name)
             if idx == -1:
                 raise Exception(f"Field '{field_name}' not found in layer")
             field_indices[field_name] = idx
         
-        # Extract values
-        field_values = {field: [] for field in field_indices.keys()}
-        feature_ids = []
+        # Extract values: one attribute row per feature, then one
+        # conversion per field instead of a branch per value
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(list(field_indices.values()))
         
-        for feature in output_layer.getFeatures():
+        feature_ids = []
+        rows = []
+        for feature in output_layer.getFeatures(request):
             feature_ids.append(feature.id())
-            for field_name, field_idx in field_indices.items():
-                value = feature[field_idx]
-
-                # Convert QVariant to native Python type
-                from qgis.PyQt.QtCore import QVariant
-                if isinstance(value, QVariant):
-                    if value.isNull():
-                        value = None
-                    else:
-                        value = value.value()
-
-                # Convert to float
-                if value is not None:
-                    try:
-                        field_values[field_name].append(float(value))
-                    except (ValueError, TypeError):
-                        # Invalid value - use 0
-                        field_values[field_name].append(0.0)
-                else:
-                    field_values[field_name].append(0.0)
+            rows.append(feature.attributes())
+        
+        # NULL and non-numeric indicator values count as 0
+        field_values = {
+            field_name: attribute_column(list(map(itemgetter(field_idx), rows)), 0.0)
+            for field_name, field_idx in field_indices.items()
+        }
         
         # Get weights
         weights = {
@@ -698,37 +689,28 @@ class ScoreCreatorWidget(QWidget):
             for field, importance in self.selected_indicators.items()
         }
         
-        # Normalize
+        # Normalize and weight in one pass over a (features x fields) matrix
         engine = PostProcessingEngine()
-        normalized_values = {}
         
         normalization = self.norm_combo.currentText()
         
-        if 'Min-Max' in normalization:
-            for field_name, values in field_values.items():
-                normalized_values[field_name] = engine.normalize_minmax(
-                    np.array(values),
-                    output_range=(0, 100)
-                )
-        elif 'Z-Score' in normalization:
-            for field_name, values in field_values.items():
-                normalized_values[field_name] = engine.normalize_zscore(
-                    np.array(values)
-                )
+        if field_values and ('Min-Max' in normalization or 'Z-Score' in normalization):
+            scores = engine.normalize_and_weight(
+                np.stack(list(field_values.values())).T,
+                [weights.get(field_name, 1.0) for field_name in field_values],
+                method='minmax' if 'Min-Max' in normalization else 'zscore',
+                output_range=(0, 100)
+            )
         else:  # No normalization
-            normalized_values = {k: np.array(v) for k, v in field_values.items()}
-        
-        # Calculate scores
-        scores = engine.weighted_sum(normalized_values, weights)
-        
-        # Update features
-        score_field_idx = output_layer.fields().indexOf(score_name)
+            scores = engine.weighted_sum(field_values, weights)
         
-        for i, feature_id in enumerate(feature_ids):
-            output_layer.changeAttributeValue(feature_id, score_field_idx, float(scores[i]))
+        # Update features (one batch write, scores converted to floats at once)
+        score_field_idx = fields.indexOf(score_name)
         
-        # Commit changes
-        output_layer.commitChanges()
+        output_layer.dataProvider().changeAttributeValues({
+            feature_id: {score_field_idx: score}
+            for feature_id, score in zip(feature_ids, scores.tolist())
+        })
         
         # Add to project
         QgsProject.instance().addMapLayer(output_layer)    
@@ -47,6 +47,14 @@ class DependencyChecker:
             'version': '3.8.0',
             'features': ['Static charts']
         },
+        'numba': {
+            'version': '0.58.0',
+            'features': ['JIT-accelerated custom formulas']
+        },
+        'numexpr': {
+            'version': '2.8.0',
+            'features': ['Fast pixel-by-pixel custom formulas']
+        },
     }
     
     def check_dependencies(self) -> Tuple[List[str], List[str], Dict[str, List[str]]]:
@@ -16,6 +16,7 @@ License: GPL-3.0
 from qgis.core import QgsMessageLog, Qgis
 from datetime import datetime
 import os
+import traceback
 
 
 class Logger:
@@ -56,6 +57,11 @@ class Logger:
         """Log error message."""
         self._log(message, Qgis.Critical, 'ERROR')
     
+    def exception(self, message):
+        """Log error message followed by the traceback of the exception being handled."""
+        self._log(message, Qgis.Critical, 'ERROR')
+        self._log(traceback.format_exc(), Qgis.Critical, 'ERROR')
+    
     def _log(self, message, qgis_level, level_str):
         """
         Internal logging method.